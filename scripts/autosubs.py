@@ -0,0 +1,156 @@
+import numpy as np
+
+# Automatic substitutions and effective captaincy for whole leagues at once.
+#
+# Squads are stacked into (teams, 15) arrays in pick order: slots 1-11 start,
+# slot 12 is the bench goalkeeper and 13-15 are the outfield bench in
+# priority order. resolve() applies FPL's rules with array operations over
+# every team:
+#
+# - A starter is replaced only once he is certain not to play: no minutes
+#   and all of his club's fixtures over (or none at all, in a blank week).
+# - Each such starter, in slot order, gets the first bench player who has
+#   played, hasn't come on already and keeps a valid formation (1 GKP,
+#   3+ DEF, 2+ MID, 1+ FWD). Goalkeepers only replace goalkeepers.
+# - The captain's multiplier moves to the vice when the captain is out and
+#   the vice played in the final XI. Nobody is doubled when both missed out.
+# - Bench Boost counts all 15 players and makes no substitutions.
+#
+# Live mode (minutes so far, unfinished fixtures), backfills of finished
+# gameweeks and checks against the H2H scores all use the same call.
+
+SLOTS = 15
+STARTERS = 11
+GKP, DEF, MID, FWD = 1, 2, 3, 4
+POSITION_TYPES = {'GKP': GKP, 'DEF': DEF, 'MID': MID, 'FWD': FWD}
+MIN_IN_XI = np.array([0, 1, 3, 2, 1])  # indexed by position type
+
+class Squads:
+    """Lineups of many teams for one gameweek as (teams, 15) arrays"""
+
+    def __init__(self, lineups, element_types):
+        """lineups: fpl_models.Lineup objects in team order
+        element_types: element -> position type (1-4 or 'GKP'...'FWD')
+        """
+        teams = len(lineups)
+        self.elements = np.zeros((teams, SLOTS), dtype=np.int64)
+        self.types = np.zeros((teams, SLOTS), dtype=np.int64)
+        self.captain = np.full(teams, -1)
+        self.vice = np.full(teams, -1)
+        self.captain_multiplier = np.full(teams, 2)
+        self.bench_boost = np.zeros(teams, dtype=bool)
+        self.transfers_cost = np.zeros(teams, dtype=np.int64)
+
+        for t, lineup in enumerate(lineups):
+            for pick in lineup.picks:
+                slot = pick.position - 1
+                if not 0 <= slot < SLOTS:
+                    continue
+                element_type = element_types.get(pick.element, 0)
+                self.elements[t, slot] = pick.element
+                self.types[t, slot] = POSITION_TYPES.get(element_type, element_type)
+                if pick.is_captain:
+                    self.captain[t] = slot
+                    # 3 with Triple Captain
+                    self.captain_multiplier[t] = max(pick.multiplier, 2)
+                if pick.is_vice:
+                    self.vice[t] = slot
+            self.bench_boost[t] = lineup.chip == 'bboost'
+            if lineup.chip == '3xc':
+                self.captain_multiplier[t] = 3
+            self.transfers_cost[t] = lineup.transfers_cost
+
+    @classmethod
+    def from_arrays(cls, elements, types, captain, vice, chips, transfers_cost):
+        """Squads that are already (teams, 15) arrays in pick order
+
+        captain, vice: slot per team (-1 for none); chips: chip name or None per team
+        """
+        squads = cls([], {})
+        squads.elements = np.asarray(elements, dtype=np.int64)
+        squads.types = np.asarray(types, dtype=np.int64)
+        squads.captain = np.asarray(captain, dtype=np.int64)
+        squads.vice = np.asarray(vice, dtype=np.int64)
+        chips = np.asarray(chips, dtype=object)
+        squads.captain_multiplier = np.where(chips == '3xc', 3, 2)
+        squads.bench_boost = chips == 'bboost'
+        squads.transfers_cost = np.asarray(transfers_cost, dtype=np.int64)
+        return squads
+
+def by_element(values, elements, default=0):
+    """Look a per-element mapping up for an array of element IDs"""
+    size = max(int(elements.max(initial=0)), max(values, default=0)) + 1
+    table = np.full(size, default, dtype=np.int64)
+    for element, value in values.items():
+        table[element] = value
+    return table[elements]
+
+def resolve(squads, points, minutes, finished=None):
+    """Auto-subs and captaincy for every team
+
+    points, minutes: element -> this gameweek's totals so far
+    finished: element -> whether all of his club's fixtures are over
+    (default: all over, as in a backfill of a finished gameweek)
+
+    Returns a dict of (teams, 15) 'multipliers' and 'points', and per-team
+    'scores' (after transfer costs) and 'captain' element (0 for none).
+    """
+    teams = len(squads.elements)
+    rows = np.arange(teams)
+    pts = by_element(points, squads.elements)
+    played = by_element(minutes, squads.elements) > 0
+    done = np.ones_like(played) if finished is None else by_element(finished, squads.elements, default=1).astype(bool)
+    occupied = squads.elements > 0
+    out = occupied & ~played & done
+
+    in_xi = np.zeros((teams, SLOTS), dtype=bool)
+    in_xi[:, :STARTERS] = occupied[:, :STARTERS]
+    in_xi[squads.bench_boost] = occupied[squads.bench_boost]
+    counts = np.stack([(squads.types[:, :STARTERS] == k).sum(axis=1) for k in range(5)], axis=1)
+
+    subbing = ~squads.bench_boost
+    for slot in range(STARTERS):
+        need = subbing & out[:, slot]
+        if not need.any():
+            continue
+        starter_type = squads.types[:, slot]
+        for bench in range(STARTERS, SLOTS):
+            bench_type = squads.types[:, bench]
+            ok = need & occupied[:, bench] & played[:, bench] & ~in_xi[:, bench]
+            ok &= (bench_type == GKP) == (starter_type == GKP)
+            ok &= (bench_type == starter_type) | (counts[rows, starter_type] - 1 >= MIN_IN_XI[starter_type])
+            if not ok.any():
+                continue
+            in_xi[ok, slot] = False
+            in_xi[ok, bench] = True
+            counts[ok, starter_type[ok]] -= 1
+            counts[ok, bench_type[ok]] += 1
+            need &= ~ok
+
+    has_captain = squads.captain >= 0
+    captain = np.where(has_captain, squads.captain, 0)
+    vice = np.where(squads.vice >= 0, squads.vice, 0)
+    captain_out = out[rows, captain] | ~in_xi[rows, captain]
+    vice_ok = (squads.vice >= 0) & played[rows, vice] & in_xi[rows, vice]
+    armband = np.where(captain_out, vice, captain)
+    doubled = has_captain & (~captain_out | vice_ok)
+
+    multipliers = in_xi.astype(np.int64)
+    multipliers[rows[doubled], armband[doubled]] = squads.captain_multiplier[doubled]
+    starting = np.arange(SLOTS) < STARTERS
+    return {
+        'multipliers': multipliers,
+        'points': pts,
+        'scores': (pts * multipliers).sum(axis=1) - squads.transfers_cost,
+        'captain': np.where(doubled, squads.elements[rows, armband], 0),
+        'subs_in': in_xi & ~starting & ~squads.bench_boost[:, None],
+        'subs_out': ~in_xi & occupied & starting,
+    }
+
+def cross_check(labels, scores, expected):
+    """(label, computed, expected) for every team whose score differs from the H2H score"""
+    return [
+        (label, int(score), int(want))
+        for label, score, want in zip(labels, scores, expected)
+        if want is not None and int(score) != int(want)
+    ]
@@ -0,0 +1,340 @@
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+import pandas as pd
+import fpl_api
+import fpl_standin
+from fetch_fpl import (build_lineup_data, calculate_ffpts, calculate_rankings, restructure_results,
+                       save_lineup_data_to_excel)
+from fpl_models import fetch_bootstrap
+from matchups import index_lineups, write_lineups_json
+from pipeline import BUILDERS
+from squad_store import SquadStore
+from synthetic_league import League, bootstrap, club_fixtures, live_event, write_data, write_json
+
+# Benchmarks for the standings, the lineup export and the site build:
+#
+#     python scripts/benchmark.py [--sizes 20 200 1000 50000] [--save-baseline]
+#
+# Each size is a synthetic league (synthetic_league.py, fixed seed), so the
+# inputs are the same on every run. The data-processing steps run in this
+# process: restructure_results, calculate_ffpts, calculate_rankings,
+# build_lineup_data (auto-subs for every squad, picks from the squad
+# store, bootstrap and each gameweek's live points and fixtures from a
+# local fpl_standin),
+# save_lineup_data_to_excel and the lineups JSON the matchup cards load
+# (index_lineups + write_lineups_json, which replaced the server-rendered
+# lineup HTML). Each builder's main() runs in its own process, in pipeline
+# order, against a scratch copy of scripts/ and templates/ with the
+# synthetic data/, with site/ and the fragment cache emptied first: a
+# cold build.
+#
+# Leagues of more than LARGE_TEAMS teams only run the steps on the results
+# table (restructure_results, calculate_ffpts, calculate_rankings). The
+# data/ workbooks are built whole in memory by openpyxl, and the lineup
+# data holds every pick of every gameweek (about 1 GB per 5,000 teams):
+# at 50,000 teams either runs a 6 GB machine out of memory.
+#
+# Every benchmark runs --repeat times for the median and best time, then once
+# more under tracemalloc for peak Python memory, so the tracing doesn't
+# inflate the times. build_team_pages' render workers are separate
+# processes and not part of its peak.
+#
+# Results go to .build_profile/benchmark.json and are compared with the
+# baseline (benchmarks.json, or --baseline FILE such as an earlier results
+# file). A benchmark whose median time or peak memory grew by more than
+# --threshold (and by more than MIN_SECONDS / MIN_BYTES) is flagged, and
+# the exit status is then 1. --save-baseline records this run's numbers
+# into the baseline instead. Baselines only compare on the same machine.
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE_FILE = ROOT / "benchmarks.json"
+RESULTS_FILE = ROOT / ".build_profile" / "benchmark.json"
+SIZES = [20, 200, 1000, 50000]
+LARGE_TEAMS = 5000
+REPEAT = 3
+THRESHOLD = 0.25
+# Growth smaller than this is noise however large the fraction (millisecond steps, small leagues)
+MIN_SECONDS = 0.05
+MIN_BYTES = 2**20
+
+@contextlib.contextmanager
+def quiet():
+    """Drop the output of the code being measured"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+
+def measure(setup, run, repeat):
+    """Median and best time of run(*setup()), then its peak memory in one more traced run"""
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        with quiet():
+            start = time.perf_counter()
+            run(*args)
+            times.append(time.perf_counter() - start)
+    args = setup()
+    tracemalloc.start()
+    try:
+        with quiet():
+            run(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': statistics.median(times), 'min_seconds': min(times), 'peak_bytes': peak}
+
+def prepare(teams, played, seed, work):
+    """Scratch tree for one league size: scripts/, templates/, data/ and the responses to serve
+
+    Large leagues get no tree; their benchmarks only need the league itself.
+    """
+    tree = work / f"league-{teams}"
+    shutil.rmtree(tree, ignore_errors=True)
+    league = League(teams, played, seed=seed)
+    if teams > LARGE_TEAMS:
+        return league, None
+    shutil.copytree(ROOT / "scripts", tree / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    shutil.copytree(ROOT / "templates", tree / "templates")
+    with quiet():
+        write_data(league, tree / "data")
+    write_json(fpl_api.response_file(tree / "api", "bootstrap-static/"), bootstrap(league))
+    for gw in range(1, played + 1):
+        write_json(fpl_api.response_file(tree / "api", f"event/{gw}/live/"), live_event(league, gw))
+        write_json(fpl_api.response_file(tree / "api", "fixtures/", {'event': gw}), club_fixtures(league, gw))
+    return league, tree
+
+def function_cases(league, tree):
+    """name -> (setup, run); setup() returns run's arguments, so copying inputs is not timed"""
+    matches = league.matches()
+    with quiet():
+        data, most_recent_week = restructure_results(matches)
+    results = pd.DataFrame.from_dict(data, orient="index")
+    cases = {
+        'restructure_results': (lambda: (matches,), restructure_results),
+        'calculate_ffpts': (lambda: (results.copy(), most_recent_week), calculate_ffpts),
+        'calculate_rankings': (lambda: (results.copy(), most_recent_week), calculate_rankings),
+    }
+    if tree is None:
+        return cases
+
+    entry_map = dict(zip(league.entries.tolist(), league.names))
+    squads = tree / "data" / "squads.json"
+
+    def lineup_data(store):
+        return build_lineup_data(store, entry_map, most_recent_week, sleep=0, batch_size=len(entry_map))
+
+    with quiet():
+        lineups, captains = lineup_data(SquadStore(squads))
+    lineup_df = pd.read_excel(tree / "data" / "lineup_data.xlsx")
+    out = tree / "bench"
+
+    return {
+        **cases,
+        'build_lineup_data': (lambda: (SquadStore(squads),), lineup_data),
+        'save_lineup_data_to_excel': (
+            lambda: (lineups, captains, entry_map, most_recent_week, out / "lineup_data.xlsx"),
+            save_lineup_data_to_excel,
+        ),
+        'lineups_json': (
+            lambda: (lineup_df, league.played),
+            lambda df, gw: write_lineups_json(index_lineups(df, gw), gw, out),
+        ),
+    }
+
+def run_functions(league, tree, repeat, only):
+    """Measure the data-processing steps, in the scratch tree with the stand-in serving its responses"""
+    if tree is None:
+        return measure_cases(league, function_cases(league, None), repeat, only)
+    server = fpl_standin.start(fpl_standin.StandIn(tree / "api"))
+    base_url, min_interval, response_dir = fpl_api.BASE_URL, fpl_api.MIN_INTERVAL, fpl_api.RESPONSE_DIR
+    cwd = Path.cwd()
+    fpl_api.BASE_URL, fpl_api.MIN_INTERVAL = fpl_standin.base_url(server), 0
+    # Cached responses belong to this league: keep them out of the repo's cache and the other sizes'
+    fpl_api.RESPONSE_DIR = tree / ".build_cache" / "api"
+    fetch_bootstrap.cache_clear()
+    os.chdir(tree)  # build_lineup_data reads data/ relative to the working directory
+    try:
+        return measure_cases(league, function_cases(league, tree), repeat, only)
+    finally:
+        os.chdir(cwd)
+        fpl_api.BASE_URL, fpl_api.MIN_INTERVAL, fpl_api.RESPONSE_DIR = base_url, min_interval, response_dir
+        fetch_bootstrap.cache_clear()
+        server.shutdown()
+
+def measure_cases(league, cases, repeat, only):
+    """Measure each case of function_cases() that --only selects"""
+    results = {}
+    for name, (setup, run) in cases.items():
+        if only and name not in only:
+            continue
+        results[name] = measure(setup, run, repeat)
+        report_progress(league.teams, name, results[name])
+    return results
+
+def run_builders(teams, tree, repeat, only):
+    """Cold builds of each builder, repeat times plus a traced run, each in a fresh process"""
+    names = [name for name in BUILDERS if not only or name in only]
+    if tree is None or not names:
+        return {}
+    times = {name: [] for name in names}
+    peaks = {}
+    env = {**os.environ, "BUILD_PROFILE": ""}
+    for run in range(repeat + 1):
+        traced = run == repeat
+        for path in (tree / "site", tree / ".build_cache"):
+            shutil.rmtree(path, ignore_errors=True)
+        # Later builders read what earlier ones wrote (lineup JSON), so every one runs, in order
+        for name in BUILDERS:
+            command = [sys.executable, str(tree / "scripts" / "benchmark.py"), "--builder", name]
+            process = subprocess.run(command + (["--traced"] if traced else []), cwd=tree, env=env,
+                                     capture_output=True, text=True)
+            if process.returncode:
+                raise RuntimeError(f"{name} failed on {teams} teams:\n{process.stderr}")
+            if name not in times:
+                continue
+            result = json.loads(process.stdout.strip().splitlines()[-1])
+            if traced:
+                peaks[name] = result['peak_bytes']
+            else:
+                times[name].append(result['seconds'])
+    results = {}
+    for name in names:
+        results[f"{name}.main"] = {'seconds': statistics.median(times[name]), 'min_seconds': min(times[name]),
+                                   'peak_bytes': peaks[name]}
+        report_progress(teams, f"{name}.main", results[f"{name}.main"])
+    return results
+
+def run_builder(name, traced):
+    """Child process: time one builder's main() and print the result as JSON"""
+    module = importlib.import_module(name)
+    if traced:
+        tracemalloc.start()
+    with quiet():
+        start = time.perf_counter()
+        module.main()
+        seconds = time.perf_counter() - start
+    print(json.dumps({'seconds': seconds, 'peak_bytes': tracemalloc.get_traced_memory()[1] if traced else None}))
+
+def report_progress(teams, name, result):
+    print(f"  {teams:>6} teams  {name:<28} {result['seconds']:>9.3f}s  {result['peak_bytes'] / 2**20:>9.1f} MB",
+          flush=True)
+
+def load_report(path):
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+def compare(report, baseline, threshold):
+    """Print this run against the baseline; returns the regressions as (teams, name, what, change)"""
+    if baseline is None:
+        print("\nNo baseline to compare with (--save-baseline records one)")
+        return []
+    if (baseline['played'], baseline['seed']) != (report['played'], report['seed']):
+        print(f"\nBaseline is for a different league (played {baseline['played']}, seed {baseline['seed']}); not comparing")
+        return []
+
+    regressions = []
+    print(f"\nCompared with the baseline from {baseline['generated_at']} (threshold +{threshold:.0%})")
+    print(f"{'Benchmark':<30} {'Teams':>6} {'Time (s)':>10} {'Base':>10} {'Change':>8} "
+          f"{'Peak (MB)':>10} {'Base':>10} {'Change':>8}")
+    for teams, results in report['results'].items():
+        for name, result in results.items():
+            base = baseline['results'].get(teams, {}).get(name)
+            if base is None:
+                print(f"{name:<30} {teams:>6} {result['seconds']:>10.3f} {'-':>10} {'new':>8} "
+                      f"{result['peak_bytes'] / 2**20:>10.1f} {'-':>10} {'new':>8}")
+                continue
+            time_change = result['seconds'] / base['seconds'] - 1 if base['seconds'] else 0.0
+            memory_change = result['peak_bytes'] / base['peak_bytes'] - 1 if base['peak_bytes'] else 0.0
+            flags = []
+            if time_change > threshold and result['seconds'] - base['seconds'] > MIN_SECONDS:
+                flags.append(("time", time_change))
+            if memory_change > threshold and result['peak_bytes'] - base['peak_bytes'] > MIN_BYTES:
+                flags.append(("memory", memory_change))
+            regressions += [(teams, name, what, change) for what, change in flags]
+            print(f"{name:<30} {teams:>6} {result['seconds']:>10.3f} {base['seconds']:>10.3f} {time_change:>+8.0%} "
+                  f"{result['peak_bytes'] / 2**20:>10.1f} {base['peak_bytes'] / 2**20:>10.1f} {memory_change:>+8.0%}"
+                  + ("  REGRESSION" if flags else ""))
+    return regressions
+
+def save_baseline(report, path):
+    """Merge this run into the baseline, keeping benchmarks and sizes it did not measure"""
+    baseline = load_report(path)
+    if baseline is None or (baseline['played'], baseline['seed']) != (report['played'], report['seed']):
+        baseline = {**report, 'results': {}}
+    baseline.update({key: value for key, value in report.items() if key != 'results'})
+    for teams, results in report['results'].items():
+        baseline['results'].setdefault(teams, {}).update(results)
+    Path(path).write_text(json.dumps(baseline, indent=2), encoding="utf-8")
+    print(f"\nSaved the baseline to {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the standings, lineup export and site build")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="league sizes (teams, even)")
+    parser.add_argument("--played", type=int, default=26, help="gameweeks played in the synthetic leagues")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per benchmark")
+    parser.add_argument("--only", nargs="+", help="benchmarks to run (function or builder names)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="results to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="record this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="flag time or memory growth above this fraction")
+    parser.add_argument("--work", help="keep the scratch trees in this directory")
+    parser.add_argument("--builder", help=argparse.SUPPRESS)
+    parser.add_argument("--traced", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.builder:
+        run_builder(args.builder, args.traced)
+        return
+
+    report = {
+        'generated_at': str(pd.Timestamp.now('UTC')),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'played': args.played,
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'results': {},
+    }
+    only = set(args.only or [])
+    with tempfile.TemporaryDirectory() as scratch:
+        work = Path(args.work) if args.work else Path(scratch)
+        for teams in args.sizes:
+            print(f"League of {teams} teams")
+            league, tree = prepare(teams, args.played, args.seed, work)
+            if tree is None:
+                print(f"  More than {LARGE_TEAMS} teams: results-table steps only")
+            results = run_functions(league, tree, args.repeat, only)
+            results.update(run_builders(teams, tree, args.repeat, only))
+            report['results'][str(teams)] = results
+
+    RESULTS_FILE.parent.mkdir(exist_ok=True)
+    RESULTS_FILE.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Wrote {RESULTS_FILE}")
+
+    if args.save_baseline:
+        save_baseline(report, args.baseline)
+        return
+    regressions = compare(report, load_report(args.baseline), args.threshold)
+    for teams, name, what, change in regressions:
+        print(f"Regression: {name} at {teams} teams, {what} {change:+.0%}")
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
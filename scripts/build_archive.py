@@ -0,0 +1,165 @@
+import json
+import re
+from html import escape
+from pathlib import Path
+import pandas as pd
+from matchups import build_matchups, lineups_json_path
+from templating import compile_template, get_template, read_static, write_page
+
+# Gameweek archive: site/archive/gw-N.html for every finished gameweek.
+#
+# Results and lineups of a finished, data-checked gameweek never change, so
+# each archive page is rendered exactly once and then left alone; a run only
+# renders the gameweeks that finished since the last one. Lineups come from the
+# per-gameweek JSON build_league_data.py writes (site/data/lineups-gwN.json),
+# so run this after it. A gameweek without that JSON is skipped rather than
+# frozen without its lineups. Records next to the team names are as they
+# stood after that gameweek.
+
+ROOT = Path(__file__).resolve().parents[1]
+LEAGUE_FILE = ROOT / "data" / "league_results.xlsx"
+STATUS_FILE = ROOT / "data" / "gameweek_status.json"
+SITE_DIR = ROOT / "site"
+ARCHIVE_DIR = SITE_DIR / "archive"
+
+ARCHIVE_CARD = compile_template("""
+    <div class="matchup-card">
+        <div class="team-card {team_class}">
+            <div class="team-name">{m[team_name]} {m[team_record]}{button}</div>
+            <div class="team-score">{m[team_score]:.0f}</div>
+            <div class="team-result">{m[team_result]}</div>
+        </div>
+        <div class="vs-section">
+            <div class="vs-text">VS</div>
+            <div class="score-diff">Decided by {m[score_diff]:.0f} {point_text}</div>
+        </div>
+        <div class="team-card {opponent_class}">
+            <div class="team-name">{m[opponent_name]} {m[opponent_record]}{button}</div>
+            <div class="team-score">{m[opponent_score]:.0f}</div>
+            <div class="team-result">{m[opponent_result]}</div>
+        </div>{lineup_section}
+    </div>""")
+
+LINEUP_BUTTON = compile_template(
+    """ <button class="expand-btn" onclick="toggleLineup('lineup-{i}')" title="View Lineups">📋</button>"""
+)
+
+LINEUP_SECTION = compile_template("""
+        <div class="lineup-section" id="lineup-{i}" style="display: none;" data-lineups="../{lineups_url}" data-layout="desktop">
+            <div class="lineup-columns">
+                <div>
+                    <h4>{m[team_name]} <button onclick='toggleSharedPlayers(this)' class='compact-toggle-btn' title='Hide/Show Shared Players'>🤝</button></h4>
+                    <div class="lineup-slot" data-team="{team_attr}" data-opponent="{opponent_attr}"></div>
+                </div>
+                <div>
+                    <h4>{m[opponent_name]} <button onclick='toggleSharedPlayers(this)' class='compact-toggle-btn' title='Hide/Show Shared Players'>🤝</button></h4>
+                    <div class="lineup-slot" data-team="{opponent_attr}" data-opponent="{team_attr}"></div>
+                </div>
+            </div>
+        </div>""")
+
+RESULT_CLASSES = {'W': 'win', 'L': 'loss', 'D': 'draw'}
+
+def archive_path(gw):
+    """Archive page for a gameweek"""
+    return ARCHIVE_DIR / f"gw-{gw}.html"
+
+def weeks_with_results(df):
+    """Gameweeks whose scores are in the league results"""
+    weeks = []
+    for col in df.columns:
+        match = re.fullmatch(r'Wk (\d+) Score', col)
+        if match and not df[col].isna().all() and df[col].sum() > 0:
+            weeks.append(int(match.group(1)))
+    return sorted(weeks)
+
+def final_gameweeks(df):
+    """Gameweeks that are finished and whose data FPL has checked"""
+    weeks = weeks_with_results(df)
+    try:
+        with open(STATUS_FILE, 'r') as f:
+            status = json.load(f)
+    except FileNotFoundError:
+        # No status from fetch_current_gw.py: only trust weeks before the latest
+        print(f"{STATUS_FILE.name} not found; archiving weeks before the latest only")
+        return weeks[:-1]
+    return [
+        gw for gw in weeks
+        if status.get(str(gw), {}).get('finished') and status.get(str(gw), {}).get('data_checked')
+    ]
+
+def has_lineups(gw):
+    """Whether build_league_data.py has written the gameweek's lineup JSON"""
+    return (SITE_DIR / lineups_json_path(gw)).exists()
+
+def records_after(df, gw):
+    """The league rows with W, D and L counted over gameweeks 1 to gw only"""
+    result_cols = [f'Wk {week} Result' for week in range(1, gw + 1) if f'Wk {week} Result' in df.columns]
+    df = df.copy()
+    for result in ('W', 'D', 'L'):
+        df[result] = (df[result_cols] == result).sum(axis=1)
+    return df
+
+def render_matchups(df, gw):
+    """Matchup cards for a gameweek, with its lineups and the records as of that week"""
+    matchup_data = build_matchups(records_after(df, gw), gw)
+    if matchup_data is None:
+        return "<p>Matchup data not available for this gameweek</p>"
+
+    lineups_url = lineups_json_path(gw)
+    cards = []
+    for i, matchup in enumerate(matchup_data):
+        cards.append(ARCHIVE_CARD.render(
+            m=matchup,
+            team_class=RESULT_CLASSES.get(matchup['team_result'], 'pending'),
+            opponent_class=RESULT_CLASSES.get(matchup['opponent_result'], 'pending'),
+            point_text="pt" if matchup['score_diff'] == 1 else "pts",
+            button=LINEUP_BUTTON.render(i=i),
+            lineup_section=LINEUP_SECTION.render(
+                i=i,
+                m=matchup,
+                lineups_url=lineups_url,
+                team_attr=escape(str(matchup['team_name'])),
+                opponent_attr=escape(str(matchup['opponent_name']))
+            )
+        ))
+    return "<div class='matchups-container'>" + "".join(cards) + "</div>"
+
+def write_index():
+    """Rewrite the archive index from the pages on disk"""
+    weeks = sorted(int(p.stem.split('-')[1]) for p in ARCHIVE_DIR.glob("gw-*.html"))
+    links = []
+    for gw in reversed(weeks):
+        links.append(f'<a class="week" href="gw-{gw}.html">GW {gw}<small>Results &amp; lineups</small></a>')
+    write_page(
+        ARCHIVE_DIR / "index.html",
+        get_template("archive-index.html"),
+        week_links="\n    ".join(links) or "<p style='color: white;'>No gameweeks archived yet</p>",
+        generated_at=pd.Timestamp.now('UTC')
+    )
+
+def main():
+    df = pd.read_excel(LEAGUE_FILE, sheet_name="Sheet1")
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+
+    pending = [gw for gw in final_gameweeks(df) if not archive_path(gw).exists()]
+    new_weeks = [gw for gw in pending if has_lineups(gw)]
+    skipped = [gw for gw in pending if not has_lineups(gw)]
+    if skipped:
+        print(f"Skipping {len(skipped)} finished gameweek(s) without recorded lineups (GW {skipped[0]}-{skipped[-1]})")
+    for gw in new_weeks:
+        write_page(
+            archive_path(gw),
+            get_template("archive-gameweek.html"),
+            gw=gw,
+            matchups_html=render_matchups(df, gw),
+            lineup_script=read_static("lineups.js"),
+            generated_at=pd.Timestamp.now('UTC')
+        )
+        print(f"Archived GW {gw}")
+
+    write_index()
+    print(f"Archive: {len(new_weeks)} new gameweek(s), index at {ARCHIVE_DIR / 'index.html'}")
+
+if __name__ == "__main__":
+    main()
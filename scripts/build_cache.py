@@ -0,0 +1,121 @@
+import hashlib
+import json
+import sys
+import zipfile
+from importlib.metadata import version, PackageNotFoundError
+from pathlib import Path
+from profiling import profiler
+
+# Per-section fragment cache for the site builders.
+#
+# Each page section is rendered from a known set of input files. A section's
+# cache key is the hash of those files plus the code that renders it (the
+# builder script, the shared modules below and the pandas/plotly versions),
+# so a section only re-renders when one of them changes. Page templates are
+# not part of any key: layout-only changes re-assemble the page from cached
+# fragments without reading a single workbook.
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT / ".build_cache"
+SHARED_CODE = ["build_cache.py", "charts.py", "league_data.py", "matchups.py", "templating.py"]
+LIBRARIES = ["pandas", "plotly"]
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+def file_digest(path):
+    """Hash of a file's contents, or 'missing' if it does not exist"""
+    path = Path(path)
+    try:
+        if path.suffix == ".xlsx":
+            return workbook_digest(path)
+        return _digest(path.read_bytes())
+    except FileNotFoundError:
+        return "missing"
+
+def workbook_digest(path):
+    """Hash of a workbook's sheets, strings and styles
+
+    Writing a workbook stamps the time into docProps/ and into every zip
+    entry, so the same cells written twice never hash the same as raw
+    bytes. Only the entries' names and contents count here, without
+    docProps/.
+    """
+    try:
+        with zipfile.ZipFile(path) as workbook:
+            parts = sorted(
+                (name, _digest(workbook.read(name)))
+                for name in workbook.namelist() if not name.startswith("docProps/")
+            )
+    except zipfile.BadZipFile:
+        return _digest(path.read_bytes())
+    return _digest(json.dumps(parts).encode("utf-8"))
+
+def code_fingerprint(builder_file):
+    """Hash of the builder, the shared modules it uses and library versions"""
+    scripts_dir = Path(__file__).resolve().parent
+    parts = [file_digest(builder_file)]
+    parts += [file_digest(scripts_dir / name) for name in SHARED_CODE]
+    for lib in LIBRARIES:
+        try:
+            parts.append(f"{lib}=={version(lib)}")
+        except PackageNotFoundError:
+            parts.append(f"{lib}==missing")
+    parts.append(sys.version)
+    return _digest("\n".join(parts).encode("utf-8"))
+
+class FragmentCache:
+    """Rendered section fragments for one page, keyed by input fingerprints
+
+    A fragment is a dict of template fields. It may list files it wrote
+    under 'outputs' (paths relative to the repo root); the cached fragment
+    is only reused while those files still exist.
+    """
+
+    def __init__(self, page, builder_file):
+        self.path = CACHE_DIR / f"{page}.json"
+        self.code = code_fingerprint(builder_file)
+        self.file_digests = {}
+        self.rendered = []
+        self.reused = []
+        try:
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def _file_digest(self, path):
+        if path not in self.file_digests:
+            self.file_digests[path] = file_digest(path)
+        return self.file_digests[path]
+
+    def section(self, name, inputs, render, extra=None):
+        """Return the cached fragment for a section, rendering it if its inputs changed"""
+        key = _digest(json.dumps(
+            [self.code, [self._file_digest(p) for p in inputs], extra], default=str
+        ).encode("utf-8"))
+
+        with profiler.section(name) as stats:
+            entry = self.entries.get(name)
+            if entry and entry["key"] == key and all((ROOT / p).exists() for p in entry["fragment"].get("outputs", [])):
+                self.reused.append(name)
+                stats["cached"] = True
+                return entry["fragment"]
+
+            fragment = render()
+            self.entries[name] = {"key": key, "fragment": fragment}
+            self.rendered.append(name)
+            stats["output_bytes"] = len(json.dumps(fragment, ensure_ascii=False).encode("utf-8"))
+            return fragment
+
+    def invalidate(self, *names):
+        """Drop sections whose outputs were overwritten outside the build"""
+        for name in names:
+            self.entries.pop(name, None)
+
+    def save(self):
+        """Persist the fragments and report what was re-rendered"""
+        CACHE_DIR.mkdir(exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.entries, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+        print(f"Sections rendered: {', '.join(self.rendered) or 'none'}; reused from cache: {len(self.reused)}")
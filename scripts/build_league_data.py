@@ -0,0 +1,44 @@
+import pandas as pd
+from build_site import (MOTM_SCHEDULE_FILE, OUT_DIR, get_current_lineup_gameweek, get_most_recent_week,
+                        load_league_data, load_lineup_data)
+from league_data import BUNDLE_PATH, build_bundle, write_bundle
+from matchups import index_lineups, write_lineups_json
+from profiling import profiler
+
+# League data for both main pages: site/data/league.json and the lineup
+# gameweek's site/data/lineups-gwN.json.
+#
+# The desktop and mobile pages render their tables from the same bundle, so
+# it is built once here, as a pipeline stage of its own ahead of
+# build_site.py and build_mobile_site.py; they only link its current
+# revision. The lineup JSON is kept for the archive and team pages. Both
+# files are replaced in one step, never rewritten in place.
+
+def load_schedule():
+    """The MoTM schedule, or None before fetch_fpl.py has written one"""
+    try:
+        with profiler.section("load MoTM schedule"):
+            return pd.read_excel(MOTM_SCHEDULE_FILE)
+    except FileNotFoundError:
+        return None
+
+def write_league_data(df, lineup_df, schedule_df, most_recent_week, out_dir=OUT_DIR):
+    """Write the bundle and the lineup JSON; returns the bundle's revision URL"""
+    lineup_gw = get_current_lineup_gameweek(lineup_df)
+    with profiler.section("build bundle") as stats:
+        url = write_bundle(build_bundle(df, lineup_df, lineup_gw, schedule_df, most_recent_week), out_dir)
+        stats['output_bytes'] = (out_dir / BUNDLE_PATH).stat().st_size
+    if lineup_gw:
+        with profiler.section("lineups JSON"):
+            write_lineups_json(index_lineups(lineup_df, lineup_gw), lineup_gw, out_dir)
+    return url
+
+def main():
+    profiler.start("league-data")
+    df = load_league_data()
+    url = write_league_data(df, load_lineup_data(), load_schedule(), get_most_recent_week(df))
+    print(f"Wrote {OUT_DIR / BUNDLE_PATH} ({url})")
+    profiler.finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import hashlib
+import json
+from pathlib import Path
+from league_data import BUNDLE_PATH
+from matchups import lineups_json_path
+from templating import read_static
+
+# Service worker and precache manifest for site/.
+#
+# Run after optimize_site.py, so revisions describe the files that are
+# actually deployed, and before compress_site.py. The manifest lists the
+# entry pages, the hashed assets (plotly.js among them), the logos, the
+# league data bundle and the current gameweek's lineup JSON. It is
+# written to site/precache-manifest.json and embedded in site/sw.js, so
+# any change to it gives the browser a new worker to install.
+
+ROOT = Path(__file__).resolve().parents[1]
+SITE_DIR = ROOT / "site"
+MANIFEST_FILE = SITE_DIR / "precache-manifest.json"
+SW_FILE = SITE_DIR / "sw.js"
+
+ENTRY_PAGES = ["index.html", "farmers-desktop.html", "farmers-mobile.html"]
+DATA_FILES = [BUNDLE_PATH]
+LOGO_GLOB = "logo.*"
+
+def revision(path):
+    """Short content hash used to tell when a precached file changed"""
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:12]
+
+def latest_lineups():
+    """The current gameweek's lineup JSON, if the builders wrote one"""
+    files = sorted(
+        (SITE_DIR / "data").glob("lineups-gw*.json"),
+        key=lambda p: int(p.stem.replace("lineups-gw", ""))
+    )
+    if not files:
+        return None
+    gw = int(files[-1].stem.replace("lineups-gw", ""))
+    return SITE_DIR / lineups_json_path(gw)
+
+def precache_files():
+    """Site files to precache, as site-relative paths"""
+    paths = [SITE_DIR / page for page in ENTRY_PAGES]
+    assets = SITE_DIR / "assets"
+    if assets.exists():
+        paths += sorted(p for p in assets.iterdir() if p.suffix in (".css", ".js"))
+    paths += sorted(p for p in SITE_DIR.glob(LOGO_GLOB) if p.suffix.lower() in (".png", ".webp", ".avif"))
+    paths += [SITE_DIR / name for name in DATA_FILES]
+    lineups = latest_lineups()
+    if lineups is not None:
+        paths.append(lineups)
+    return [p for p in paths if p.exists()]
+
+def build_manifest():
+    """Precache entries plus an overall version hash"""
+    files = []
+    for path in precache_files():
+        url = path.relative_to(SITE_DIR).as_posix()
+        files.append({"url": url, "revision": revision(path)})
+        if url == "index.html":
+            # The site root serves index.html too
+            files.append({"url": "./", "revision": files[-1]["revision"]})
+
+    version = hashlib.sha256(json.dumps(files, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return {"version": version, "files": files}
+
+def main():
+    manifest = build_manifest()
+    MANIFEST_FILE.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    SW_FILE.write_text(
+        read_static("sw.js").replace("__PRECACHE__", json.dumps(manifest, separators=(",", ":"))),
+        encoding="utf-8"
+    )
+    print(f"Wrote {SW_FILE} ({len(manifest['files'])} precached files, version {manifest['version']})")
+
+if __name__ == "__main__":
+    main()
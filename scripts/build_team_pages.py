@@ -0,0 +1,311 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+from pathlib import Path
+import pandas as pd
+from build_archive import weeks_with_results
+from build_cache import code_fingerprint, file_digest
+from matchups import LINEUP_FIELDS, lineups_json_path, team_record
+from templating import TEMPLATE_DIR, cells, get_template, read_static, styled_cells, table_rows, write_page
+
+# Per-team season pages: site/teams/<slug>.html.
+#
+# The main process gathers everything a team page shows into a plain dict
+# (its payload) and hashes it. Only teams whose payload, or the code and
+# templates that render it, changed since the last run are re-rendered, and
+# those are rendered in a process pool. Hashes are kept in
+# site/teams/manifest.json next to the pages they describe.
+
+ROOT = Path(__file__).resolve().parents[1]
+LEAGUE_FILE = ROOT / "data" / "league_results.xlsx"
+MOTM_SCHEDULE_FILE = ROOT / "data" / "motm_schedule.xlsx"
+SITE_DIR = ROOT / "site"
+TEAMS_DIR = SITE_DIR / "teams"
+MANIFEST_FILE = TEAMS_DIR / "manifest.json"
+
+# Same classes as league.js's RESULT_CLASSES; the colours are in team.html
+RESULT_CLASSES = {"W": ' class="result-w"', "D": ' class="result-d"', "L": ' class="result-l"'}
+
+def slugify(name):
+    """URL-safe file name for a team"""
+    return re.sub(r'[^a-z0-9]+', '-', str(name).lower()).strip('-') or 'team'
+
+def team_slugs(team_names):
+    """Map each team name to a unique slug"""
+    slugs = {}
+    used = set()
+    for name in team_names:
+        slug = base = slugify(name)
+        n = 2
+        while slug in used:
+            slug = f"{base}-{n}"
+            n += 1
+        used.add(slug)
+        slugs[name] = slug
+    return slugs
+
+def plain(value):
+    """Convert a pandas/numpy cell to a JSON-friendly Python value"""
+    if pd.isna(value):
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def load_lineup_history():
+    """Lineups from every per-gameweek JSON on disk: {gw: {team: [player, ...]}}"""
+    history = {}
+    for path in (SITE_DIR / "data").glob("lineups-gw*.json"):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        fields = data.get('fields', LINEUP_FIELDS)
+        history[int(data['gw'])] = {
+            team: [dict(zip(fields, row)) for row in rows]
+            for team, rows in data['teams'].items()
+        }
+    return history
+
+def motm_periods(df):
+    """MoTM period numbers present in the league results"""
+    periods = []
+    for col in df.columns:
+        match = re.fullmatch(r'MoTM (\d+) Points', col)
+        if match and f'MoTM {match.group(1)} Score' in df.columns:
+            periods.append(int(match.group(1)))
+    return sorted(periods)
+
+def motm_gameweeks():
+    """MoTM number -> 'GW a - GW b' label from the schedule"""
+    try:
+        schedule = pd.read_excel(MOTM_SCHEDULE_FILE)
+    except FileNotFoundError:
+        return {}
+    labels = {}
+    for row in schedule.to_dict('records'):
+        if pd.notna(row.get('MoTM')):
+            labels[int(row['MoTM'])] = f"{row.get('First Gameweek', '')} - {row.get('Last Gameweek', '')}"
+    return labels
+
+def build_payloads(df, lineup_history):
+    """Everything each team page shows, as plain JSON-serializable dicts"""
+    slugs = team_slugs(df['Team Name'])
+    weeks = weeks_with_results(df)
+    periods = motm_periods(df)
+    period_labels = motm_gameweeks()
+
+    # Period rank: MoTM points, then MoTM score as the tiebreaker
+    period_ranks = {}
+    for n in periods:
+        if df[f'MoTM {n} Score'].fillna(0).sum() == 0:
+            continue
+        ordered = df.sort_values([f'MoTM {n} Points', f'MoTM {n} Score'], ascending=[False, False])
+        period_ranks[n] = {team: i + 1 for i, team in enumerate(ordered['Team Name'])}
+
+    payloads = []
+    for row in df.to_dict('records'):
+        team = row['Team Name']
+        week_rows = [
+            [
+                gw,
+                plain(row.get(f'Wk {gw} Score')),
+                plain(row.get(f'Wk {gw} Opponent Team')),
+                slugs.get(row.get(f'Wk {gw} Opponent Team')),
+                plain(row.get(f'Wk {gw} Opponent Score')),
+                plain(row.get(f'Wk {gw} Result')),
+                plain(row.get(f'Wk {gw} Points')),
+                plain(row.get(f'Wk {gw} FFPts')),
+            ]
+            for gw in weeks
+        ]
+        period_rows = [
+            [
+                n,
+                period_labels.get(n, ''),
+                plain(row.get(f'MoTM {n} Score')),
+                plain(row.get(f'MoTM {n} Points')),
+                plain(row.get(f'MoTM {n} Score Behind')),
+                period_ranks[n][team],
+            ]
+            for n in periods if n in period_ranks
+        ]
+        captain_rows = []
+        lineup_gws = []
+        for gw in sorted(lineup_history):
+            lineup = lineup_history[gw].get(team)
+            if not lineup:
+                continue
+            captain = next((p for p in lineup if p['is_captain']), None)
+            vice = next((p for p in lineup if p['is_vice']), None)
+            captain_rows.append([
+                gw,
+                captain['name'] if captain else None,
+                captain['score'] if captain else None,
+                vice['name'] if vice else None,
+                vice['score'] if vice else None,
+            ])
+            lineup_gws.append([gw, lineups_json_path(gw), plain(row.get(f'Wk {gw} Opponent Team'))])
+
+        payloads.append({
+            'slug': slugs[team],
+            'team_name': team,
+            'owner_name': plain(row.get('Owner Name')) or '',
+            'rank': plain(row.get('Rank')),
+            'record': team_record(row, with_parens=False),
+            'total_points': plain(row.get('Total Points')),
+            'total_score': plain(row.get('Total Score')),
+            'total_ffpts': plain(row.get('Total FFPts')),
+            'ffpts_rank': plain(row.get('FFPts Rank')),
+            'weeks': week_rows,
+            'periods': period_rows,
+            'captains': captain_rows,
+            'lineup_gws': lineup_gws,
+        })
+    return payloads
+
+def render_fingerprint():
+    """Hash of everything besides the payload that shapes a team page"""
+    parts = [
+        code_fingerprint(__file__),
+        file_digest(TEMPLATE_DIR / "team.html"),
+        file_digest(TEMPLATE_DIR / "lineups.js"),
+    ]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+def payload_digest(payload, fingerprint):
+    return hashlib.sha256(
+        (fingerprint + json.dumps(payload, sort_keys=True, ensure_ascii=False)).encode("utf-8")
+    ).hexdigest()
+
+def render_team_page(payload, generated_at):
+    """Render one team page (runs in a worker process)"""
+    weeks = pd.DataFrame(
+        payload['weeks'],
+        columns=['gw', 'score', 'opponent', 'opponent_slug', 'opponent_score', 'result', 'points', 'ffpts'],
+        dtype=object
+    ).fillna('-')
+    opponents = [
+        f'<a href="{slug}.html">{escape(str(name))}</a>' if slug != '-' else escape(str(name))
+        for name, slug in zip(weeks['opponent'], weeks['opponent_slug'])
+    ]
+    week_rows = table_rows([
+        cells(weeks['gw']),
+        cells(weeks['score']),
+        cells(opponents),
+        cells(weeks['opponent_score']),
+        styled_cells(weeks['result'], RESULT_CLASSES),
+        cells(weeks['points']),
+        cells(weeks['ffpts']),
+    ], sep="\n")
+
+    periods = pd.DataFrame(
+        payload['periods'], columns=['n', 'gws', 'score', 'points', 'behind', 'rank'], dtype=object
+    ).fillna('-')
+    period_rows = table_rows([cells(periods[col]) for col in periods.columns], sep="\n")
+
+    if payload['captains']:
+        captains = pd.DataFrame(
+            payload['captains'], columns=['gw', 'captain', 'captain_score', 'vice', 'vice_score'], dtype=object
+        ).fillna('-')
+        captain_html = (
+            "<table><thead><tr><th>GW</th><th>Captain</th><th>Captain Score</th><th>Vice</th><th>Vice Score</th>"
+            "</tr></thead><tbody>"
+            + "".join(table_rows([cells(captains[col]) for col in captains.columns]))
+            + "</tbody></table>"
+        )
+    else:
+        captain_html = "<p>No lineups recorded yet</p>"
+
+    lineup_parts = []
+    for gw, url, opponent in reversed(payload['lineup_gws']):
+        lineup_parts.append(
+            f"<button class='lineup-toggle' onclick=\"toggleLineup('lineup-gw{gw}')\">GW {gw}</button>"
+        )
+    for gw, url, opponent in reversed(payload['lineup_gws']):
+        lineup_parts.append(
+            f'<div class="lineup-section" id="lineup-gw{gw}" style="display: none;" '
+            f'data-lineups="../{url}" data-layout="desktop">'
+            f'<h4>GW {gw} vs {escape(str(opponent))}</h4>'
+            f'<div class="lineup-slot" data-team="{escape(payload["team_name"])}" '
+            f'data-opponent="{escape(str(opponent))}"></div></div>'
+        )
+    lineups_html = "".join(lineup_parts) or "<p>No lineups recorded yet</p>"
+
+    write_page(
+        TEAMS_DIR / f"{payload['slug']}.html",
+        get_template("team.html"),
+        team_name=escape(payload['team_name']),
+        owner_name=escape(str(payload['owner_name'])),
+        rank=payload['rank'],
+        record=payload['record'],
+        total_points=payload['total_points'],
+        total_score=payload['total_score'],
+        total_ffpts=payload['total_ffpts'],
+        ffpts_rank=payload['ffpts_rank'],
+        week_rows=week_rows,
+        period_rows=period_rows,
+        captain_html=captain_html,
+        lineups_html=lineups_html,
+        lineup_script=read_static("lineups.js"),
+        generated_at=generated_at
+    )
+    return payload['slug']
+
+def write_index(payloads, generated_at):
+    """Rewrite the team index, ordered by league rank"""
+    rows = []
+    for p in sorted(payloads, key=lambda p: (p['rank'] is None, p['rank'])):
+        rows.append(
+            f"<tr><td>{p['rank']}</td><td><a href=\"{p['slug']}.html\">{escape(p['team_name'])}</a></td>"
+            f"<td>{p['record']}</td><td>{p['total_points']}</td><td>{p['total_score']}</td></tr>"
+        )
+    write_page(
+        TEAMS_DIR / "index.html",
+        get_template("teams-index.html"),
+        team_rows="\n".join(rows),
+        generated_at=generated_at
+    )
+
+def main():
+    df = pd.read_excel(LEAGUE_FILE, sheet_name="Sheet1")
+    payloads = build_payloads(df, load_lineup_history())
+    TEAMS_DIR.mkdir(parents=True, exist_ok=True)
+
+    try:
+        manifest = json.loads(MANIFEST_FILE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+
+    fingerprint = render_fingerprint()
+    digests = {p['slug']: payload_digest(p, fingerprint) for p in payloads}
+    changed = [
+        p for p in payloads
+        if manifest.get(p['slug']) != digests[p['slug']] or not (TEAMS_DIR / f"{p['slug']}.html").exists()
+    ]
+
+    generated_at = str(pd.Timestamp.now('UTC'))
+    if len(changed) > 1:
+        workers = min(len(changed), os.cpu_count() or 1)
+        # Spawned, not forked: the pipeline runs this on a worker thread, and a
+        # fork would copy the other threads' locks in whatever state they are in
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            list(pool.map(render_team_page, changed, [generated_at] * len(changed)))
+    else:
+        for payload in changed:
+            render_team_page(payload, generated_at)
+
+    # Drop pages of teams that left the league
+    for path in TEAMS_DIR.glob("*.html"):
+        if path.stem != "index" and path.stem not in digests:
+            path.unlink()
+
+    write_index(payloads, generated_at)
+    MANIFEST_FILE.write_text(json.dumps(digests, indent=2, sort_keys=True), encoding="utf-8")
+    print(f"Team pages: {len(changed)} rendered, {len(payloads) - len(changed)} unchanged")
+
+if __name__ == "__main__":
+    main()
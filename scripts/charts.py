@@ -0,0 +1,141 @@
+import base64
+import hashlib
+import threading
+from functools import lru_cache
+from pathlib import Path
+from plotly.io.json import to_json_plotly
+from plotly.offline import get_plotlyjs
+
+# Chart emitter for the site builders.
+#
+# pio.to_html(include_plotlyjs='cdn') pulls in plotly.js once per chart and
+# embeds the full default template (every trace type's defaults plus several
+# colorscales) in each figure. Here the page loads plotly.js once via
+# plotly_script(), and chart_div() inlines only the traces, the layout and the
+# parts of the template the figure can actually use.
+#
+# plotly.js is served from site/assets/ rather than a CDN: the file is the
+# one bundled with the installed plotly package, so the integrity hash on
+# the <script> is always the hash of the file the browser receives. Like
+# optimize_site.py's assets it is named by content hash.
+
+ROOT = Path(__file__).resolve().parents[1]
+ASSET_DIR = ROOT / "site" / "assets"
+
+# Template layout keys that affect cartesian charts; the rest (polar, geo,
+# scene, colorscales, ...) is dropped
+TEMPLATE_LAYOUT_KEYS = (
+    "autotypenumbers", "colorway", "font", "hovermode", "hoverlabel",
+    "paper_bgcolor", "plot_bgcolor", "xaxis", "yaxis", "title",
+)
+
+CHART_CONFIG = {"responsive": True}
+
+# Both page builders call plotly_url() when run concurrently by pipeline.py
+_asset_lock = threading.Lock()
+
+@lru_cache(maxsize=None)
+def plotly_js():
+    """The installed plotly package's plotly.js build, as bytes"""
+    return get_plotlyjs().encode("utf-8")
+
+@lru_cache(maxsize=None)
+def plotly_url():
+    """Write plotly.js to site/assets/ if needed; return its site-relative URL"""
+    content = plotly_js()
+    path = ASSET_DIR / (hashlib.sha256(content).hexdigest()[:12] + ".js")
+    with _asset_lock:
+        if not path.exists():
+            ASSET_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(content)
+            tmp.replace(path)
+    return f"assets/{path.name}"
+
+@lru_cache(maxsize=None)
+def plotly_integrity():
+    """Subresource integrity hash for the served plotly.js file"""
+    digest = hashlib.sha256(plotly_js()).digest()
+    return "sha256-" + base64.b64encode(digest).decode("ascii")
+
+def plotly_script(lazy=False):
+    """Page-level <script> tags that load plotly.js once and define renderChart()
+
+    Eager pages load plotly.js deferred and draw every chart on DOMContentLoaded.
+    Lazy pages only fetch plotly.js when the first chart scrolls into view.
+    """
+    if not lazy:
+        return f"""<script charset="utf-8" src="{plotly_url()}" integrity="{plotly_integrity()}" defer></script>
+  <script>
+    function renderChart(id, fig) {{
+      document.addEventListener('DOMContentLoaded', function() {{
+        Plotly.newPlot(id, fig.data, fig.layout, fig.config);
+      }});
+    }}
+  </script>"""
+    return f"""<script>
+        var plotlyLoading = null;
+        function loadPlotly() {{
+            if (!plotlyLoading) {{
+                plotlyLoading = new Promise(function(resolve, reject) {{
+                    var script = document.createElement('script');
+                    script.src = '{plotly_url()}';
+                    script.integrity = '{plotly_integrity()}';
+                    script.charset = 'utf-8';
+                    script.onload = resolve;
+                    script.onerror = reject;
+                    document.head.appendChild(script);
+                }});
+            }}
+            return plotlyLoading;
+        }}
+
+        function renderChart(id, fig) {{
+            var el = document.getElementById(id);
+            var draw = function() {{
+                loadPlotly().then(function() {{
+                    Plotly.newPlot(el, fig.data, fig.layout, fig.config);
+                }});
+            }};
+            if (!('IntersectionObserver' in window)) {{
+                draw();
+                return;
+            }}
+            var observer = new IntersectionObserver(function(entries) {{
+                if (entries[0].isIntersecting) {{
+                    observer.disconnect();
+                    draw();
+                }}
+            }}, {{ rootMargin: '200px' }});
+            observer.observe(el);
+        }}
+    </script>"""
+
+def slim_template(template, trace_types):
+    """Keep only the template data a figure with these trace types can use"""
+    if not template:
+        return None
+    layout = template.get("layout", {})
+    data = template.get("data", {})
+    return {
+        "layout": {k: layout[k] for k in TEMPLATE_LAYOUT_KEYS if k in layout},
+        "data": {t: data[t] for t in trace_types if t in data},
+    }
+
+def chart_div(fig, div_id):
+    """Emit a chart div plus the inline call that draws it"""
+    fig_json = fig.to_plotly_json()
+    layout = fig_json.get("layout", {})
+    trace_types = sorted({trace.get("type", "scatter") for trace in fig_json.get("data", [])})
+    template = slim_template(layout.pop("template", None), trace_types)
+    if template:
+        layout["template"] = template
+    payload = to_json_plotly({"data": fig_json.get("data", []), "layout": layout, "config": CHART_CONFIG})
+
+    # Reserve the chart's height so the page does not jump when it draws
+    height = layout.get("height")
+    style = f"height:{height}px; width:100%;" if height else "height:100%; width:100%;"
+    return (
+        f'<div id="{div_id}" class="plotly-graph-div" style="{style}"></div>'
+        f'<script>renderChart("{div_id}", {payload});</script>'
+    )
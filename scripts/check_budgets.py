@@ -0,0 +1,183 @@
+import fnmatch
+import gzip
+import json
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Page-weight and DOM-size budgets for the generated pages in site/.
+#
+# Run last, after optimize_site.py, so it measures what is deployed. For
+# every page it reports the total and compressed size, bytes per section
+# (each <h2>/<h3> heading starts one), inline script and style bytes, the number
+# of DOM elements and the number of external script loads, and exits
+# non-zero when a page is over one of the budgets in budgets.json.
+#
+# budgets.json has "defaults" that apply to every page and "pages", whose
+# keys are glob patterns relative to site/ (e.g. "teams/*.html"); every
+# matching pattern overrides the defaults, later patterns winning. A budget
+# that is missing or null is not checked. Everything is measured offline
+# with html.parser; no browser is needed.
+
+ROOT = Path(__file__).resolve().parents[1]
+SITE_DIR = ROOT / "site"
+BUDGET_FILE = ROOT / "budgets.json"
+
+# Headings that start a page section (the mobile matchups card uses an <h3>)
+SECTION_TAGS = {"h2", "h3"}
+
+METRICS = [
+    ("bytes", "Bytes"),
+    ("gzip_bytes", "gzip"),
+    ("brotli_bytes", "brotli"),
+    ("inline_script_bytes", "Inline JS"),
+    ("inline_style_bytes", "Inline CSS"),
+    ("dom_nodes", "DOM nodes"),
+    ("external_scripts", "Ext JS"),
+    ("max_section_bytes", "Largest section"),
+]
+
+class PageParser(HTMLParser):
+    """Counts elements and scripts and finds where each section starts"""
+
+    def __init__(self, page):
+        super().__init__(convert_charrefs=True)
+        # Offsets of each line, so parser positions can be turned into byte ranges
+        self.line_starts = [0]
+        for line in page.split("\n"):
+            self.line_starts.append(self.line_starts[-1] + len(line.encode("utf-8")) + 1)
+        self.dom_nodes = 0
+        self.external_scripts = 0
+        self.inline_script_bytes = 0
+        self.inline_style_bytes = 0
+        self.headings = []
+        self.raw_tag = None
+        self.heading = None
+
+    def byte_offset(self):
+        line, col = self.getpos()
+        # getpos() counts characters within the line; close enough for sizing
+        return self.line_starts[line - 1] + col
+
+    def handle_starttag(self, tag, attrs):
+        self.dom_nodes += 1
+        if tag == "script":
+            if dict(attrs).get("src"):
+                self.external_scripts += 1
+            else:
+                self.raw_tag = "script"
+        elif tag == "style":
+            self.raw_tag = "style"
+        elif tag in SECTION_TAGS and self.heading is None:
+            self.heading = {"offset": self.byte_offset(), "title": ""}
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        self.raw_tag = None
+
+    def handle_endtag(self, tag):
+        if tag == self.raw_tag:
+            self.raw_tag = None
+        elif tag in SECTION_TAGS and self.heading is not None:
+            self.heading["title"] = " ".join(self.heading["title"].split())
+            self.headings.append(self.heading)
+            self.heading = None
+
+    def handle_data(self, data):
+        if self.raw_tag == "script":
+            self.inline_script_bytes += len(data.encode("utf-8"))
+        elif self.raw_tag == "style":
+            self.inline_style_bytes += len(data.encode("utf-8"))
+        elif self.heading is not None:
+            self.heading["title"] += data
+
+def section_sizes(data, headings):
+    """Bytes of the page before the first heading and under each one"""
+    bounds = [h["offset"] for h in headings] + [len(data)]
+    sections = [("(before first heading)", bounds[0])]
+    for heading, start, end in zip(headings, bounds, bounds[1:]):
+        sections.append((heading["title"] or "(untitled)", end - start))
+    return sections
+
+def measure_page(path):
+    """Size, DOM and script metrics for one generated page"""
+    data = path.read_bytes()
+    parser = PageParser(data.decode("utf-8"))
+    parser.feed(data.decode("utf-8"))
+    parser.close()
+    sections = section_sizes(data, parser.headings)
+    return {
+        "bytes": len(data),
+        "gzip_bytes": len(gzip.compress(data, compresslevel=9, mtime=0)),
+        "brotli_bytes": len(brotli.compress(data, quality=11)) if brotli is not None else None,
+        "inline_script_bytes": parser.inline_script_bytes,
+        "inline_style_bytes": parser.inline_style_bytes,
+        "dom_nodes": parser.dom_nodes,
+        "external_scripts": parser.external_scripts,
+        "max_section_bytes": max(size for _, size in sections),
+        "sections": sections,
+    }
+
+def format_value(value):
+    return "-" if value is None else f"{value:,}"
+
+def load_budgets():
+    """Budget config from budgets.json"""
+    return json.loads(BUDGET_FILE.read_text(encoding="utf-8"))
+
+def budgets_for(name, config):
+    """Budgets that apply to a site-relative page name"""
+    budgets = dict(config.get("defaults", {}))
+    for pattern, overrides in config.get("pages", {}).items():
+        if fnmatch.fnmatch(name, pattern):
+            budgets.update(overrides)
+    return budgets
+
+def check_page(metrics, budgets):
+    """Over-budget metrics as (metric, value, budget)"""
+    return [
+        (key, metrics[key], budgets[key])
+        for key, _ in METRICS
+        if budgets.get(key) is not None and metrics[key] is not None and metrics[key] > budgets[key]
+    ]
+
+def main():
+    config = load_budgets()
+    pages = sorted(SITE_DIR.rglob("*.html"))
+    if not pages:
+        print(f"No pages found in {SITE_DIR}")
+        sys.exit(1)
+
+    failures = []
+    print(f"{'Page':<44}" + "".join(f" {label:>15}" for _, label in METRICS))
+    for path in pages:
+        name = path.relative_to(SITE_DIR).as_posix()
+        metrics = measure_page(path)
+        over = check_page(metrics, budgets_for(name, config))
+        over_keys = {key for key, _, _ in over}
+        print(f"{name:<44}" + "".join(
+            f" {('!' if key in over_keys else '') + format_value(metrics[key]):>15}" for key, _ in METRICS
+        ))
+        # Only the top-level pages get the per-section breakdown; the archive
+        # and team pages all share one layout
+        if "/" not in name:
+            for title, size in metrics["sections"]:
+                print(f"    {title[:56]:<56} {size:>10,}")
+        failures += [(name, key, value, budget) for key, value, budget in over]
+
+    if brotli is None:
+        print("brotli not installed; brotli sizes not measured")
+    if failures:
+        print(f"\n{len(failures)} budget(s) exceeded:")
+        for name, key, value, budget in failures:
+            print(f"  {name}: {key} {value:,} > {budget:,}")
+        sys.exit(1)
+    print("\nAll pages within budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import gzip
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Precompressed copies of site/'s text files: a .gz (and .br) next to each.
+#
+# Run after everything else that writes to site/, i.e. after
+# build_service_worker.py, so no compressed copy is left describing an
+# earlier version of its file (sw.js and the precache manifest are written
+# last). Copies from the previous run are removed first, except those of
+# the content-hashed files in site/assets/: their names change whenever
+# their content does, so an existing copy is still current and plotly.js
+# is not recompressed on every run. brotli is optional; without it only
+# the .gz files are written.
+
+ROOT = Path(__file__).resolve().parents[1]
+SITE_DIR = ROOT / "site"
+ASSET_DIR = SITE_DIR / "assets"
+
+COMPRESSIBLE = {".html", ".css", ".js", ".json", ".svg"}
+
+def is_current(path):
+    """Whether a compressed copy still describes its (hashed asset) source"""
+    return path.parent == ASSET_DIR and path.with_suffix("").exists()
+
+def write_copy(path, data):
+    """Write a compressed copy atomically; a kept copy must never be partial"""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+def clean_previous_output():
+    """Remove compressed siblings left by an earlier run"""
+    for path in SITE_DIR.rglob("*"):
+        if path.suffix in (".gz", ".br") and path.is_file() and not is_current(path):
+            path.unlink()
+
+def compress_files():
+    """Write .gz (and .br when brotli is available) next to text files"""
+    compressed = {}
+    for path in sorted(SITE_DIR.rglob("*")):
+        if path.suffix not in COMPRESSIBLE or not path.is_file():
+            continue
+        data = None
+        sizes = {}
+        gz_path = path.with_name(path.name + ".gz")
+        if not gz_path.exists():
+            data = path.read_bytes()
+            write_copy(gz_path, gzip.compress(data, compresslevel=9, mtime=0))
+        sizes["gz"] = gz_path.stat().st_size
+        if brotli is not None:
+            br_path = path.with_name(path.name + ".br")
+            if not br_path.exists():
+                data = data if data is not None else path.read_bytes()
+                write_copy(br_path, brotli.compress(data, quality=11))
+            sizes["br"] = br_path.stat().st_size
+        compressed[path] = sizes
+    return compressed
+
+def main():
+    clean_previous_output()
+    compressed = compress_files()
+
+    print(f"{'File':<40} {'Size':>9} {'gzip':>9} {'brotli':>9}")
+    for path, sizes in compressed.items():
+        print(f"{str(path.relative_to(SITE_DIR)):<40} {path.stat().st_size:>9,} "
+              f"{sizes.get('gz', 0):>9,} {sizes.get('br', 0):>9,}")
+    print(f"{'Total':<40} {sum(p.stat().st_size for p in compressed):>9,} "
+          f"{sum(s.get('gz', 0) for s in compressed.values()):>9,} {sum(s.get('br', 0) for s in compressed.values()):>9,}")
+    if brotli is None:
+        print("brotli not installed; skipped .br files")
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,11 @@ import json
 import pandas as pd
 import time
 from pathlib import Path
+from autosubs import Squads, resolve
+from fpl_models import fetch_bootstrap, fetch_lineup, fetch_live, fetch_matches, league_entries
 
-base_url = "https://fantasy.premierleague.com/api/"
-
-def get_current_gameweek():
-    """Get the current gameweek from FPL API"""
-    bs = requests.get(f"{base_url}bootstrap-static/").json()
-    
+def get_current_gameweek(bs):
+    """Get the current gameweek from bootstrap-static"""
     # Find the current gameweek
     for event in bs['events']:
         if event['is_current']:
@@ -22,128 +20,53 @@ def get_current_gameweek():
     
     return 1  # fallback
 
+def save_gameweek_status(bs):
+    """Record each gameweek's finished / data_checked flags for the archive"""
+    status = {
+        str(event['id']): {
+            'finished': event.get('finished', False),
+            'data_checked': event.get('data_checked', False)
+        }
+        for event in bs['events']
+    }
+    
+    output_path = Path("data") / "gameweek_status.json"
+    with open(output_path, 'w') as f:
+        json.dump(status, f, indent=2)
+    print(f"Saved gameweek status to {output_path}")
+
 def get_league_teams(league_id):
-    """Get team entries from H2H league results"""
-    page = 1
-    all_results = []
-    
-    # Get all H2H results
-    while True:
-        url = f"{base_url}leagues-h2h-matches/league/{league_id}/?page={page}"
-        response = requests.get(url)
-        
-        if response.status_code == 200:
-            league_data = response.json()
-            all_results.extend(league_data['results'])
-            
-            if not league_data['has_next']:
-                break
-            page += 1
-        else:
-            print(f"Error getting H2H results: {response.status_code}")
-            break
-    
-    # Extract unique teams from H2H results
-    entry_map = {}
-    for result in all_results:
-        # Add team 1
-        if 'entry_1_entry' in result:
-            entry_id = result['entry_1_entry']
-            team_name = result['entry_1_name']
-            player_name = result.get('entry_1_player_name', 'Unknown')
-            entry_map[entry_id] = {'team_name': team_name, 'player_name': player_name}
-        
-        # Add team 2
-        if 'entry_2_entry' in result:
-            entry_id = result['entry_2_entry']
-            team_name = result['entry_2_name']
-            player_name = result.get('entry_2_player_name', 'Unknown')
-            entry_map[entry_id] = {'team_name': team_name, 'player_name': player_name}
-    
-    return entry_map
+    """Get team entries (fpl_models.Entry by entry ID) from H2H league results"""
+    try:
+        return league_entries(fetch_matches(league_id))
+    except requests.RequestException as e:
+        print(f"Error getting H2H results: {e}")
+        return {}
 
-def get_player_data():
+def get_player_data(bs):
     """Get all player data from bootstrap-static"""
-    bs = requests.get(f"{base_url}bootstrap-static/").json()
-    
     element_map = {e['id']: e.get('web_name', '') for e in bs.get('elements', [])}
     positions_map = {p['id']: p['singular_name_short'] for p in bs.get('element_types', [])}
     element_pos_map = {e['id']: positions_map.get(e.get('element_type'), '') for e in bs.get('elements', [])}
+    element_type_map = {e['id']: e.get('element_type', 0) for e in bs.get('elements', [])}
+    element_club_map = {e['id']: e.get('team') for e in bs.get('elements', [])}
     
-    return element_map, element_pos_map
+    return element_map, element_pos_map, element_type_map, element_club_map
 
-def get_team_lineup_for_gw(entry_id, gameweek, element_map, element_pos_map):
-    """Get lineup for a specific team and gameweek"""
-    url = f"{base_url}entry/{entry_id}/event/{gameweek}/picks/"
-    
+def get_team_lineup_for_gw(entry_id, gameweek):
+    """Get a team's fpl_models.Lineup for a gameweek, or None"""
     try:
-        response = requests.get(url, timeout=10)
-        if response.status_code != 200:
-            print(f"Error getting lineup for entry {entry_id}, GW {gameweek}: {response.status_code}")
-            return []
-        
-        picks_data = response.json()
-        picks = picks_data.get('picks', [])
-        
-        # Get player scores for this gameweek
-        player_scores = {}
-        for pick in picks:
-            element_id = pick['element']
-            
-            # Get player's score for this gameweek
-            player_url = f"{base_url}element-summary/{element_id}/"
-            try:
-                player_response = requests.get(player_url, timeout=10)
-                if player_response.status_code == 200:
-                    player_data = player_response.json()
-                    
-                    # Find score for this specific gameweek
-                    for history in player_data.get('history', []):
-                        if history['round'] == gameweek:
-                            player_scores[element_id] = history['total_points']
-                            break
-                    
-                    if element_id not in player_scores:
-                        player_scores[element_id] = 0
-                else:
-                    player_scores[element_id] = 0
-                    
-                time.sleep(0.15)  # Rate limiting
-                
-            except Exception as e:
-                print(f"Error getting score for player {element_id}: {e}")
-                player_scores[element_id] = 0
-        
-        lineup = []
-        for i, pick in enumerate(picks):
-            element_id = pick['element']
-            player_name = element_map.get(element_id, f"Player {element_id}")
-            position = element_pos_map.get(element_id, "Unknown")
-            score = player_scores.get(element_id, 0)
-            
-            lineup.append({
-                'position': i + 1,
-                'player_name': player_name,
-                'element_id': element_id,
-                'position_type': position,
-                'score': score,
-                'is_captain': pick.get('is_captain', False),
-                'is_vice_captain': pick.get('is_vice_captain', False),
-                'multiplier': pick.get('multiplier', 1)
-            })
-        
-        return lineup
-        
+        return fetch_lineup(entry_id, gameweek)
     except Exception as e:
-        print(f"Error processing team {entry_id}: {e}")
-        return []
+        print(f"Error getting lineup for entry {entry_id}, GW {gameweek}: {e}")
+        return None
 
-def collect_current_gameweek_data(league_id):
+def collect_current_gameweek_data(league_id, bs):
     """Collect lineup data for current gameweek only"""
     print("=== Collecting Current Gameweek Data ===")
     
     # Get current gameweek
-    current_gw = get_current_gameweek()
+    current_gw = get_current_gameweek(bs)
     print(f"Current gameweek: {current_gw}")
     
     # Get team entries
@@ -153,32 +76,47 @@ def collect_current_gameweek_data(league_id):
     
     # Get player data
     print("Getting player data...")
-    element_map, element_pos_map = get_player_data()
+    element_map, element_pos_map, element_type_map, element_club_map = get_player_data(bs)
     
-    # Collect lineup data
-    all_lineup_data = []
+    # Collect lineups
+    lineups = {}
     
-    for i, (entry_id, team_info) in enumerate(entry_map.items()):
-        print(f"Processing team {i+1}/{len(entry_map)}: {team_info['team_name']}")
+    for i, (entry_id, entry) in enumerate(entry_map.items()):
+        print(f"Processing team {i+1}/{len(entry_map)}: {entry.name}")
         
-        lineup = get_team_lineup_for_gw(entry_id, current_gw, element_map, element_pos_map)
-        
-        for player in lineup:
-            all_lineup_data.append({
-                'Manager': team_info['player_name'],
-                'Team Name': team_info['team_name'],
-                'Position': player['position'],
-                'Player': player['player_name'],
-                'Position Type': player['position_type'],
-                f'GW {current_gw} Score': player['score'],
-                'Is Captain': player['is_captain'],
-                'Is Vice Captain': player['is_vice_captain'],
-                'Multiplier': player['multiplier']
-            })
+        lineup = get_team_lineup_for_gw(entry_id, current_gw)
+        if lineup is not None and lineup.picks:
+            lineups[entry_id] = lineup
         
         # Small delay between teams
         time.sleep(0.5)
     
+    # Points, minutes and fixture state so far; auto-subs and captaincy for every team at once
+    print("Getting live gameweek data...")
+    points, minutes, finished = fetch_live(current_gw, element_club_map)
+    entries = list(lineups)
+    resolved = resolve(Squads([lineups[entry_id] for entry_id in entries], element_type_map), points, minutes, finished)
+    
+    all_lineup_data = []
+    for t, entry_id in enumerate(entries):
+        entry = entry_map[entry_id]
+        for pick in lineups[entry_id].picks:
+            slot = pick.position - 1
+            all_lineup_data.append({
+                'Manager': entry.player_name,
+                'Team Name': entry.name,
+                'Position': pick.position,
+                'Player': element_map.get(pick.element, f"Player {pick.element}"),
+                'Position Type': element_pos_map.get(pick.element, "Unknown"),
+                f'GW {current_gw} Score': points.get(pick.element, 0),
+                'Is Captain': pick.is_captain,
+                'Is Vice Captain': pick.is_vice,
+                # In effect after auto-subs: 0 on the bench, 2 or 3 for whoever holds the armband
+                'Multiplier': int(resolved['multipliers'][t, slot]),
+                'Auto Sub In': bool(resolved['subs_in'][t, slot]),
+                'Auto Sub Out': bool(resolved['subs_out'][t, slot])
+            })
+    
     # Save to Excel
     if all_lineup_data:
         df = pd.DataFrame(all_lineup_data)
@@ -192,13 +130,15 @@ def collect_current_gameweek_data(league_id):
 
 def main():
     league_id = 388845  # 2025/26 season
-    df = collect_current_gameweek_data(league_id)
+    bs = fetch_bootstrap()
+    save_gameweek_status(bs)
+    df = collect_current_gameweek_data(league_id, bs)
     
     if df is not None:
         print(f"\n=== Collection Complete ===")
         print(f"Total records: {len(df)}")
         print(f"Teams: {df['Team Name'].nunique()}")
-        print(f"Players with scores > 0: {len(df[df[f'GW {get_current_gameweek()} Score'] > 0])}")
+        print(f"Players with scores > 0: {len(df[df[f'GW {get_current_gameweek(bs)} Score'] > 0])}")
     else:
         print("Data collection failed")
 
@@ -1,103 +1,62 @@
 from pathlib import Path
 import requests
-import json
 import pandas as pd
 import time
-import os
+from autosubs import Squads, cross_check, resolve
+from fpl_api import get_json, paginate
+from fpl_models import fetch_bootstrap, fetch_lineup, fetch_live, fetch_matches, final_events, league_entries
+from squad_store import SquadStore
 
-base_url = "https://fantasy.premierleague.com/api/"
+SQUAD_FILE = Path("data") / "squads.json"
 
 def get_all_league_info(league_id):
-    page = 1
-    all_results = []
-    
-    while True:
-        url = f"{base_url}leagues-h2h-matches/league/{league_id}/?page={page}"
-        response = requests.get(url)
-        
-        print(f"Request URL: {url}")
-        print(f"Status Code: {response.status_code}")
-        
-        if response.status_code == 200:
-            league_data = response.json()
-            all_results.extend(league_data['results'])
-            
-            if not league_data['has_next']:
-                break
-            page += 1
-        else:
-            print("League not found")
-            break
-    return all_results
+    """Every H2H fixture of the league as fpl_models.Match objects"""
+    matches = fetch_matches(league_id)
+    print(f"Fetched {len(matches)} H2H fixtures for league {league_id}")
+    return matches
 
-def restructure_results(results):
+def restructure_results(matches):
     data = {}
-    max_event = max(result['event'] for result in results)
+    max_event = max(match.event for match in matches)
     most_recent_week = 0
     
-    for result in results:
-        event = result['event']
-        entry_1 = result['entry_1_name']
-        entry_2 = result['entry_2_name']
-        
-        if entry_1 not in data:
-            data[entry_1] = {
-                'Team Name': entry_1,
-                'Owner Name': result.get('entry_1_owner', 'N/A')
-            }
-            for e in range(1, max_event + 1):
-                data[entry_1][f'Wk {e} Score'] = None
-                data[entry_1][f'Wk {e} Opponent Team'] = None
-                data[entry_1][f'Wk {e} Opponent Score'] = None
-                data[entry_1][f'Wk {e} Result'] = None
-                data[entry_1][f'Wk {e} Points'] = None
-                data[entry_1][f'Wk {e} FFPts'] = None
-        
-        if entry_2 not in data:
-            data[entry_2] = {
-                'Team Name': entry_2,
-                'Owner Name': result.get('entry_2_owner', 'N/A')
-            }
-            for e in range(1, max_event + 1):
-                data[entry_2][f'Wk {e} Score'] = None
-                data[entry_2][f'Wk {e} Opponent Team'] = None
-                data[entry_2][f'Wk {e} Opponent Score'] = None
-                data[entry_2][f'Wk {e} Result'] = None
-                data[entry_2][f'Wk {e} Points'] = None
-                data[entry_2][f'Wk {e} FFPts'] = None
-        
-        if result['entry_1_points'] == 0 and result['entry_2_points'] == 0:
-            # Future week
-            if data[entry_1][f'Wk {event} Score'] is None:
-                data[entry_1][f'Wk {event} Score'] = 0
-                data[entry_1][f'Wk {event} Opponent Team'] = entry_2
-                data[entry_1][f'Wk {event} Opponent Score'] = 0
-                data[entry_1][f'Wk {event} Result'] = 'TBD'
-                data[entry_1][f'Wk {event} Points'] = 0
-                data[entry_1][f'Wk {event} FFPts'] = 0
-            
-            if data[entry_2][f'Wk {event} Score'] is None:
-                data[entry_2][f'Wk {event} Score'] = 0
-                data[entry_2][f'Wk {event} Opponent Team'] = entry_1
-                data[entry_2][f'Wk {event} Opponent Score'] = 0
-                data[entry_2][f'Wk {event} Result'] = 'TBD'
-                data[entry_2][f'Wk {event} Points'] = 0
-                data[entry_2][f'Wk {event} FFPts'] = 0
-        else:
-            data[entry_1][f'Wk {event} Score'] = result['entry_1_points']
-            data[entry_1][f'Wk {event} Opponent Team'] = entry_2
-            data[entry_1][f'Wk {event} Opponent Score'] = result['entry_2_points']
-            data[entry_1][f'Wk {event} Result'] = 'W' if result['entry_1_points'] > result['entry_2_points'] else 'L' if result['entry_1_points'] < result['entry_2_points'] else 'D'
-            data[entry_1][f'Wk {event} Points'] = 3 if result['entry_1_points'] > result['entry_2_points'] else 1 if result['entry_1_points'] == result['entry_2_points'] else 0
-            
-            data[entry_2][f'Wk {event} Score'] = result['entry_2_points']
-            data[entry_2][f'Wk {event} Opponent Team'] = entry_1
-            data[entry_2][f'Wk {event} Opponent Score'] = result['entry_1_points']
-            data[entry_2][f'Wk {event} Result'] = 'W' if result['entry_2_points'] > result['entry_1_points'] else 'L' if result['entry_2_points'] < result['entry_1_points'] else 'D'
-            data[entry_2][f'Wk {event} Points'] = 3 if result['entry_2_points'] > result['entry_1_points'] else 1 if result['entry_2_points'] == result['entry_1_points'] else 0
+    for match in matches:
+        event = match.event
+        for entry, points, opponent, opponent_points in match.sides():
+            # Keyed by entry ID, so a renamed team stays one row
+            team = entry.id if entry.id is not None else entry.name
+            if team not in data:
+                # The H2H results carry no owner field
+                data[team] = {
+                    'Team Name': entry.name,
+                    'Owner Name': 'N/A'
+                }
+                for e in range(1, max_event + 1):
+                    data[team][f'Wk {e} Score'] = None
+                    data[team][f'Wk {e} Opponent Team'] = None
+                    data[team][f'Wk {e} Opponent Score'] = None
+                    data[team][f'Wk {e} Result'] = None
+                    data[team][f'Wk {e} Points'] = None
+                    data[team][f'Wk {e} FFPts'] = None
             
-            if result['entry_1_points'] > 0 or result['entry_2_points'] > 0:
-                most_recent_week = max(most_recent_week, event)
+            if not match.played:
+                # Future week
+                if data[team][f'Wk {event} Score'] is None:
+                    data[team][f'Wk {event} Score'] = 0
+                    data[team][f'Wk {event} Opponent Team'] = opponent.name
+                    data[team][f'Wk {event} Opponent Score'] = 0
+                    data[team][f'Wk {event} Result'] = 'TBD'
+                    data[team][f'Wk {event} Points'] = 0
+                    data[team][f'Wk {event} FFPts'] = 0
+            else:
+                data[team][f'Wk {event} Score'] = points
+                data[team][f'Wk {event} Opponent Team'] = opponent.name
+                data[team][f'Wk {event} Opponent Score'] = opponent_points
+                data[team][f'Wk {event} Result'] = 'W' if points > opponent_points else 'L' if points < opponent_points else 'D'
+                data[team][f'Wk {event} Points'] = 3 if points > opponent_points else 1 if points == opponent_points else 0
+        
+        if match.played:
+            most_recent_week = max(most_recent_week, event)
     
     print(f'Last gameweek with data: Week {most_recent_week}')
     return data, most_recent_week
@@ -230,324 +189,167 @@ def save_to_excel(df, out_path: Path):
 
 # Lineup data collection functions (integrated from lineup_sample_script.py)
 
-def extract_entry_map_from_results(results):
+def extract_entry_map_from_results(matches):
     """Extract entry ID to team name mapping from H2H results"""
-    entry_map = {}
-    for r in results:
-        # handle keys like entry_1_entry / entry_1_name etc.
-        for id_key, name_key in (("entry_1_entry","entry_1_name"), ("entry_1_entry","entry_1_player_name"),
-                                 ("entry_2_entry","entry_2_name"), ("entry_2_entry","entry_2_player_name"),
-                                 ("entry_1","entry_1_name"), ("entry_2","entry_2_name")):
-            eid = r.get(id_key)
-            if eid is None:
-                continue
-            name = r.get(name_key) or r.get(f"{id_key.replace('_entry','')}_name") or str(eid)
-            entry_map.setdefault(eid, name or str(eid))
-        # generic fallback for *_entry keys
-        for k, v in list(r.items()):
-            if k.endswith("_entry") and v is not None:
-                nk = k.replace("_entry","_name")
-                entry_map.setdefault(v, r.get(nk) or str(v))
-    return entry_map
-
-def fetch_entries_from_standings(league_id, sleep=0.05):
+    return {entry_id: entry.name for entry_id, entry in league_entries(matches).items()}
+
+def fetch_entries_from_standings(league_id):
     """Fallback method to get entry map from standings if H2H results don't contain entry IDs"""
-    page = 1
     entries = {}
-    while True:
-        url = f"{base_url}leagues-classic-standings/league/{league_id}/?page={page}"
-        r = requests.get(url, timeout=10)
-        if r.status_code != 200:
-            break
-        data = r.json()
-        results = data.get("standings", {}).get("results") or data.get("results") or []
-        for item in results:
-            eid = item.get("entry") or item.get("entry_id") or item.get("id")
-            name = item.get("player_name") or item.get("entry_name") or item.get("player")
-            if eid is not None:
-                entries.setdefault(eid, name or str(eid))
-        if not data.get("standings", {}).get("has_next") and not data.get("has_next"):
-            break
-        page += 1
-        time.sleep(sleep)
+    pages = paginate(
+        lambda page: get_json(f"leagues-classic-standings/league/{league_id}/", params={"page": page}),
+        has_next=lambda data: data["standings"]["has_next"]
+    )
+    try:
+        for data in pages:
+            for item in data["standings"]["results"]:
+                entries.setdefault(item["entry"], item.get("player_name") or item.get("entry_name") or str(item["entry"]))
+    except requests.RequestException as e:
+        print(f"Failed to fetch standings: {e}")
     return entries
 
-def load_cache(cache_file):
-    """Load element points cache from disk"""
-    if os.path.exists(cache_file):
+def fetch_team_history(entry_map):
+    """Season summary per team and gameweek, one entry/{id}/history/ request per team"""
+    rows = []
+    for entry_id, entry_name in entry_map.items():
         try:
-            with open(cache_file, 'r') as f:
-                cache = json.load(f)
-                # Convert string keys back to int
-                return {int(k): v for k, v in cache.items()}
-        except Exception:
-            pass
-    return {}
-
-def save_cache(cache, cache_file):
-    """Save element points cache to disk"""
-    try:
-        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
-        with open(cache_file, 'w') as f:
-            json.dump(cache, f)
-    except Exception:
-        pass
-
-def get_existing_gameweeks(lineup_file_path):
-    """Determine which gameweeks already have complete lineup data"""
-    existing_gws = set()
-    if not lineup_file_path.exists():
-        return existing_gws
-    
-    try:
-        df = pd.read_excel(lineup_file_path)
-        if df.empty:
-            return existing_gws
-        
-        # Check for GW columns that have complete data (non-null players and scores)
-        for col in df.columns:
-            if col.startswith('GW ') and col.endswith(' Player'):
-                gw_num = int(col.split()[1])
-                score_col = f'GW {gw_num} Score'
-                
-                # Check if this GW has complete data (players and scores filled)
-                if (score_col in df.columns and 
-                    df[col].notna().sum() > 0 and 
-                    df[score_col].notna().sum() > 0):
-                    existing_gws.add(gw_num)
-                    
-        print(f"Found existing complete data for gameweeks: {sorted(existing_gws)}")
-        return existing_gws
-        
-    except Exception as e:
-        print(f"Could not read existing lineup data: {e}")
-        return existing_gws
-
-def get_element_points_for_gw(element_id, gw, cache, timeout=10, sleep=0.1):
-    """Fetch element-summary for element_id and cache mapping gw -> points"""
-    if element_id is None:
-        return None
-    if element_id in cache:
-        return cache[element_id].get(gw)
-    # fetch and build mapping
-    url = f"{base_url}element-summary/{element_id}/"
-    try:
-        print(f"Fetching data for player {element_id}...")
-        r = requests.get(url, timeout=timeout)
-        if r.status_code == 429:  # Rate limited
-            print("Rate limited, waiting 5 seconds...")
-            time.sleep(5)
-            r = requests.get(url, timeout=timeout)
-        if r.status_code != 200:
-            print(f"Failed to fetch player {element_id}: Status {r.status_code}")
-            cache[element_id] = {}
-            return None
-        j = r.json()
-        history = j.get("history", []) or j.get("history_past", []) or []
-        gw_map = {}
-        for h in history:
-            round_num = h.get("round") or h.get("event") or h.get("fixture")
-            try:
-                round_num = int(round_num)
-            except Exception:
-                continue
-            pts = h.get("points", h.get("total_points"))
-            try:
-                pts = int(pts) if pts is not None else 0
-            except Exception:
-                try:
-                    pts = int(float(pts))
-                except Exception:
-                    pts = 0
-            gw_map[round_num] = pts
-        cache[element_id] = gw_map
-        time.sleep(sleep)  # Increased default sleep
-        return gw_map.get(gw)
-    except Exception as e:
-        print(f"Error fetching player {element_id}: {e}")
-        cache[element_id] = {}
-        return None
-
-def build_lineup_data(entry_map, most_recent_week, max_positions=15, sleep=0.15, timeout=10, start_team=0, batch_size=5, existing_gameweeks=None):
-    """Build detailed lineup data for all teams and weeks with optimized processing"""
-    if existing_gameweeks is None:
-        existing_gameweeks = set()
-    
-    missing_gws = [gw for gw in range(1, most_recent_week + 1) if gw not in existing_gameweeks]
-    
-    if not missing_gws:
-        print("All gameweek data is already complete!")
-        return {}, {}
-    
-    print(f"Building lineup data for {len(entry_map)} teams...")
-    print(f"Missing gameweeks to fetch: {missing_gws}")
+            history = get_json(f"entry/{entry_id}/history/")
+        except requests.RequestException as e:
+            print(f"Failed to fetch history for {entry_name}: {e}")
+            continue
+        chips = {c.get("event"): c.get("name") for c in history.get("chips", [])}
+        for h in history.get("current", []):
+            rows.append({
+                "Entry ID": entry_id,
+                "Team Name": entry_name,
+                "GW": h["event"],
+                "Points": h.get("points"),
+                "Transfers Cost": h.get("event_transfers_cost"),
+                "Net Points": h.get("points", 0) - h.get("event_transfers_cost", 0),
+                "Bench Points": h.get("points_on_bench"),
+                "Transfers": h.get("event_transfers"),
+                "Chip": chips.get(h["event"], ""),
+                "Total Points": h.get("total_points"),
+                "Overall Rank": h.get("overall_rank"),
+                "Team Value": h.get("value", 0) / 10,
+                "Bank": h.get("bank", 0) / 10,
+            })
+    print(f"Fetched team history for {len({r['Entry ID'] for r in rows})}/{len(entry_map)} teams")
+    return pd.DataFrame(rows)
+
+def history_scores(history_df):
+    """(entry_id, gw) -> score after transfer costs, from the team history"""
+    if history_df.empty:
+        return {}
+    return dict(zip(zip(history_df["Entry ID"], history_df["GW"]), history_df["Net Points"]))
+
+def h2h_scores(matches):
+    """(entry_id, gw) -> score from the H2H results, to check the computed scores against"""
+    return {
+        (entry.id, match.event): points
+        for match in matches if match.played
+        for entry, points, _, _ in match.sides() if entry.id is not None
+    }
+
+def build_lineup_data(store, entry_map, most_recent_week, max_positions=15, sleep=0.15, start_team=0, batch_size=5, expected_scores=None, live=None):
+    """Fetch the picks missing from the squad store for a batch of teams and build their lineup data
+
+    Auto-subs and the effective captain come from the squads and each
+    gameweek's event/{gw}/live/ points and minutes, with fixtures still to
+    be played keeping their starters. live (gw -> fetch_live() result) is
+    shared across batches so each gameweek is fetched once per run.
+    expected_scores ((entry_id, gw) -> score, see h2h_scores) reports any
+    newly fetched week whose computed score differs.
+    """
+    if live is None:
+        live = {}
+    gws = list(range(1, most_recent_week + 1))
+    entry_items = list(entry_map.items())
+    batch_entries = entry_items[start_team:start_team + batch_size]
+    missing = store.missing([entry_id for entry_id, _ in batch_entries], most_recent_week)
+
     print(f"Processing teams {start_team+1}-{min(start_team+batch_size, len(entry_map))} of {len(entry_map)}")
     
-    # Load persistent cache
-    cache_file = Path("data") / "element_points_cache.json"
-    element_points_cache = load_cache(cache_file)
-    print(f"Loaded cache with {len(element_points_cache)} players")
-    
     # Get bootstrap data for player names and positions
     print("Fetching player data...")
-    bs = requests.get(f"{base_url}bootstrap-static/", timeout=timeout).json()
+    bs = fetch_bootstrap()
     element_map = {e['id']: e.get('web_name', '') for e in bs.get('elements', [])}
     positions_map = {p['id']: p['singular_name_short'] for p in bs.get('element_types', [])}
     element_pos_map = {e['id']: positions_map.get(e.get('element_type'), '') for e in bs.get('elements', [])}
+    element_type_map = {e['id']: e.get('element_type', 0) for e in bs.get('elements', [])}
+    element_club_map = {e['id']: e.get('team') for e in bs.get('elements', [])}
+    final = final_events()
 
     # storage: data[entry_id]['pos_{pos}'][f"GW {gw} Player"] = {name, element_id, position_type, status, score, is_captain, is_vice}
     data = {}
-    
-    # Process only a batch of teams
-    entry_items = list(entry_map.items())
-    batch_entries = entry_items[start_team:start_team + batch_size]
-    
     for entry_id, entry_name in batch_entries:
         data[entry_id] = {"entry_name": entry_name}
         for pos in range(1, max_positions + 1):
             data[entry_id].setdefault(f"pos_{pos}", {})
 
-    # collect picks and per-player gw scores/captain flags
+    # fetch only the picks the store does not have yet
     total_teams = len(batch_entries)
     for i, (entry_id, entry_name) in enumerate(batch_entries):
-        print(f"\n[{i+1}/{total_teams}] Processing team: {entry_name}")
+        print(f"\n[{i+1}/{total_teams}] Processing team: {entry_name} ({len(missing[entry_id])} gameweeks to fetch)")
         
-        # Get all picks for this team first to identify unique players
-        team_players = set()
-        team_picks = {}
-        
-        for gw in missing_gws:
-            picks_url = f"{base_url}entry/{entry_id}/event/{gw}/picks/"
+        for gw in missing[entry_id]:
             try:
-                r = requests.get(picks_url, timeout=timeout)
-                if r.status_code == 429:
-                    print("Rate limited, waiting...")
-                    time.sleep(5)
-                    r = requests.get(picks_url, timeout=timeout)
-                    
-                if r.status_code != 200:
-                    print(f"Failed to get picks for GW{gw}: Status {r.status_code}")
-                    time.sleep(sleep)
-                    continue
-                    
-                j = r.json()
-                picks = j.get("picks") or []
-                team_picks[gw] = picks
-                
-                # Collect unique players for this team
-                for p in picks:
-                    element = p.get("element") or p.get("element_id") or p.get("player")
-                    if element:
-                        team_players.add(element)
-                        
+                store.add(entry_name, fetch_lineup(entry_id, gw))
                 time.sleep(sleep * 0.5)  # Reduced sleep for picks
                 
             except Exception as exc:
                 print(f"Request error entry {entry_id} GW{gw}: {exc}")
                 time.sleep(sleep)
                 continue
-        
-        print(f"Found {len(team_players)} unique players, fetching scores...")
-        
-        # Pre-fetch all player data for this team
-        players_fetched = 0
-        for element_id in team_players:
-            if element_id not in element_points_cache:
-                players_fetched += 1
-                if players_fetched % 10 == 0:
-                    print(f"Fetched {players_fetched}/{len(team_players) - len([p for p in team_players if p in element_points_cache])} players...")
-                get_element_points_for_gw(element_id, 1, element_points_cache, timeout=timeout, sleep=sleep)
-        
-        # Process all gameweeks for this team (only missing gameweeks)
-        for gw in missing_gws:
-            picks = team_picks.get(gw, [])
-            for p in picks:
-                element = p.get("element") or p.get("element_id") or p.get("player")
-                pos = p.get("position") or p.get("position_in_squad") or p.get("slot")
-                try:
-                    pos = int(pos)
-                except Exception:
-                    continue
-                if not (1 <= pos <= max_positions):
-                    continue
-
-                name = element_map.get(element, "") if element is not None else ""
-                multiplier = p.get("multiplier", 1) or 1
-                is_start = isinstance(pos, int) and pos <= 11
-                status = "Starter" if is_start else "Bench"
-
-                # detect captain/vice flags
-                is_captain = bool(p.get("is_captain") or p.get("is_captain", False))
-                is_vice = bool(p.get("is_vice_captain") or p.get("is_vice_captain", False))
-                # fallback: if no flags but multiplier==2 assume captain
-                if not (is_captain or is_vice) and multiplier == 2:
-                    is_captain = True
-
-                # Use cached data
-                base_pts = element_points_cache.get(element, {}).get(gw)
-                scored_pts = None
-                if base_pts is None:
-                    scored_pts = None
+
+    # Auto-subs and effective captains, all teams of the batch at once per gameweek
+    print("\nResolving auto-subs and effective captains...")
+    actual_captain_by_entry = {eid: {} for eid in data.keys()}
+    mismatches = []
+    for gw in gws:
+        entries = [eid for eid in data if gw in store.gameweeks(eid)]
+        if not entries:
+            continue
+        lineups = [store.lineup(eid, gw) for eid in entries]
+        squads = Squads(lineups, element_type_map)
+        if gw not in live:
+            live[gw] = fetch_live(gw, element_club_map, final=gw in final)
+        points, minutes, finished = live[gw]
+        resolved = resolve(squads, points, minutes, finished)
+
+        for t, entry_id in enumerate(entries):
+            captain = int(resolved["captain"][t])
+            actual_captain_by_entry[entry_id][gw] = captain or None
+            for pick in lineups[t].picks:
+                element = pick.element
+                pos = pick.position
+                slot = pos - 1
+                if resolved["subs_in"][t, slot]:
+                    status = "Auto Sub In"
+                elif resolved["subs_out"][t, slot]:
+                    status = "Auto Sub Out"
                 else:
-                    try:
-                        scored_pts = int(base_pts) * int(multiplier)
-                    except Exception:
-                        try:
-                            scored_pts = int(float(base_pts) * float(multiplier))
-                        except Exception:
-                            scored_pts = None
-
-                data[entry_id].setdefault(f"pos_{pos}", {})[f"GW {gw} Player"] = {
-                    "name": name,
+                    status = "Starter" if pos <= 11 else "Bench"
+                data[entry_id][f"pos_{pos}"][f"GW {gw} Player"] = {
+                    "name": element_map.get(element, ""),
                     "element_id": element,
                     "position_type": element_pos_map.get(element, ""),
                     "status": status,
-                    "score": scored_pts,
-                    "is_captain": is_captain,
-                    "is_vice": is_vice
+                    # Points as counted: 0 on the bench, doubled or tripled for the effective captain
+                    "score": int(resolved["points"][t, slot] * resolved["multipliers"][t, slot]) if element in points else None,
+                    "is_captain": pick.is_captain,
+                    "is_vice": pick.is_vice
                 }
-        
-        # Save cache periodically
-        if (i + 1) % 2 == 0:
-            save_cache(element_points_cache, cache_file)
-            print(f"Cache saved with {len(element_points_cache)} players")
 
-    # determine actual captain used per team per GW (only for missing gameweeks)
-    print("\nCalculating effective captains...")
-    actual_captain_by_entry = {eid: {} for eid in data.keys()}
-    for entry_id, info in data.items():
-        for gw in missing_gws:
-            picks = []
-            for pos in range(1, max_positions + 1):
-                cell = info.get(f"pos_{pos}", {}).get(f"GW {gw} Player")
-                if isinstance(cell, dict):
-                    picks.append(cell)
-            # find declared captain and vice
-            declared_cap = next((p for p in picks if p.get("is_captain")), None)
-            declared_vc = next((p for p in picks if p.get("is_vice")), None)
-            
-            def positive_score(p):
-                sc = p.get("score")
-                try:
-                    return sc is not None and int(sc) != 0
-                except Exception:
-                    return False
-            
-            chosen = None
-            if declared_cap and positive_score(declared_cap):
-                chosen = declared_cap.get("element_id")
-            elif declared_cap and not positive_score(declared_cap):
-                if declared_vc and positive_score(declared_vc):
-                    chosen = declared_vc.get("element_id")
-                else:
-                    chosen = None
-            else:
-                chosen = None
-            actual_captain_by_entry[entry_id][gw] = chosen
-    
-    # Final cache save
-    save_cache(element_points_cache, cache_file)
-    print(f"Final cache saved with {len(element_points_cache)} players")
+        if expected_scores:
+            checked = [t for t, eid in enumerate(entries) if gw in missing[eid]]
+            mismatches += cross_check(
+                [f"{entry_map[entries[t]]} GW{gw}" for t in checked],
+                resolved["scores"][checked],
+                [expected_scores.get((entries[t], gw)) for t in checked]
+            )
+    for label, computed, expected in mismatches:
+        print(f"Score check: {label} computed {computed}, H2H has {expected}")
 
     return data, actual_captain_by_entry
 
@@ -730,36 +532,32 @@ def main():
         return final_df
     
     print(f"Found {len(entry_map)} teams for lineup data collection")
+
+    # Team-level gameweek summaries: one request per team for the whole season
+    team_history = fetch_team_history(entry_map)
+    if not team_history.empty:
+        save_to_excel(team_history, Path("data") / "team_history.xlsx")
     print(f"Collecting lineup data through gameweek {most_recent_week}")
     
-    # Check for existing data and determine what gameweeks need to be fetched
+    # Squads fetched on earlier runs are kept in the delta-encoded store; only new gameweeks are fetched
     existing_lineup_file = Path("data") / "lineup_data.xlsx"
-    existing_gameweeks = get_existing_gameweeks(existing_lineup_file)
-    
-    # If no missing data, skip lineup collection entirely
-    missing_gws = [gw for gw in range(1, most_recent_week + 1) if gw not in existing_gameweeks]
-    if not missing_gws and existing_lineup_file.exists():
+    store = SquadStore(SQUAD_FILE)
+    missing = store.missing(entry_map, most_recent_week)
+    if not any(missing.values()) and existing_lineup_file.exists():
         print("All lineup data is already up to date! Skipping lineup collection.")
         return final_df
-    
-    # Check for existing partial team data
-    start_team = 0
-    if existing_lineup_file.exists():
-        try:
-            existing_df = pd.read_excel(existing_lineup_file)
-            processed_teams = existing_df['Team Name'].nunique() if not existing_df.empty else 0
-            # Only resume from partial teams if we're fetching missing gameweeks for existing teams
-            if len(existing_gameweeks) > 0 and len(missing_gws) < most_recent_week:
-                start_team = processed_teams
-                print(f"Found existing data for {processed_teams} teams")
-        except Exception:
-            print("Could not read existing lineup data, starting from beginning")
-    
+    print(f"Gameweeks to fetch: {sum(len(gws) for gws in missing.values())} across {sum(1 for gws in missing.values() if gws)} teams")
+
+    # Computed team scores are checked against these; the history also covers weeks without an H2H fixture
+    expected_scores = {**h2h_scores(base_results), **history_scores(team_history)}
+
     # Process teams in batches
     batch_size = 3  # Process 3 teams at a time
+    start_team = 0
     total_teams = len(entry_map)
     all_lineup_data = {}
     all_captain_data = {}
+    live = {}
     
     while start_team < total_teams:
         remaining_teams = total_teams - start_team
@@ -770,13 +568,15 @@ def main():
         try:
             # Build detailed lineup data for this batch
             lineup_data, actual_captain_by_entry = build_lineup_data(
+                store,
                 entry_map, 
                 most_recent_week,
-                existing_gameweeks=existing_gameweeks,
+                expected_scores=expected_scores,
                 max_positions=15,
                 sleep=0.15,  # Increased sleep for better rate limiting
                 start_team=start_team,
-                batch_size=current_batch_size
+                batch_size=current_batch_size,
+                live=live
             )
             
             # Merge with existing data
@@ -784,13 +584,7 @@ def main():
             all_captain_data.update(actual_captain_by_entry)
             
             # Save incremental progress
-            lineup_df = save_lineup_data_to_excel(
-                all_lineup_data, 
-                all_captain_data, 
-                entry_map, 
-                most_recent_week, 
-                existing_lineup_file
-            )
+            store.save()
             
             print(f"Batch complete. Total processed: {len(all_lineup_data)}/{total_teams} teams")
             
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import requests
+from build_cache import CACHE_DIR
+
+# Shared client for the FPL API.
+#
+# Requests go through one keep-alive session and are spaced at least
+# MIN_INTERVAL apart, across threads. A 429 is retried after the server's
+# Retry-After (or an increasing back-off) instead of failing the run.
+#
+# get_json_cached() keeps responses on disk under .build_cache/api/, shared
+# by every script and restored in CI along with the rest of the build
+# cache. A cached response is revalidated with If-None-Match /
+# If-Modified-Since when the server sent an ETag or Last-Modified, and a
+# 304 reuses it. Responses the caller marks immutable are returned without
+# a request at all.
+#
+# paginate() walks a paged endpoint with up to PAGE_WINDOW requests in
+# flight, still spaced by the shared rate limit, and yields the pages in
+# order. Walking a long list is then bound by the rate limit rather than
+# by one round-trip per page.
+#
+# FPL_API_BASE_URL points every script at another server, such as the
+# stand-in in fpl_standin.py. With FPL_API_RECORD set to a directory, each
+# successful response is also saved there in the layout the stand-in
+# serves (see response_file).
+
+BASE_URL = os.environ.get("FPL_API_BASE_URL", "https://fantasy.premierleague.com/api/").rstrip("/") + "/"
+RECORD_DIR = os.environ.get("FPL_API_RECORD")
+MIN_INTERVAL = 0.15
+MAX_RETRIES = 4
+TIMEOUT = 10
+RESPONSE_DIR = CACHE_DIR / "api"
+PAGE_WINDOW = 4
+
+session = requests.Session()
+_lock = threading.Lock()
+_last_request = 0.0
+
+def _wait_turn():
+    """Block until MIN_INTERVAL has passed since the previous request"""
+    global _last_request
+    with _lock:
+        delay = _last_request + MIN_INTERVAL - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        _last_request = time.monotonic()
+
+def retry_after(response, attempt):
+    """Seconds to wait before retrying a rate-limited request"""
+    try:
+        return max(float(response.headers.get("Retry-After", "")), 1.0)
+    except ValueError:
+        return 5.0 * 2 ** attempt
+
+def response_file(root, path, params=None):
+    """Where a response lives in a recording: <root>/<path>/<sorted query or 'index'>.json"""
+    query = "&".join(f"{key}={value}" for key, value in sorted((params or {}).items()))
+    return Path(root) / path.strip("/") / f"{query or 'index'}.json"
+
+def record(path, params, response):
+    target = response_file(RECORD_DIR, path, params)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(response.content)
+
+def _get(path, params=None, timeout=TIMEOUT, headers=None):
+    """GET an API path (relative to BASE_URL), retrying rate limits; raises on failure"""
+    for attempt in range(MAX_RETRIES + 1):
+        _wait_turn()
+        response = session.get(BASE_URL + path, params=params, timeout=timeout, headers=headers)
+        if response.status_code == 429 and attempt < MAX_RETRIES:
+            wait = retry_after(response, attempt)
+            print(f"Rate limited on {path}, waiting {wait:.0f} seconds...")
+            time.sleep(wait)
+            continue
+        response.raise_for_status()
+        if RECORD_DIR and response.status_code == 200:
+            record(path, params, response)
+        return response
+
+def get_json(path, params=None, timeout=TIMEOUT):
+    """GET an API path (relative to BASE_URL) and decode the JSON; raises on failure"""
+    return _get(path, params, timeout).json()
+
+def cache_path(path, params=None):
+    key = json.dumps([BASE_URL, path, sorted((params or {}).items())], default=str)
+    return RESPONSE_DIR / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.json"
+
+def get_json_cached(path, params=None, immutable=None, timeout=TIMEOUT):
+    """get_json() through the on-disk response cache
+
+    immutable(data) says whether a response can never change again; such
+    responses are served from disk from then on. While recording, every
+    request goes to the server so the recording is complete.
+    """
+    if RECORD_DIR:
+        return get_json(path, params, timeout)
+    cached_file = cache_path(path, params)
+    try:
+        cached = json.loads(cached_file.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        cached = None
+    if cached and cached["immutable"]:
+        return cached["data"]
+
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    response = _get(path, params, timeout, headers)
+    if response.status_code == 304 and cached:
+        data = cached["data"]
+    else:
+        data = response.json()
+    entry = {
+        "path": path,
+        "etag": response.headers.get("ETag") or (cached or {}).get("etag"),
+        "last_modified": response.headers.get("Last-Modified") or (cached or {}).get("last_modified"),
+        "immutable": bool(immutable and immutable(data)),
+        "data": data,
+    }
+    if response.status_code != 304 or entry["immutable"] != cached["immutable"]:
+        RESPONSE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cached_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(entry, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(cached_file)
+    return data
+
+def paginate(get_page, has_next=lambda data: data['has_next'], window=PAGE_WINDOW):
+    """Yield get_page(1), get_page(2), ... in order until has_next() is false
+
+    The next pages are requested while earlier ones are still in flight, so
+    up to `window` pages past the end may be requested; their responses
+    (or errors) are discarded.
+    """
+    with ThreadPoolExecutor(max_workers=window) as pool:
+        pending = {}
+        next_page = 1
+        page = 1
+        try:
+            while True:
+                while len(pending) < window:
+                    pending[next_page] = pool.submit(get_page, next_page)
+                    next_page += 1
+                data = pending.pop(page).result()
+                yield data
+                if not has_next(data):
+                    return
+                page += 1
+        finally:
+            for future in pending.values():
+                future.cancel()
@@ -0,0 +1,200 @@
+from functools import lru_cache
+from fpl_api import get_json, get_json_cached, paginate
+
+# The FPL API's objects, parsed once into slotted classes.
+#
+# Each from_api() reads the raw JSON the one way the API actually spells it,
+# so the scripts work with attributes instead of dict lookups with fallback
+# keys. __slots__ keeps a season's worth of picks small: a Pick is a fixed
+# set of five fields rather than a dict per player per week.
+
+SQUAD_SIZE = 15
+STARTERS = 11
+
+class Entry:
+    """A team in the league"""
+    __slots__ = ('id', 'name', 'player_name')
+
+    def __init__(self, id, name, player_name=''):
+        self.id = id
+        self.name = name
+        self.player_name = player_name
+
+class Match:
+    """One H2H fixture of the league, from leagues-h2h-matches/"""
+    __slots__ = ('event', 'entry_1', 'entry_2', 'points_1', 'points_2')
+
+    def __init__(self, event, entry_1, entry_2, points_1, points_2):
+        self.event = event
+        self.entry_1 = entry_1
+        self.entry_2 = entry_2
+        self.points_1 = points_1
+        self.points_2 = points_2
+
+    @classmethod
+    def from_api(cls, result):
+        return cls(
+            result['event'],
+            Entry(result.get('entry_1_entry'), result['entry_1_name'], result.get('entry_1_player_name', '')),
+            Entry(result.get('entry_2_entry'), result['entry_2_name'], result.get('entry_2_player_name', '')),
+            result.get('entry_1_points', 0),
+            result.get('entry_2_points', 0),
+        )
+
+    @property
+    def played(self):
+        """False for fixtures still to come, which the API lists with 0-0 scores"""
+        return bool(self.points_1 or self.points_2)
+
+    def sides(self):
+        """(entry, points, opponent, opponent points) for both teams"""
+        return [(self.entry_1, self.points_1, self.entry_2, self.points_2),
+                (self.entry_2, self.points_2, self.entry_1, self.points_1)]
+
+class Pick:
+    """One of a squad's 15 players for a gameweek"""
+    __slots__ = ('element', 'position', 'multiplier', 'is_captain', 'is_vice')
+
+    def __init__(self, element, position, multiplier=1, is_captain=False, is_vice=False):
+        self.element = element
+        self.position = position
+        self.multiplier = multiplier
+        self.is_captain = is_captain
+        self.is_vice = is_vice
+
+    @classmethod
+    def from_api(cls, pick):
+        return cls(pick['element'], pick['position'], pick.get('multiplier', 1),
+                   bool(pick.get('is_captain')), bool(pick.get('is_vice_captain')))
+
+    @property
+    def starting(self):
+        return self.position <= STARTERS
+
+class Lineup:
+    """A team's squad for one gameweek, from entry/{id}/event/{gw}/picks/"""
+    __slots__ = ('entry', 'gw', 'picks', 'chip', 'transfers_cost')
+
+    def __init__(self, entry, gw, picks, chip=None, transfers_cost=0):
+        self.entry = entry
+        self.gw = gw
+        self.picks = sorted(picks, key=lambda p: p.position)
+        self.chip = chip
+        self.transfers_cost = transfers_cost
+
+    @classmethod
+    def from_api(cls, entry, gw, payload):
+        return cls(
+            entry, gw,
+            [Pick.from_api(p) for p in payload.get('picks') or []],
+            payload.get('active_chip'),
+            (payload.get('entry_history') or {}).get('event_transfers_cost', 0) or 0,
+        )
+
+    @property
+    def captain(self):
+        return next((p for p in self.picks if p.is_captain), None)
+
+    @property
+    def vice(self):
+        return next((p for p in self.picks if p.is_vice), None)
+
+    def elements(self):
+        return [p.element for p in self.picks]
+
+@lru_cache(maxsize=None)
+def fetch_bootstrap():
+    """bootstrap-static/ (every player, club and gameweek), requested once per process
+
+    It is several megabytes and the fetch scripts all run in the one
+    pipeline process, so they share this copy; pass it down rather than
+    requesting it again.
+    """
+    return get_json("bootstrap-static/")
+
+def final_events():
+    """Gameweeks whose scores can no longer change (finished and data checked)"""
+    events = fetch_bootstrap()['events']
+    return {e['id'] for e in events if e.get('finished') and e.get('data_checked')}
+
+def fetch_matches(league_id, event=None):
+    """Every H2H fixture of the league, or only one gameweek's
+
+    Pages are requested concurrently (fpl_api.paginate) through the on-disk
+    response cache. A page whose fixtures all belong to final gameweeks
+    never changes again, so a weekly run only requests the pages holding
+    the latest and upcoming gameweeks. Those cached pages keep the team
+    names of the day they were fetched; see current_names.
+    """
+    final = final_events()
+
+    def finished_page(data):
+        return bool(data['results']) and all(r['event'] in final for r in data['results'])
+
+    def get_page(page):
+        params = {'page': page}
+        if event is not None:
+            params['event'] = event
+        return get_json_cached(f"leagues-h2h-matches/league/{league_id}/", params=params, immutable=finished_page)
+
+    return current_names([Match.from_api(r) for data in paginate(get_page) for r in data['results']])
+
+def current_names(matches):
+    """Give each entry, in every fixture, the name from its latest fixture
+
+    A team renamed mid-season appears under its old name on the pages
+    cached before the rename. Its latest fixture is in a gameweek that is
+    not final yet, so its page was just requested and has the current name.
+    """
+    latest = {}
+    for match in sorted(matches, key=lambda m: m.event):
+        for entry in (match.entry_1, match.entry_2):
+            if entry.id is not None:
+                latest[entry.id] = entry
+    for match in matches:
+        match.entry_1 = latest.get(match.entry_1.id, match.entry_1)
+        match.entry_2 = latest.get(match.entry_2.id, match.entry_2)
+    return matches
+
+def league_entries(matches):
+    """entry ID -> Entry for every team with an ID in the fixtures"""
+    entries = {}
+    for match in matches:
+        for entry in (match.entry_1, match.entry_2):
+            if entry.id is not None:
+                entries.setdefault(entry.id, entry)
+    return entries
+
+def unfinished_clubs(fixtures):
+    """Clubs with a fixture in fixtures/?event={gw} that is not over yet"""
+    clubs = set()
+    for f in fixtures:
+        if not f.get('finished_provisional'):
+            clubs.update((f['team_h'], f['team_a']))
+    return clubs
+
+def fetch_live(gw, element_clubs, final=False, fixtures=None):
+    """The gameweek so far: element -> points, element -> minutes, element -> all his fixtures over
+
+    element_clubs: element -> club, from bootstrap-static/. This covers
+    every player as the gameweek is played, so it is what the autosubs
+    engine is given. A final gameweek (see final_events) no longer
+    changes: its responses are fetched once and then read from the
+    response cache. A caller that already has fixtures/?event={gw} (the
+    live poll needs it for its timing) passes it in.
+    """
+    if final:
+        fetch = lambda path, params=None: get_json_cached(path, params, immutable=lambda data: True)
+    else:
+        fetch = get_json
+    elements = fetch(f"event/{gw}/live/")['elements']
+    if fixtures is None:
+        fixtures = fetch("fixtures/", params={'event': gw})
+    unfinished = unfinished_clubs(fixtures)
+    points = {e['id']: e['stats']['total_points'] for e in elements}
+    minutes = {e['id']: e['stats'].get('minutes', 0) for e in elements}
+    finished = {e: element_clubs.get(e) not in unfinished for e in points}
+    return points, minutes, finished
+
+def fetch_lineup(entry, gw):
+    return Lineup.from_api(entry, gw, get_json(f"entry/{entry}/event/{gw}/picks/"))
@@ -0,0 +1,146 @@
+import argparse
+import hashlib
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from fpl_api import response_file
+
+# Local stand-in for the FPL API: python scripts/fpl_standin.py --data DIR
+#
+# Serves the responses in DIR, laid out as fpl_api.response_file() names
+# them. Such a directory comes from a real run with FPL_API_RECORD=DIR
+# (bootstrap-static, H2H pages, standings, picks, element summaries, live
+# event data, entry histories), or from a synthetic league generator
+# writing the same layout. Point the scripts at it with
+#
+#     FPL_API_BASE_URL=http://127.0.0.1:8765/api/ python scripts/pipeline.py weekly
+#
+# Responses carry an ETag and answer If-None-Match with a 304. To make
+# benchmarks of the concurrency and rate limiting reproducible, the server
+# can add a fixed latency plus seeded jitter, and can answer with 429
+# (with a Retry-After header) above a requests-per-second limit or at
+# random.
+
+PREFIX = "/api/"
+
+class StandIn:
+    """Response lookup plus the latency and throttling settings"""
+
+    def __init__(self, data_dir, latency=0.0, jitter=0.0, rate_limit=None, throttle_rate=0.0,
+                 retry_after=1, seed=0):
+        self.data_dir = data_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.recent = deque()
+        self.stats = {"requests": 0, "served": 0, "not_modified": 0, "throttled": 0, "missing": 0}
+
+    def delay(self):
+        with self.lock:
+            return self.latency + self.random.uniform(0, self.jitter)
+
+    def throttled(self):
+        """Whether this request gets a 429: over the per-second limit, or by chance"""
+        now = time.monotonic()
+        with self.lock:
+            self.stats["requests"] += 1
+            while self.recent and now - self.recent[0] >= 1.0:
+                self.recent.popleft()
+            if self.rate_limit is not None and len(self.recent) >= self.rate_limit:
+                return True
+            if self.throttle_rate and self.random.random() < self.throttle_rate:
+                return True
+            self.recent.append(now)
+            return False
+
+    def count(self, outcome):
+        with self.lock:
+            self.stats[outcome] += 1
+
+class Handler(BaseHTTPRequestHandler):
+    standin = None
+
+    def do_GET(self):
+        standin = self.standin
+        time.sleep(standin.delay())
+        url = urlsplit(self.path)
+        if standin.throttled():
+            standin.count("throttled")
+            self.send_response(429)
+            if standin.retry_after:
+                self.send_header("Retry-After", str(standin.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        path = url.path[len(PREFIX):] if url.path.startswith(PREFIX) else url.path.lstrip("/")
+        try:
+            body = response_file(standin.data_dir, path, dict(parse_qsl(url.query))).read_bytes()
+        except (FileNotFoundError, IsADirectoryError):
+            standin.count("missing")
+            self.send_error(404)
+            return
+
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            standin.count("not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        standin.count("served")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start(standin, host="127.0.0.1", port=0):
+    """Serve in a background thread; returns the server (its base URL is base_url(server))"""
+    handler = type("StandInHandler", (Handler,), {"standin": standin})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def base_url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}{PREFIX}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded FPL API responses locally")
+    parser.add_argument("--data", required=True, help="directory of recorded or synthetic responses")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds, seeded")
+    parser.add_argument("--rate-limit", type=int, help="requests per second before answering 429")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered 429 at random")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with a 429 (0: none)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    standin = StandIn(args.data, args.latency, args.jitter, args.rate_limit, args.throttle_rate,
+                      args.retry_after, args.seed)
+    server = start(standin, args.host, args.port)
+    print(f"Serving {args.data} at {base_url(server)} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(", ".join(f"{key}: {value}" for key, value in standin.stats.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import re
+import pandas as pd
+from matchups import build_matchups, flag
+
+# Compact JSON data bundle for the browser: site/data/league.json.
+#
+# Standings, per-week results, the latest matchups, the current lineups, MoTM
+# period tables and the MoTM schedule in one file that both page layouts
+# fetch and render with templates/league.js. Teams and players are stored
+# once and referenced by their index; every other string goes through a
+# string table, so repeated names and results cost a small integer each.
+# Row-shaped sections carry a "fields" list naming their columns.
+#
+# Bump BUNDLE_VERSION whenever the layout changes so older cached copies are
+# not misread by a newer renderer.
+
+BUNDLE_VERSION = 2
+BUNDLE_PATH = "data/league.json"
+
+# The MoTM period shown on the main pages and the weeks shown next to it
+CURRENT_MOTM = 8
+MOTM_RESULT_WEEKS = [25]
+MOTM_FIXTURE_WEEKS = [26, 27, 28]
+
+class StringTable:
+    """Interns strings so each distinct value is stored once"""
+
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+
+    def add(self, value):
+        """Index of a string in the table (None stays None)"""
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return None
+        value = str(value)
+        if value not in self.index:
+            self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return self.index[value]
+
+def number(value):
+    """JSON number for a cell: ints stay ints, missing values become None"""
+    if value is None or pd.isna(value):
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def week_numbers(df, suffix):
+    """Sorted gameweeks that have a 'Wk N <suffix>' column"""
+    weeks = []
+    for col in df.columns:
+        match = re.fullmatch(r'Wk (\d+) ' + re.escape(suffix), col)
+        if match:
+            weeks.append(int(match.group(1)))
+    return sorted(weeks)
+
+def motm_periods(df):
+    """MoTM period numbers present in the league results"""
+    periods = []
+    for col in df.columns:
+        match = re.fullmatch(r'MoTM (\d+) Points', col)
+        if match and f'MoTM {match.group(1)} Score' in df.columns:
+            periods.append(int(match.group(1)))
+    return sorted(periods)
+
+def schedule_table(schedule_df, most_recent_week, strings):
+    """MoTM schedule as display columns, rows and the current period's row"""
+    if schedule_df is None:
+        return None
+    schedule_df = schedule_df.copy()
+    # MoTM numbers as clean text (no .0), a missing number as 'None'
+    if 'MoTM' in schedule_df.columns:
+        schedule_df['MoTM'] = schedule_df['MoTM'].apply(
+            lambda x: str(int(x)) if pd.notna(x) and isinstance(x, float) and x == int(x) else ('None' if pd.isna(x) else str(x))
+        )
+    if 'Winner' in schedule_df.columns:
+        schedule_df['Winner'] = schedule_df['Winner'].fillna('TBD')
+
+    current = None
+    rows = []
+    for i, row in enumerate(schedule_df.to_dict('records')):
+        try:
+            first_gw = int(row['First Gameweek'].replace('GW ', ''))
+            last_gw = int(row['Last Gameweek'].replace('GW ', ''))
+            if first_gw <= most_recent_week <= last_gw:
+                current = i
+        except (KeyError, ValueError, AttributeError):
+            pass
+        # Every cell is shown as text, so all of them go through the string table
+        rows.append([strings.add(v if isinstance(v, str) else number(v)) for v in row.values()])
+    return {
+        'columns': [strings.add(col) for col in schedule_df.columns],
+        'rows': rows,
+        'current': current,
+    }
+
+def build_bundle(df, lineup_df, lineup_gw, schedule_df, most_recent_week):
+    """The data bundle as a JSON-serializable dict"""
+    strings = StringTable()
+
+    # Teams in sheet order; teams only found in the lineups are appended
+    teams = []
+    team_index = {}
+    def team(name):
+        if name is None or (not isinstance(name, str) and pd.isna(name)):
+            return None
+        if name not in team_index:
+            team_index[name] = len(teams)
+            teams.append([strings.add(name), None])
+        return team_index[name]
+
+    records = df.to_dict('records')
+    for row in records:
+        teams[team(row['Team Name'])][1] = strings.add(row.get('Owner Name'))
+
+    standing_cols = ['Rank', 'Total Score', 'Total Points', 'W', 'D', 'L', 'Total FFPts']
+    standings = {
+        'fields': ['team', 'rank', 'total_score', 'total_points', 'w', 'd', 'l', 'total_ffpts'],
+        'rows': [[team(row['Team Name'])] + [number(row.get(col)) for col in standing_cols] for row in records],
+    }
+
+    # Every week with fixtures, so upcoming opponents are available too
+    results = {'fields': ['team', 'score', 'opponent', 'opponent_score', 'result', 'points'], 'weeks': {}}
+    for gw in week_numbers(df, 'Opponent Team'):
+        results['weeks'][str(gw)] = [
+            [
+                team(row['Team Name']),
+                number(row.get(f'Wk {gw} Score')),
+                team(row.get(f'Wk {gw} Opponent Team')),
+                number(row.get(f'Wk {gw} Opponent Score')),
+                strings.add(row.get(f'Wk {gw} Result')),
+                number(row.get(f'Wk {gw} Points')),
+            ]
+            for row in records
+        ]
+
+    # Pairings of the latest week, closest margin first
+    matchup_data = build_matchups(df, most_recent_week) if most_recent_week > 0 else None
+    matchups = {
+        'gw': most_recent_week,
+        'pairs': [[team(m['team_name']), team(m['opponent_name'])] for m in matchup_data or []],
+    }
+
+    periods = {}
+    for n in motm_periods(df):
+        score = df[f'MoTM {n} Score']
+        if f'MoTM {n} Score Behind' in df.columns:
+            behind = df[f'MoTM {n} Score Behind']
+        else:
+            behind = score.max() - score
+        periods[str(n)] = [
+            [team(name), number(points), number(s), number(b)]
+            for name, points, s, b in zip(df['Team Name'], df[f'MoTM {n} Points'], score, behind)
+        ]
+    motm = {
+        'current': CURRENT_MOTM,
+        'result_weeks': MOTM_RESULT_WEEKS,
+        'fixture_weeks': MOTM_FIXTURE_WEEKS,
+        'fields': ['team', 'points', 'score', 'score_behind'],
+        'periods': periods,
+    }
+
+    players = []
+    player_index = {}
+    lineups = {'gw': lineup_gw, 'fields': ['team', 'player', 'position_number', 'score', 'multiplier', 'is_captain', 'is_vice', 'sub_in', 'sub_out'], 'rows': []}
+    if lineup_df is not None and lineup_gw:
+        score_col = f'GW {lineup_gw} Score'
+        for row in lineup_df.to_dict('records'):
+            player = row.get('Player')
+            if pd.isna(player) or player == '':
+                continue
+            key = (str(player), str(row['Position Type']))
+            if key not in player_index:
+                player_index[key] = len(players)
+                players.append([strings.add(key[0]), strings.add(key[1])])
+            lineups['rows'].append([
+                team(row['Team Name']),
+                player_index[key],
+                number(row['Position']),
+                number(row.get(score_col)),
+                number(row.get('Multiplier')),
+                int(bool(row['Is Captain'])) if pd.notna(row['Is Captain']) else 0,
+                int(bool(row['Is Vice Captain'])) if pd.notna(row['Is Vice Captain']) else 0,
+                flag(row.get('Auto Sub In')),
+                flag(row.get('Auto Sub Out')),
+            ])
+
+    return {
+        'version': BUNDLE_VERSION,
+        'week': most_recent_week,
+        'teams': teams,
+        'players': players,
+        'standings': standings,
+        'results': results,
+        'matchups': matchups,
+        'lineups': lineups,
+        'motm': motm,
+        'motm_schedule': schedule_table(schedule_df, most_recent_week, strings),
+        'strings': strings.strings,
+    }
+
+def revision_url(data):
+    """The bundle's URL for these contents"""
+    # A new query string per revision keeps HTTP caches from serving a stale copy
+    return f"{BUNDLE_PATH}?v={hashlib.sha256(data).hexdigest()[:12]}"
+
+def write_bundle(bundle, out_dir):
+    """Write the bundle under out_dir, replacing any previous one at once; returns its revision URL"""
+    data = json.dumps(bundle, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+    path = out_dir / BUNDLE_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+    return revision_url(data)
+
+def bundle_url(out_dir):
+    """Revision URL of the bundle written under out_dir"""
+    return revision_url((out_dir / BUNDLE_PATH).read_bytes())
@@ -0,0 +1,226 @@
+import argparse
+import re
+import time
+import pandas as pd
+import requests
+import build_mobile_site
+import build_site
+from autosubs import Squads, resolve
+from build_cache import FragmentCache
+from build_league_data import load_schedule, write_league_data
+from fetch_fpl import calculate_rankings
+from fpl_api import get_json
+from fpl_models import fetch_bootstrap, fetch_lineup, fetch_live, fetch_matches
+from pipeline import BUILDERS as PIPELINE_BUILDERS, forget_stages
+
+# Live gameweek mode: python scripts/live_gameweek.py [--once]
+#
+# Keeps the matchups and standings of the two main pages up to date with
+# provisional scores while a gameweek is being played. Picks are fetched
+# once per team at start, since they are locked for the gameweek. After that
+# each poll is two requests: fixtures/?event={gw}, which also times the
+# polls, and event/{gw}/live/, read by fpl_models.fetch_live as in the
+# weekly fetch.
+# Polls run every LIVE_INTERVAL while a match is in play. Between matches
+# they wait for the next kickoff, and they slow to BONUS_INTERVAL while
+# bonus points are provisional. The loop ends once every fixture is final;
+# the weekly update then records the official scores.
+#
+# Between polls only the picked players' points, minutes and fixture state
+# are compared. When nothing changed nothing is rendered. Otherwise the
+# teams owning a changed player are re-scored together by the autosubs
+# engine, provisional auto-subs and captaincy included, and every other
+# team keeps its rows and score from the last poll. The league data bundle and the matchup cards are
+# re-rendered from the provisional results; every other section comes from
+# the fragment cache. Those two sections are then dropped from the
+# cache (and the builders from the pipeline state), so the next regular
+# build renders them from the real data again.
+
+LEAGUE_ID = 388845  # 2025/26 season
+LEAGUE_FILE = build_site.LEAGUE_FILE
+PAGES = [(build_site, "farmers-desktop"), (build_mobile_site, "farmers-mobile")]
+
+LIVE_INTERVAL = 60      # a match is in play
+BONUS_INTERVAL = 300    # matches over, bonus points not yet confirmed
+MAX_SLEEP = 1800        # longest wait for the next kickoff
+KICKOFF_LEAD = 60       # wake up this long before a kickoff
+
+WEEK_COL = re.compile(r'Wk \d+ ')
+
+def current_gameweek(bootstrap):
+    """The gameweek being played, or the next one before it starts"""
+    events = bootstrap['events']
+    current = next((e['id'] for e in events if e.get('is_current')), None)
+    return current or next((e['id'] for e in events if e.get('is_next')), 1)
+
+def load_players(bootstrap):
+    """element -> name, position, position type and club"""
+    positions = {t['id']: t['singular_name_short'] for t in bootstrap['element_types']}
+    return {
+        e['id']: {'name': e.get('web_name', ''), 'position': positions.get(e.get('element_type'), ''),
+                  'type': e.get('element_type', 0), 'team': e.get('team')}
+        for e in bootstrap['elements']
+    }
+
+def load_matches(gw):
+    """The gameweek's H2H fixtures between two teams (fpl_models.Match)"""
+    return [m for m in fetch_matches(LEAGUE_ID, event=gw) if m.entry_1.id and m.entry_2.id]
+
+def load_lineups(entries, gw):
+    """Each entry's fpl_models.Lineup for the gameweek"""
+    return {entry: fetch_lineup(entry, gw) for entry in entries}
+
+def score_teams(entries, lineups, element_types, players, points, minutes, finished):
+    """Lineup rows with live points and the multipliers in effect, and score per entry"""
+    resolved = resolve(Squads([lineups[entry] for entry in entries], element_types), points, minutes, finished)
+    rows_by_entry, scores = {}, {}
+    for t, entry in enumerate(entries):
+        rows = []
+        for pick in lineups[entry].picks:
+            player = players.get(pick.element, {})
+            rows.append({
+                'element_id': pick.element,
+                'position': pick.position,
+                'name': player.get('name', f"Player {pick.element}"),
+                'position_type': player.get('position', ''),
+                'score': points.get(pick.element, 0),
+                'is_captain': pick.is_captain,
+                'is_vice': pick.is_vice,
+                'multiplier': int(resolved['multipliers'][t, pick.position - 1]),
+                'sub_in': bool(resolved['subs_in'][t, pick.position - 1]),
+                'sub_out': bool(resolved['subs_out'][t, pick.position - 1]),
+            })
+        rows_by_entry[entry] = rows
+        scores[entry] = int(resolved['scores'][t])
+    return rows_by_entry, scores
+
+def provisional_results(base_df, gw, scores, matches):
+    """League results with the gameweek's provisional scores, re-ranked"""
+    cols = ['Team Name', 'Owner Name'] + [c for c in base_df.columns if WEEK_COL.match(c)]
+    df = base_df[cols].copy()
+    opponents = {}
+    for match in matches:
+        opponents[match.entry_1.name], opponents[match.entry_2.name] = match.entry_2.name, match.entry_1.name
+
+    teams = [t for t in df['Team Name'] if t in opponents]
+    score = {t: scores[t] for t in teams}
+    opponent_score = {t: scores[opponents[t]] for t in teams}
+    result = {t: 'W' if score[t] > opponent_score[t] else 'L' if score[t] < opponent_score[t] else 'D' for t in teams}
+    points = {t: {'W': 3, 'D': 1, 'L': 0}[r] for t, r in result.items()}
+    # Teams without a fixture this week keep what the sheet has
+    for col, values in (('Score', score), ('Opponent Team', opponents), ('Opponent Score', opponent_score),
+                        ('Result', result), ('Points', points)):
+        col = f'Wk {gw} {col}'
+        previous = df[col] if col in df.columns else None
+        df[col] = df['Team Name'].map(values)
+        if previous is not None:
+            df[col] = df[col].where(df['Team Name'].isin(teams), previous)
+    return calculate_rankings(df.copy(), gw)
+
+def lineup_frame(lineups, names, gw):
+    """Lineups in the layout fetch_current_gw.py writes to lineup_data.xlsx"""
+    rows = []
+    for entry, lineup in lineups.items():
+        for r in lineup:
+            rows.append({
+                'Team Name': names[entry],
+                'Position': r['position'],
+                'Player': r['name'],
+                'Position Type': r['position_type'],
+                f'GW {gw} Score': r['score'],
+                'Is Captain': r['is_captain'],
+                'Is Vice Captain': r['is_vice'],
+                'Multiplier': r['multiplier'],
+                'Auto Sub In': r['sub_in'],
+                'Auto Sub Out': r['sub_out'],
+            })
+    return pd.DataFrame(rows)
+
+def render(df, lineup_df, gw):
+    """Re-render the matchups and standings of both main pages"""
+    write_league_data(df, lineup_df, load_schedule(), gw)
+    for module, page in PAGES:
+        cache = FragmentCache(page, module.__file__)
+        league = [LEAGUE_FILE]
+        context = dict(cache.section("summary", league, lambda: module.render_summary(module.load_league_data())))
+        base_week = context['most_recent_week']
+        context.update(cache.section("charts", league, lambda: module.render_charts(module.load_league_data(), base_week)))
+        context.update(module.render_league_data(lineup_df))
+        context.update(module.render_matchups(df, lineup_df, gw, context['league_data_url']))
+        context['most_recent_week'] = gw
+        cache.invalidate("league_data", "matchups")
+        cache.save()
+        module.write_output(context)
+    forget_stages(*PIPELINE_BUILDERS)
+
+def poll_interval(fixtures, now):
+    """Seconds until the next poll, or None once every fixture is final"""
+    if any(f.get('started') and not f.get('finished_provisional') for f in fixtures):
+        return LIVE_INTERVAL
+    kickoffs = [pd.Timestamp(f['kickoff_time']) for f in fixtures if not f.get('started') and f.get('kickoff_time')]
+    if kickoffs:
+        wait = (min(kickoffs) - now).total_seconds() - KICKOFF_LEAD
+        return min(max(wait, LIVE_INTERVAL), MAX_SLEEP)
+    if not all(f.get('finished') for f in fixtures):
+        return BONUS_INTERVAL
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep the main pages up to date with provisional scores")
+    parser.add_argument("--once", action="store_true", help="poll and render once, then exit")
+    args = parser.parse_args()
+
+    bootstrap = fetch_bootstrap()
+    gw = current_gameweek(bootstrap)
+    players = load_players(bootstrap)
+    matches = load_matches(gw)
+    names = {entry.id: entry.name for match in matches for entry in (match.entry_1, match.entry_2)}
+    lineups = load_lineups(names, gw)
+    base_df = pd.read_excel(LEAGUE_FILE, sheet_name="Sheet1")
+
+    element_types = {e: p['type'] for e, p in players.items()}
+    element_clubs = {e: p['team'] for e, p in players.items()}
+    owners = {}
+    for entry, lineup in lineups.items():
+        for element in lineup.elements():
+            owners.setdefault(element, set()).add(entry)
+    picked = set(owners)
+    print(f"Live GW {gw}: {len(names)} teams, {len(picked)} players picked")
+
+    previous = {}
+    rows, scores = {}, {}
+    while True:
+        try:
+            fixtures = get_json("fixtures/", params={'event': gw})
+            points, minutes, finished = fetch_live(gw, element_clubs, fixtures=fixtures)
+        except requests.RequestException as e:
+            print(f"Poll failed ({e}); retrying in {LIVE_INTERVAL}s")
+            time.sleep(LIVE_INTERVAL)
+            continue
+
+        # A finished match can trigger an auto-sub or hand the armband to the vice, so that counts as a change
+        state = {e: (points.get(e, 0), minutes.get(e, 0) > 0, finished.get(e, True)) for e in picked}
+        changed = [e for e in state if previous.get(e) != state[e]]
+        if changed:
+            changed_owners = set().union(*(owners[e] for e in changed))
+            affected = [entry for entry in lineups if entry in changed_owners]
+            new_rows, new_scores = score_teams(affected, lineups, element_types, players, points, minutes, finished)
+            rows.update(new_rows)
+            scores.update(new_scores)
+            df = provisional_results(base_df, gw, {names[entry]: score for entry, score in scores.items()}, matches)
+            render(df, lineup_frame(rows, names, gw), gw)
+            print(f"{pd.Timestamp.now('UTC'):%H:%M:%S} {len(changed)} player(s) changed, {len(affected)} team(s) re-scored")
+            previous = state
+        else:
+            print(f"{pd.Timestamp.now('UTC'):%H:%M:%S} no changes")
+
+        interval = poll_interval(fixtures, pd.Timestamp.now('UTC'))
+        if args.once:
+            break
+        if interval is None:
+            print(f"All GW {gw} fixtures are final; run the weekly update for the official scores")
+            break
+        time.sleep(interval)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import json
+import pandas as pd
+
+# Shared matchup construction for build_site.py and build_mobile_site.py.
+# Teams and lineups are indexed once so pairing fixtures is a single pass
+# over the league instead of a DataFrame scan per matchup.
+
+def index_lineups(lineup_df, gw):
+    """Index lineup rows by team for a gameweek: {team_name: [player, ...]}"""
+    lineups = {}
+    if lineup_df is None or gw is None:
+        return lineups
+
+    score_col = f'GW {gw} Score'
+    has_score = score_col in lineup_df.columns
+    for row in lineup_df.to_dict('records'):
+        player = row.get('Player')
+        if pd.isna(player) or player == '':
+            continue
+        score = row[score_col] if has_score and pd.notna(row[score_col]) else 0
+        lineups.setdefault(row['Team Name'], []).append({
+            'name': player,
+            'position': row['Position Type'],  # Use Position Type for grouping
+            'position_number': row['Position'],  # Keep numeric position for ordering
+            'score': score,
+            'is_captain': row['Is Captain'] if pd.notna(row['Is Captain']) else False,
+            'is_vice': row['Is Vice Captain'] if pd.notna(row['Is Vice Captain']) else False,
+            # As resolved by the autosubs engine when the lineups were fetched
+            'multiplier': multiplier(row),
+            'sub_in': flag(row.get('Auto Sub In')),
+            'sub_out': flag(row.get('Auto Sub Out')),
+        })
+    return lineups
+
+def multiplier(row):
+    """The multiplier in effect; sheets without one count the starters once"""
+    value = row.get('Multiplier')
+    if value is None or pd.isna(value):
+        return 1 if row['Position'] <= 11 else 0
+    return int(value)
+
+def flag(value):
+    """0/1 for a boolean cell that may be missing or empty"""
+    return int(bool(value)) if value is not None and pd.notna(value) else 0
+
+def team_record(row, with_parens=True):
+    """Format a team's W-D-L record from a league row"""
+    record = f"{int(row.get('W', 0))}-{int(row.get('D', 0))}-{int(row.get('L', 0))}"
+    return f"({record})" if with_parens else record
+
+def build_matchups(df, gw, with_parens=True):
+    """Pair each team with its opponent for a gameweek, closest margins first"""
+    opponent_team_col = f'Wk {gw} Opponent Team'
+    opponent_score_col = f'Wk {gw} Opponent Score'
+    team_score_col = f'Wk {gw} Score'
+    team_result_col = f'Wk {gw} Result'
+
+    if not all(col in df.columns for col in [opponent_team_col, opponent_score_col, team_score_col]):
+        return None
+
+    has_result = team_result_col in df.columns
+    teams = {row['Team Name']: row for row in df.to_dict('records')}
+
+    processed_teams = set()
+    matchup_data = []
+    for team_name, team_row in teams.items():
+        if team_name in processed_teams:
+            continue
+
+        opponent_name = team_row[opponent_team_col]
+        team_score = team_row[team_score_col] if pd.notna(team_row[team_score_col]) else 0
+        opponent_score = team_row[opponent_score_col] if pd.notna(team_row[opponent_score_col]) else 0
+        team_result = team_row[team_result_col] if has_result else 'TBD'
+
+        opponent_row = teams.get(opponent_name)
+        opponent_result = 'TBD'
+        opponent_record = "(0-0-0)" if with_parens else "0-0-0"
+        if opponent_row is not None:
+            if has_result:
+                opponent_result = opponent_row[team_result_col]
+            opponent_record = team_record(opponent_row, with_parens)
+
+        matchup_data.append({
+            'team_name': team_name,
+            'team_score': team_score,
+            'team_result': team_result,
+            'team_record': team_record(team_row, with_parens),
+            'opponent_name': opponent_name,
+            'opponent_score': opponent_score,
+            'opponent_result': opponent_result,
+            'opponent_record': opponent_record,
+            'score_diff': abs(team_score - opponent_score)
+        })
+
+        # Mark both teams as processed
+        processed_teams.add(team_name)
+        processed_teams.add(opponent_name)
+
+    # Sort matchups by score difference (smallest margin first)
+    matchup_data.sort(key=lambda x: x['score_diff'])
+    return matchup_data
+
+# Lineups are published as one compact JSON file per gameweek and rendered in
+# the browser only when a matchup card is expanded (see templates/lineups.js).
+LINEUP_FIELDS = ['name', 'position', 'position_number', 'score', 'is_captain', 'is_vice', 'multiplier', 'sub_in', 'sub_out']
+
+def lineups_json_path(gw):
+    """Site-relative path of a gameweek's lineup JSON"""
+    return f"data/lineups-gw{gw}.json"
+
+def write_lineups_json(lineups, gw, out_dir):
+    """Write {team: [player rows]} for a gameweek as compact JSON under out_dir"""
+    teams = {}
+    for team_name, lineup in lineups.items():
+        rows = []
+        for player in lineup:
+            score = player['score']
+            rows.append([
+                str(player['name']),
+                str(player['position']),
+                int(player['position_number']),
+                int(score) if float(score).is_integer() else float(score),
+                int(bool(player['is_captain'])),
+                int(bool(player['is_vice'])),
+                int(player['multiplier']),
+                int(player['sub_in']),
+                int(player['sub_out']),
+            ])
+        teams[str(team_name)] = rows
+    path = out_dir / lineups_json_path(gw)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Replaced in one step, so the archive and team pages never read half a file
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({'gw': gw, 'fields': LINEUP_FIELDS, 'teams': teams}, ensure_ascii=False, separators=(',', ':')), encoding="utf-8")
+    tmp.replace(path)
+    return path
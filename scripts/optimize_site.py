@@ -0,0 +1,172 @@
+import hashlib
+import re
+from pathlib import Path
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+# Post-build optimization stage for site/.
+#
+# Run after the page builders. It minifies every page, including those in
+# site/teams/ and site/archive/, moves the inline <style>/<script> blocks
+# from each <head> into content-hashed files under site/assets/ (blocks
+# shared by several pages, such as every team page's CSS and lineups.js,
+# become one file, linked relative to each page) and converts the logo
+# to WebP/AVIF. Because asset names
+# only change when their content does, repeat visitors only re-download
+# what changed week to week. The .gz/.br copies are written later, by
+# compress_site.py.
+#
+# Pillow is optional; without it the logo conversion is skipped.
+
+ROOT = Path(__file__).resolve().parents[1]
+SITE_DIR = ROOT / "site"
+ASSET_DIR = SITE_DIR / "assets"
+
+LOGO_FILE = "logo.PNG"
+# Blocks smaller than this stay inline; a request costs more than the bytes
+MIN_EXTRACT_BYTES = 1024
+
+HEAD_RE = re.compile(r"<head>.*?</head>", re.S | re.I)
+STYLE_RE = re.compile(r"<style>(.*?)</style>", re.S)
+SCRIPT_RE = re.compile(r"<script>(.*?)</script>", re.S)
+ASSET_REF_RE = re.compile(r'assets/([0-9a-f]{12}\.(?:css|js))')
+LOGO_IMG_RE = re.compile(r'<img src="' + re.escape(LOGO_FILE) + r'"[^>]*>')
+
+def minify_css(css):
+    """Strip comments and redundant whitespace from CSS"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+def minify_js(js):
+    """Drop indentation, blank lines and whole-line comments from JS
+
+    Deliberately conservative: line breaks are kept so automatic semicolon
+    insertion behaves exactly as before.
+    """
+    lines = (line.strip() for line in js.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+def minify_html(page):
+    """Remove comments and collapse whitespace between lines"""
+    page = re.sub(r"<!--(?!\[if).*?-->", "", page, flags=re.S)
+    return re.sub(r"\s*\n\s*", "\n", page).strip() + "\n"
+
+def write_asset(content, ext, written):
+    """Write a content-hashed asset and return its site-relative URL"""
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+    name = f"{digest}{ext}"
+    if name not in written:
+        ASSET_DIR.mkdir(exist_ok=True)
+        (ASSET_DIR / name).write_text(content, encoding="utf-8")
+        written.add(name)
+    return f"assets/{name}"
+
+def extract_head_assets(page, written, prefix=""):
+    """Move large inline head blocks into shared hashed files
+
+    prefix leads from the page's directory back to site/, e.g. "../".
+    """
+    head = HEAD_RE.search(page)
+    if not head:
+        return page
+
+    def style(match):
+        css = minify_css(match.group(1))
+        if len(css) < MIN_EXTRACT_BYTES:
+            return f"<style>{css}</style>"
+        return f'<link rel="stylesheet" href="{prefix}{write_asset(css, ".css", written)}">'
+
+    def script(match):
+        js = minify_js(match.group(1))
+        if len(js) < MIN_EXTRACT_BYTES:
+            return f"<script>\n{js}\n</script>"
+        return f'<script src="{prefix}{write_asset(js, ".js", written)}"></script>'
+
+    new_head = SCRIPT_RE.sub(script, STYLE_RE.sub(style, head.group(0)))
+    return page[:head.start()] + new_head + page[head.end():]
+
+def convert_logo():
+    """Write modern-format copies of the logo; return {mime type: file name}"""
+    logo = SITE_DIR / LOGO_FILE
+    if Image is None or not logo.exists():
+        return {}
+
+    variants = {}
+    png_size = logo.stat().st_size
+    with Image.open(logo) as image:
+        image.load()
+        for fmt, mime in (("AVIF", "image/avif"), ("WEBP", "image/webp")):
+            if not features.check(fmt.lower()):
+                continue
+            out = logo.with_suffix("." + fmt.lower())
+            image.save(out, fmt, quality=80)
+            # Only advertise a variant that actually saves bytes
+            if out.stat().st_size < png_size:
+                variants[mime] = out.name
+            else:
+                out.unlink()
+    return variants
+
+def use_logo_variants(page, variants):
+    """Wrap the logo <img> in a <picture> offering the converted formats"""
+    if not variants or "<picture>" in page:
+        return page
+    sources = "".join(f'<source srcset="{name}" type="{mime}">' for mime, name in variants.items())
+    return LOGO_IMG_RE.sub(lambda m: f"<picture>{sources}{m.group(0)}</picture>", page)
+
+def remove_unused_assets():
+    """Delete assets no page links to any more
+
+    Pages an earlier run already optimized keep linking to that run's
+    assets, so only assets no page references are stale. Extracted scripts
+    count as referrers too: the mobile page's lazy loader names plotly.js.
+    """
+    if not ASSET_DIR.exists():
+        return
+    used = set()
+    for page_path in SITE_DIR.rglob("*.html"):
+        used.update(ASSET_REF_RE.findall(page_path.read_text(encoding="utf-8")))
+    for name in [name for name in used if name.endswith(".js")]:
+        path = ASSET_DIR / name
+        if path.exists():
+            used.update(ASSET_REF_RE.findall(path.read_text(encoding="utf-8")))
+    for path in ASSET_DIR.iterdir():
+        # compress_site.py keeps the .gz/.br copies of assets still in use
+        if path.name not in used and path.with_suffix("").name not in used:
+            path.unlink()
+
+def main():
+    before = {path: path.stat().st_size for path in SITE_DIR.rglob("*") if path.is_file()}
+
+    written = set()
+    variants = convert_logo()
+    for page_path in sorted(SITE_DIR.rglob("*.html")):
+        prefix = "../" * (len(page_path.relative_to(SITE_DIR).parts) - 1)
+        page = page_path.read_text(encoding="utf-8")
+        page = extract_head_assets(page, written, prefix)
+        page = use_logo_variants(page, variants)
+        page_path.write_text(minify_html(page), encoding="utf-8")
+
+    remove_unused_assets()
+
+    print(f"{'File':<40} {'Before':>9} {'After':>9} {'Saved':>7}")
+    total_before = total_after = 0
+    for path in sorted(p for p in SITE_DIR.rglob("*") if p.is_file() and p.suffix not in (".gz", ".br")):
+        size = path.stat().st_size
+        original = before.get(path)
+        saved = f"{100 * (1 - size / original):.0f}%" if original else "new"
+        print(f"{str(path.relative_to(SITE_DIR)):<40} {original or 0:>9,} {size:>9,} {saved:>7}")
+        total_before += original or 0
+        total_after += size
+    print(f"{'Total':<40} {total_before:>9,} {total_after:>9,}")
+    if Image is None:
+        print("Pillow not installed; skipped logo conversion")
+
+if __name__ == "__main__":
+    main()
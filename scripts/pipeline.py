@@ -0,0 +1,270 @@
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from build_cache import CACHE_DIR, code_fingerprint, file_digest
+from profiling import profiler
+
+# The weekly update as one command: python scripts/pipeline.py [target|stage ...]
+#
+# Every fetch and build script is a stage of a dependency graph and runs in
+# this one process, so pandas and plotly are imported once. Stages whose
+# dependencies have finished run concurrently on a thread pool. A stage's
+# output lines are prefixed with its name. A table of per-stage timings is
+# printed at the end.
+#
+# Stages with declared inputs are skipped when the inputs hash the same as
+# on their last successful run and their outputs still exist; --force runs
+# them anyway. The fetch stages read the FPL API, and the post-build stages
+# rewrite site/ in place, so those always run. State is kept in
+# .build_cache/pipeline.json, which CI restores along with the fragment cache.
+#
+# "after" only orders stages: a stage waits for the ones listed there when
+# they are part of the same run, but never pulls them in.
+
+ROOT = Path(__file__).resolve().parents[1]
+STATE_FILE = CACHE_DIR / "pipeline.json"
+
+# Everything a site builder reads besides its own data files
+BUILD_CODE = ["scripts/*.py", "templates/*"]
+LEAGUE_DATA = ["data/league_results.xlsx", "data/lineup_data.xlsx", "data/motm_schedule.xlsx"]
+BUILDERS = ["build_league_data", "build_site", "build_mobile_site", "build_archive", "build_team_pages"]
+LEAGUE_BUNDLE = ["site/data/league.json"]
+
+class Stage:
+    """One script of the pipeline, run by calling its main()"""
+
+    def __init__(self, name, after=(), inputs=None, outputs=()):
+        self.name = name
+        self.after = list(after)
+        # None: always run; otherwise glob patterns relative to the repo root
+        self.inputs = inputs
+        self.outputs = list(outputs)
+
+    def fingerprint(self):
+        """Hash of the stage's input files, or None if it always runs"""
+        if self.inputs is None:
+            return None
+        parts = [code_fingerprint(ROOT / "scripts" / f"{self.name}.py")]
+        for pattern in self.inputs:
+            for path in sorted(ROOT.glob(pattern)) or [ROOT / pattern]:
+                parts.append(f"{path.relative_to(ROOT).as_posix()}={file_digest(path)}")
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def missing_outputs(self):
+        return [pattern for pattern in self.outputs if not any(ROOT.glob(pattern))]
+
+STAGES = [
+    Stage("fetch_fpl", outputs=["data/league_results.xlsx"]),
+    # Both fetchers write data/lineup_data.xlsx, so they never overlap
+    Stage("fetch_current_gw", after=["fetch_fpl"], outputs=["data/lineup_data.xlsx"]),
+    # The data bundle and lineup JSON both main pages and the archive and team pages read
+    Stage(
+        "build_league_data", after=["fetch_fpl", "fetch_current_gw"],
+        inputs=LEAGUE_DATA + BUILD_CODE,
+        outputs=LEAGUE_BUNDLE
+    ),
+    Stage(
+        "build_site", after=["fetch_fpl", "fetch_current_gw", "build_league_data"],
+        inputs=LEAGUE_DATA + LEAGUE_BUNDLE + BUILD_CODE,
+        outputs=["site/farmers-desktop.html"]
+    ),
+    Stage(
+        "build_mobile_site", after=["fetch_fpl", "fetch_current_gw", "build_league_data"],
+        inputs=LEAGUE_DATA + LEAGUE_BUNDLE + BUILD_CODE,
+        outputs=["site/farmers-mobile.html"]
+    ),
+    Stage(
+        "build_archive", after=["fetch_current_gw", "build_league_data"],
+        inputs=["data/league_results.xlsx", "data/gameweek_status.json", "site/data/lineups-gw*.json"] + BUILD_CODE,
+        outputs=["site/archive/index.html"]
+    ),
+    Stage(
+        "build_team_pages", after=["fetch_fpl", "build_league_data"],
+        inputs=["data/league_results.xlsx", "data/motm_schedule.xlsx", "site/data/lineups-gw*.json"] + BUILD_CODE,
+        outputs=["site/teams/index.html"]
+    ),
+    Stage("optimize_site", after=BUILDERS),
+    Stage("build_service_worker", after=BUILDERS + ["optimize_site"], outputs=["site/sw.js"]),
+    # Last to write to site/, so the .gz/.br copies match sw.js and the manifest
+    Stage("compress_site", after=BUILDERS + ["optimize_site", "build_service_worker"]),
+    Stage("check_budgets", after=BUILDERS + ["optimize_site", "build_service_worker", "compress_site"]),
+]
+STAGE_INDEX = {stage.name: stage for stage in STAGES}
+
+TARGETS = {
+    # What weekly_update.bat publishes; pages are committed unminified
+    "weekly": ["fetch_fpl", "fetch_current_gw"] + BUILDERS + ["build_service_worker"],
+    # What the Pages workflow deploys
+    "deploy": ["fetch_fpl", "fetch_current_gw"] + BUILDERS + ["optimize_site", "build_service_worker", "compress_site", "check_budgets"],
+    # Rebuild from the data already on disk
+    "site": BUILDERS + ["build_service_worker"],
+}
+
+class StageOutput:
+    """sys.stdout replacement that prefixes each line with the stage printing it"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def write(self, text):
+        name = getattr(self.local, "name", None)
+        if name is None:
+            return self.stream.write(text)
+        self.local.pending = getattr(self.local, "pending", "") + text
+        *lines, self.local.pending = self.local.pending.split("\n")
+        if lines:
+            with self.lock:
+                self.stream.write("".join(f"[{name}] {line}\n" for line in lines))
+                self.stream.flush()
+        return len(text)
+
+    def flush(self):
+        name = getattr(self.local, "name", None)
+        if name is not None and getattr(self.local, "pending", ""):
+            self.write("\n")
+        self.stream.flush()
+
+    def __getattr__(self, attr):
+        return getattr(self.stream, attr)
+
+def run_stage(stage, output):
+    """Run a stage's main() in this thread; returns (status, seconds, error)"""
+    output.local.name = stage.name
+    start = time.perf_counter()
+    try:
+        importlib.import_module(stage.name).main()
+        missing = stage.missing_outputs()
+        if missing:
+            return "failed", time.perf_counter() - start, f"did not write {', '.join(missing)}"
+        return "ran", time.perf_counter() - start, None
+    except SystemExit as e:
+        if e.code in (None, 0):
+            return "ran", time.perf_counter() - start, None
+        return "failed", time.perf_counter() - start, f"exited with {e.code}"
+    except Exception as e:
+        return "failed", time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    finally:
+        output.flush()
+        output.local.name = None
+
+def load_state():
+    try:
+        return json.loads(STATE_FILE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_state(state):
+    CACHE_DIR.mkdir(exist_ok=True)
+    STATE_FILE.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+
+def forget_stages(*names):
+    """Make the next run re-run stages whose outputs were changed outside the pipeline"""
+    state = load_state()
+    removed = [name for name in names if state.pop(name, None) is not None]
+    if removed:
+        save_state(state)
+
+def selected_stages(names):
+    """Stages for the given targets or stage names, in pipeline order"""
+    wanted = set()
+    for name in names:
+        if name in TARGETS:
+            wanted.update(TARGETS[name])
+        elif name in STAGE_INDEX:
+            wanted.add(name)
+        else:
+            raise SystemExit(f"Unknown target or stage: {name} (targets: {', '.join(TARGETS)})")
+    return [stage for stage in STAGES if stage.name in wanted]
+
+def run(stages, force=False, jobs=4):
+    """Run the stages as their dependencies allow; returns {name: (status, seconds, error)}"""
+    state = load_state()
+    names = {stage.name for stage in stages}
+    waiting = {stage.name: {d for d in stage.after if d in names} for stage in stages}
+    results = {}
+    running = {}
+    output = StageOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            while waiting or running:
+                # Skipping a stage can make others ready, so look again until nothing is
+                ready = [s for s in stages if s.name in waiting and not waiting[s.name]]
+                while ready:
+                    stage = ready.pop(0)
+                    del waiting[stage.name]
+                    fingerprint = stage.fingerprint()
+                    if not force and fingerprint is not None and state.get(stage.name) == fingerprint \
+                            and not stage.missing_outputs():
+                        results[stage.name] = ("skipped", 0.0, None)
+                        print(f"[{stage.name}] inputs unchanged, skipped")
+                        for deps in waiting.values():
+                            deps.discard(stage.name)
+                    else:
+                        print(f"[{stage.name}] started")
+                        running[pool.submit(run_stage, stage, output)] = (stage, fingerprint)
+                    if not ready:
+                        ready = [s for s in stages if s.name in waiting and not waiting[s.name]]
+                if not running:
+                    # Nothing can start: everything left waits on a failed stage
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, fingerprint = running.pop(future)
+                    results[stage.name] = future.result()
+                    status, seconds, error = results[stage.name]
+                    if status == "ran":
+                        print(f"[{stage.name}] finished in {seconds:.1f}s")
+                        if fingerprint is not None:
+                            state[stage.name] = fingerprint
+                        for deps in waiting.values():
+                            deps.discard(stage.name)
+                    else:
+                        print(f"[{stage.name}] FAILED: {error}")
+                        state.pop(stage.name, None)
+    finally:
+        sys.stdout = output.stream
+        save_state(state)
+
+    for name in waiting:
+        results[name] = ("not run", 0.0, "a stage it runs after failed")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch the league data and build the site")
+    parser.add_argument("names", nargs="*", default=["weekly"], metavar="target|stage",
+                        help=f"targets ({', '.join(TARGETS)}) or single stages; default: weekly")
+    parser.add_argument("--force", action="store_true", help="run stages even if their inputs are unchanged")
+    parser.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1), help="stages run at once")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)  # the fetch scripts write to paths relative to the repo root
+    stages = selected_stages(args.names)
+    # The build profiler tracks one page at a time
+    jobs = 1 if profiler.enabled else max(1, args.jobs)
+
+    start = time.perf_counter()
+    results = run(stages, force=args.force, jobs=jobs)
+    total = time.perf_counter() - start
+
+    print(f"\n{'Stage':<24} {'Status':<10} {'Time (s)':>9}")
+    for stage in stages:
+        status, seconds, error = results[stage.name]
+        print(f"{stage.name:<24} {status:<10} {seconds:>9.1f}" + (f"  {error}" if error else ""))
+    print(f"{'Total (wall clock)':<24} {'':<10} {total:>9.1f}")
+
+    if any(status in ("failed", "not run") for status, _, _ in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+import pandas as pd
+
+# Opt-in build profiling for the site builders.
+#
+# Set BUILD_PROFILE=1 to record wall time, peak Python memory (tracemalloc)
+# and output bytes for each build section, or BUILD_PROFILE=cprofile to also
+# dump a cProfile of the whole build. Each run writes
+# .build_profile/<page>.json plus a printed summary; the .prof dump can be
+# read with `python -m pstats .build_profile/<page>.prof`.
+#
+# Sections nest: a workbook loaded while a section renders shows up under
+# that section. Peak memory is measured above the memory in use when the
+# section started. Without BUILD_PROFILE every section() is a no-op.
+
+ROOT = Path(__file__).resolve().parents[1]
+PROFILE_DIR = ROOT / ".build_profile"
+
+class BuildProfiler:
+    """Per-section timings, memory peaks and output sizes for one page build"""
+
+    def __init__(self):
+        self.mode = os.environ.get("BUILD_PROFILE", "").strip().lower()
+        self.enabled = self.mode not in ("", "0", "false", "no")
+        self.page = None
+        self.sections = []
+        self.stack = []
+        self.cprofile = None
+
+    def start(self, page):
+        """Begin profiling a page build (no-op unless enabled)"""
+        if not self.enabled:
+            return
+        # One process may build several pages (scripts/pipeline.py)
+        self.page = page
+        self.sections = []
+        self.stack = []
+        self.cprofile = None
+        self.started = time.perf_counter()
+        tracemalloc.start()
+        if self.mode == "cprofile":
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    @contextmanager
+    def section(self, name):
+        """Time a build section; yields a dict the caller may add output_bytes etc. to"""
+        stats = {}
+        if not self.enabled or self.page is None:
+            yield stats
+            return
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self.stack:
+            self.stack[-1]['peak'] = max(self.stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        entry = {
+            'name': name,
+            'depth': len(self.stack),
+            'parent': self.stack[-1]['name'] if self.stack else None,
+            'start_memory': current,
+            'peak': current,
+        }
+        self.sections.append(entry)
+        self.stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            entry['seconds'] = time.perf_counter() - start
+            entry['peak'] = max(entry['peak'], tracemalloc.get_traced_memory()[1])
+            entry.update(stats)
+            self.stack.pop()
+            if self.stack:
+                self.stack[-1]['peak'] = max(self.stack[-1]['peak'], entry['peak'])
+            tracemalloc.reset_peak()
+
+    def finish(self):
+        """Stop profiling and write the report and summary"""
+        if not self.enabled or self.page is None:
+            return
+        total = time.perf_counter() - self.started
+        peak = max([tracemalloc.get_traced_memory()[1]] + [s['peak'] for s in self.sections])
+        tracemalloc.stop()
+
+        PROFILE_DIR.mkdir(exist_ok=True)
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(PROFILE_DIR / f"{self.page}.prof")
+
+        sections = []
+        for s in self.sections:
+            section = {k: v for k, v in s.items() if k not in ('start_memory', 'peak')}
+            section['peak_bytes'] = s['peak'] - s['start_memory']
+            sections.append(section)
+        report = {
+            'page': self.page,
+            'generated_at': str(pd.Timestamp.now('UTC')),
+            'seconds': total,
+            'peak_bytes': peak,
+            'sections': sections,
+        }
+        report_file = PROFILE_DIR / f"{self.page}.json"
+        report_file.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+        print(f"\nBuild profile for {self.page}")
+        print(f"{'Section':<32} {'Time (ms)':>10} {'Peak (KB)':>10} {'Output (KB)':>12}")
+        for s in sections:
+            label = ("  " * s['depth'] + s['name'] + (" (cached)" if s.get('cached') else ""))[:32]
+            output = f"{s['output_bytes'] / 1024:,.1f}" if 'output_bytes' in s else ""
+            print(f"{label:<32} {s['seconds'] * 1000:>10,.1f} {s['peak_bytes'] / 1024:>10,.0f} {output:>12}")
+        print(f"{'Total':<32} {total * 1000:>10,.1f} {peak / 1024:>10,.0f}")
+        print(f"Wrote {report_file}" + (f" and {self.page}.prof" if self.cprofile is not None else ""))
+
+# Shared by the builders and the modules they use
+profiler = BuildProfiler()
@@ -1,42 +1,15 @@
 import requests
 import json
 import pandas as pd
-
-base_url = "https://fantasy.premierleague.com/api/"
-
-def get_all_league_info(league_id): ## Grabs all pages of history for league
-    page = 1
-    all_results = []
-
-    while True:
-        url = f"{base_url}leagues-h2h-matches/league/{league_id}/?page={page}"
-        response = requests.get(url)
-
-        print(f"Request URL: {url}")
-        print(f"Status Code: {response.status_code}")
-
-        if response.status_code == 200:
-            league_data = response.json()
-            all_results.extend(league_data['results'])
-
-            if not league_data['has_next']:
-                break
-            page += 1
-        else:
-            print("League not found")
-            break
-    return all_results
-
+from fetch_fpl import get_all_league_info, restructure_results
+from fpl_api import get_json
 
 def print_league_info(league_id, page=1):
-    url = f"{base_url}leagues-h2h-matches/league/{league_id}/?page={page}"
-    response = requests.get(url)
-
-    if response.status_code == 200:
-        league_data = response.json()
-        return league_data
-    else:
-        print(f"Failed to fetch data. Status code: {response.status_code}")
+    # Through the shared client, so FPL_API_BASE_URL / FPL_API_RECORD apply here too
+    try:
+        return get_json(f"leagues-h2h-matches/league/{league_id}/", params={'page': page})
+    except requests.RequestException as e:
+        print(f"Failed to fetch data: {e}")
         return None
 
 # Replace with your league ID
@@ -54,81 +27,6 @@ else:
 
 
 
-def restructure_results(results): # Takes League history and restructures it into a DataFrame
-    data = {}
-    max_event = max(result['event'] for result in results)
-    most_recent_week = 0
-
-    for result in results:
-        event = result['event']
-        entry_1 = result['entry_1_name']
-        entry_2 = result['entry_2_name']
-
-        if entry_1 not in data:
-            data[entry_1] = {
-                'Team Name': entry_1,
-                'Owner Name': result.get('entry_1_owner', 'N/A')
-            }
-            for e in range(1, max_event + 1):
-                data[entry_1][f'Wk {e} Score'] = None
-                data[entry_1][f'Wk {e} Opponent Team'] = None
-                data[entry_1][f'Wk {e} Opponent Score'] = None
-                data[entry_1][f'Wk {e} Result'] = None
-                data[entry_1][f'Wk {e} Points'] = None
-                data[entry_1][f'Wk {e} FFPts'] = None
-
-        if entry_2 not in data:
-            data[entry_2] = {
-                'Team Name': entry_2,
-                'Owner Name': result.get('entry_2_owner', 'N/A')
-            }
-            for e in range(1, max_event + 1):
-                data[entry_2][f'Wk {e} Score'] = None
-                data[entry_2][f'Wk {e} Opponent Team'] = None
-                data[entry_2][f'Wk {e} Opponent Score'] = None
-                data[entry_2][f'Wk {e} Result'] = None
-                data[entry_2][f'Wk {e} Points'] = None
-                data[entry_2][f'Wk {e} FFPts'] = None
-
-        if result['entry_1_points'] == 0 and result['entry_2_points'] == 0:
-            # Assume it's a future week
-            if data[entry_1][f'Wk {event} Score'] is None:
-                data[entry_1][f'Wk {event} Score'] = 0
-                data[entry_1][f'Wk {event} Opponent Team'] = entry_2
-                data[entry_1][f'Wk {event} Opponent Score'] = 0
-                data[entry_1][f'Wk {event} Result'] = 'TBD'
-                data[entry_1][f'Wk {event} Points'] = 0
-                data[entry_1][f'Wk {event} FFPts'] = 0
-
-            if data[entry_2][f'Wk {event} Score'] is None:
-                data[entry_2][f'Wk {event} Score'] = 0
-                data[entry_2][f'Wk {event} Opponent Team'] = entry_1
-                data[entry_2][f'Wk {event} Opponent Score'] = 0
-                data[entry_2][f'Wk {event} Result'] = 'TBD'
-                data[entry_2][f'Wk {event} Points'] = 0
-                data[entry_2][f'Wk {event} FFPts'] = 0
-        else:
-            data[entry_1][f'Wk {event} Score'] = result['entry_1_points']
-            data[entry_1][f'Wk {event} Opponent Team'] = entry_2
-            data[entry_1][f'Wk {event} Opponent Score'] = result['entry_2_points']
-            data[entry_1][f'Wk {event} Result'] = 'W' if result['entry_1_points'] > result['entry_2_points'] else 'L' if result['entry_1_points'] < result['entry_2_points'] else 'D'
-            data[entry_1][f'Wk {event} Points'] = 3 if result['entry_1_points'] > result['entry_2_points'] else 1 if result['entry_1_points'] == result['entry_2_points'] else 0
-            # FFPts will be calculated later after all scores are collected
-
-            data[entry_2][f'Wk {event} Score'] = result['entry_2_points']
-            data[entry_2][f'Wk {event} Opponent Team'] = entry_1
-            data[entry_2][f'Wk {event} Opponent Score'] = result['entry_1_points']
-            data[entry_2][f'Wk {event} Result'] = 'W' if result['entry_2_points'] > result['entry_1_points'] else 'L' if result['entry_2_points'] < result['entry_1_points'] else 'D'
-            data[entry_2][f'Wk {event} Points'] = 3 if result['entry_2_points'] > result['entry_1_points'] else 1 if result['entry_2_points'] == result['entry_1_points'] else 0
-            # FFPts will be calculated later after all scores are collected
-            
-            # Update most_recent_week if this event has non-zero scores
-            if result['entry_1_points'] > 0 or result['entry_2_points'] > 0:
-                most_recent_week = max(most_recent_week, event)
-    
-    print(f'Last gameweek with data: Week {most_recent_week}')
-    return data, most_recent_week
-
 def calculate_ffpts(df, most_recent_week):
     """Calculate FFPts for each week based on score rankings"""
     # For each week with actual results (not TBD)
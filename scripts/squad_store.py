@@ -0,0 +1,131 @@
+import json
+from pathlib import Path
+from fpl_models import SQUAD_SIZE, STARTERS, Lineup, Pick
+
+# Delta-encoded squad history: data/squads.json
+#
+# Each team's first stored gameweek holds its full 15-man squad in pick
+# order. Every later gameweek only holds what changed since the one before
+# it: the slots that now hold a different player (transfers and bench
+# moves alike), the captain and vice slots when they moved, and the chip
+# and transfer cost when there was one. That is a couple of numbers for a
+# typical week instead of 15 players with all their fields.
+#
+# On load the deltas are replayed once into full squads, so reading any
+# gameweek is a dict lookup that returns an fpl_models.Lineup. Points and
+# minutes are not stored here; they come from event/{gw}/live/ through
+# fpl_models.fetch_live, and auto-subs and captaincy from the autosubs
+# engine.
+
+VERSION = 1
+
+def encode(gameweeks):
+    """gw -> full squad records, in gameweek order, as a base squad plus deltas"""
+    encoded = {}
+    previous = None
+    for gw in sorted(gameweeks):
+        squad = gameweeks[gw]
+        if previous is None:
+            record = {'squad': squad['elements'], 'c': squad['captain'], 'v': squad['vice']}
+        else:
+            record = {}
+            changed = {str(slot): element for slot, (element, before)
+                       in enumerate(zip(squad['elements'], previous['elements'])) if element != before}
+            if changed:
+                record['set'] = changed
+            if squad['captain'] != previous['captain']:
+                record['c'] = squad['captain']
+            if squad['vice'] != previous['vice']:
+                record['v'] = squad['vice']
+        if squad['chip']:
+            record['chip'] = squad['chip']
+        if squad['cost']:
+            record['cost'] = squad['cost']
+        encoded[str(gw)] = record
+        previous = squad
+    return encoded
+
+def decode(encoded):
+    """Replay a team's base squad and deltas into gw -> full squad records"""
+    gameweeks = {}
+    previous = None
+    for gw in sorted(encoded, key=int):
+        record = encoded[gw]
+        if previous is None or 'squad' in record:
+            elements = list(record['squad'])
+            captain, vice = record['c'], record['v']
+        else:
+            elements = list(previous['elements'])
+            for slot, element in record.get('set', {}).items():
+                elements[int(slot)] = element
+            captain, vice = record.get('c', previous['captain']), record.get('v', previous['vice'])
+        previous = gameweeks[int(gw)] = {
+            'elements': elements, 'captain': captain, 'vice': vice,
+            'chip': record.get('chip'), 'cost': record.get('cost', 0),
+        }
+    return gameweeks
+
+class SquadStore:
+    """Every team's picks for every gameweek fetched so far"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.names = {}
+        self.squads = {}
+        try:
+            stored = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            stored = {}
+        if stored.get('version') == VERSION:
+            for entry, team in stored['teams'].items():
+                self.names[int(entry)] = team['name']
+                self.squads[int(entry)] = decode(team['gws'])
+
+    def gameweeks(self, entry):
+        return set(self.squads.get(entry, {}))
+
+    def missing(self, entries, most_recent_week):
+        """entry -> gameweeks up to most_recent_week that are not stored yet"""
+        return {
+            entry: [gw for gw in range(1, most_recent_week + 1) if gw not in self.squads.get(entry, {})]
+            for entry in entries
+        }
+
+    def add(self, name, lineup):
+        """Store a fetched Lineup"""
+        if len(lineup.picks) != SQUAD_SIZE:
+            return
+        self.names[lineup.entry] = name
+        self.squads.setdefault(lineup.entry, {})[lineup.gw] = {
+            'elements': lineup.elements(),
+            'captain': next((i for i, p in enumerate(lineup.picks) if p.is_captain), 0),
+            'vice': next((i for i, p in enumerate(lineup.picks) if p.is_vice), 1),
+            'chip': lineup.chip,
+            'cost': lineup.transfers_cost,
+        }
+
+    def lineup(self, entry, gw):
+        """The stored gameweek as a Lineup, or None"""
+        squad = self.squads.get(entry, {}).get(gw)
+        if squad is None:
+            return None
+        captain_multiplier = 3 if squad['chip'] == '3xc' else 2
+        bench_multiplier = 1 if squad['chip'] == 'bboost' else 0
+        picks = []
+        for slot, element in enumerate(squad['elements']):
+            if slot == squad['captain']:
+                multiplier = captain_multiplier
+            else:
+                multiplier = 1 if slot < STARTERS else bench_multiplier
+            picks.append(Pick(element, slot + 1, multiplier, slot == squad['captain'], slot == squad['vice']))
+        return Lineup(entry, gw, picks, squad['chip'], squad['cost'])
+
+    def save(self):
+        teams = {
+            str(entry): {'name': self.names.get(entry, str(entry)), 'gws': encode(gameweeks)}
+            for entry, gameweeks in sorted(self.squads.items())
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({'version': VERSION, 'teams': teams}, separators=(',', ':')), encoding="utf-8")
+        tmp.replace(self.path)
@@ -0,0 +1,537 @@
+import argparse
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from autosubs import DEF, FWD, GKP, MID, SLOTS, STARTERS, Squads, resolve
+from fetch_fpl import calculate_rankings, restructure_results, save_to_excel
+from fpl_api import response_file
+from fpl_models import Entry, Match
+from squad_store import VERSION, encode
+
+# Synthetic H2H leagues for scale testing:
+#
+#     python scripts/synthetic_league.py --teams 1000 --api /tmp/fpl-api --data /tmp/fpl-data
+#
+# A seeded season of any (even) number of teams: a pool of players with
+# per-gameweek minutes and points, a round-robin H2H schedule, and for every
+# team a squad that changes through transfers (free transfers bank up to
+# MAX_FREE_TRANSFERS, each extra one costs TRANSFER_COST), picks its XI and
+# bench order on form, names a captain and vice, and plays each chip once.
+# Scores come from the autosubs engine, so auto-subs and captaincy follow
+# the same rules the real data does. Squads ignore the budget and the
+# three-per-club limit, and there are no double or blank gameweeks.
+#
+# --api writes the raw responses in the layout fpl_api.response_file()
+# names, so fpl_standin.py can serve them to the unchanged fetch scripts
+# (the league ID defaults to the real one they ask for). --data writes what
+# the fetch scripts leave in data/: league_results.xlsx (through
+# restructure_results and calculate_rankings), lineup_data.xlsx for the
+# latest gameweek, motm_schedule.xlsx, gameweek_status.json, squads.json
+# and team_history.xlsx. That is enough to run every stage from
+# restructure_results to the site builders at 20, 1,000 or 50,000 teams. At 50,000 teams, write only the latest gameweek's picks
+# (--picks latest), since all of them are over a million files, and the
+# team history no longer fits in one sheet and is skipped.
+
+GAMEWEEKS = 38
+CLUBS = 20
+PLAYERS_PER_TYPE = {GKP: 60, DEF: 200, MID: 240, FWD: 100}
+TYPE_NAMES = {GKP: 'GKP', DEF: 'DEF', MID: 'MID', FWD: 'FWD'}
+ATTACK = {GKP: 0.8, DEF: 1.0, MID: 1.5, FWD: 1.7}  # mean attacking returns per unit of quality
+# A squad in type order, and the slots and minimum starters of each type
+SQUAD_TYPES = np.array([GKP] * 2 + [DEF] * 5 + [MID] * 5 + [FWD] * 3)
+BLOCKS = [(GKP, 0, 2, 1), (DEF, 2, 7, 3), (MID, 7, 12, 2), (FWD, 12, 15, 1)]
+CHIPS = ['wildcard', 'bboost', '3xc']
+TRANSFER_COST = 4
+MAX_FREE_TRANSFERS = 5
+LEAGUE_ID = 388845
+ENTRY_BASE = 100000
+PAGE_SIZE = 50
+SEASON_START = pd.Timestamp("2025-08-16 14:00", tz="UTC")
+MOTM_PHASES = [
+    ("August", 3), ("September", 3), ("October", 3), ("November", 4), ("December", 3),
+    ("Festy Fixtures", 4), ("January", 4), ("February", 4), ("March/April", 3), ("The Run In", 4),
+    ("Tournament", 3),
+]
+EXCEL_ROWS = 1048575
+CHUNK = 5000
+
+PLACES = ["Ashford", "Bramley", "Carlton", "Dunmore", "Eastwick", "Fairview", "Glenbrook", "Hadley",
+          "Ironbridge", "Kingsway", "Lakeside", "Millbrook", "Northgate", "Oakham", "Penrose", "Queensbury",
+          "Redhill", "Southport", "Thornbury", "Upton", "Valley", "Westfield", "Yarmouth", "Zetland"]
+SUFFIXES = ["FC", "United", "City", "Rovers", "Athletic", "Wanderers", "Albion", "Town", "Rangers", "Villa",
+            "Dynamo", "Sporting", "Olympic", "Celtic", "Harriers"]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Chris", "Jamie", "Taylor", "Morgan", "Robin", "Casey", "Drew",
+               "Jess", "Pat", "Lee", "Nicky", "Charlie", "Danny"]
+LAST_NAMES = ["Smith", "Jones", "Taylor", "Brown", "Walker", "Wright", "Hughes", "Green", "Hall", "Wood",
+              "Clarke", "Turner", "Hill", "Moore", "Cooper", "Ward"]
+
+def kickoff(gw):
+    return SEASON_START + pd.Timedelta(weeks=gw - 1)
+
+def iso(timestamp):
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def round_robin(teams, gameweeks):
+    """gw -> (home, away) index arrays, by the circle method, repeating after teams - 1 rounds"""
+    others = np.arange(1, teams)
+    half = teams // 2
+    pairs = {}
+    for gw in range(1, gameweeks + 1):
+        circle = np.concatenate(([0], np.roll(others, (gw - 1) % (teams - 1))))
+        pairs[gw] = (circle[:half], circle[::-1][:half])
+    return pairs
+
+def team_names(rng, teams):
+    """Unique team names and (not necessarily unique) manager names"""
+    index = np.arange(teams)
+    combos = len(PLACES) * len(SUFFIXES)
+    names = [
+        f"{PLACES[i % len(PLACES)]} {SUFFIXES[i // len(PLACES) % len(SUFFIXES)]}" + (f" {i // combos + 1}" if i >= combos else "")
+        for i in index
+    ]
+    first = rng.integers(0, len(FIRST_NAMES), teams)
+    last = rng.integers(0, len(LAST_NAMES), teams)
+    managers = [f"{FIRST_NAMES[f]} {LAST_NAMES[l]}" for f, l in zip(first, last)]
+    return names, managers
+
+class Players:
+    """The player pool: position, club and quality, with minutes and points per gameweek"""
+
+    def __init__(self, rng, played, gameweeks=GAMEWEEKS):
+        self.types = np.concatenate([np.full(n, t) for t, n in PLAYERS_PER_TYPE.items()])
+        count = len(self.types)
+        self.ids = np.arange(1, count + 1)
+        self.clubs = rng.integers(1, CLUBS + 1, count)
+        self.quality = rng.lognormal(0.0, 0.5, count)
+        self.cost = np.clip(np.round(40 + 25 * self.quality), 40, 150).astype(np.int64)  # tenths of a million
+
+        # Row gw holds gameweek gw; unplayed gameweeks stay 0
+        self.minutes = np.zeros((gameweeks + 1, count), dtype=np.int64)
+        self.points = np.zeros((gameweeks + 1, count), dtype=np.int64)
+        shape = (played, count)
+        plays = rng.random(shape) < np.clip(0.3 + 0.35 * self.quality, 0, 0.95)
+        minutes = np.where(plays, np.where(rng.random(shape) < 0.8, 90, rng.integers(1, 90, shape)), 0)
+        attack = np.array([ATTACK[t] for t in self.types]) * self.quality
+        returns = rng.poisson(attack, shape)
+        booked = (rng.random(shape) < 0.08) & (minutes > 0)
+        self.minutes[1:played + 1] = minutes
+        self.points[1:played + 1] = np.where(minutes >= 60, 2 + returns, np.where(minutes > 0, 1, 0)) - booked
+
+        # Managers favour the better players: weights for sampling by type
+        self.pools = {}
+        for t in PLAYERS_PER_TYPE:
+            ids = self.ids[self.types == t]
+            self.pools[t] = (ids, np.cumsum(self.quality[ids - 1] ** 2))
+
+    def sample(self, rng, types):
+        """One player of each given type, weighted by quality"""
+        chosen = np.zeros(len(types), dtype=np.int64)
+        for t, (ids, cumulative) in self.pools.items():
+            wanted = types == t
+            draws = rng.random(int(wanted.sum())) * cumulative[-1]
+            chosen[wanted] = ids[np.minimum(np.searchsorted(cumulative, draws, side='right'), len(ids) - 1)]
+        return chosen
+
+    def initial_squads(self, rng, teams):
+        """(teams, 15) distinct players in SQUAD_TYPES order, by weighted sampling without replacement"""
+        squads = np.zeros((teams, SLOTS), dtype=np.int64)
+        for t, start, stop, _ in BLOCKS:
+            ids, cumulative = self.pools[t]
+            log_weights = np.log(np.diff(cumulative, prepend=0.0))
+            for first in range(0, teams, CHUNK):
+                chunk = slice(first, min(first + CHUNK, teams))
+                # Gumbel top-k: the k largest perturbed log-weights are a weighted sample without replacement
+                keys = log_weights + rng.gumbel(size=(chunk.stop - chunk.start, len(ids)))
+                squads[chunk, start:stop] = ids[np.argpartition(-keys, stop - start - 1, axis=1)[:, :stop - start]]
+        return squads
+
+class League:
+    """A synthetic H2H league's season: fixtures, each team's picks per gameweek and the scores"""
+
+    def __init__(self, teams, played=26, gameweeks=GAMEWEEKS, seed=0, league_id=LEAGUE_ID):
+        if teams < 2 or teams % 2:
+            raise ValueError("An H2H league needs an even number of teams, at least 2")
+        if not 1 <= played <= gameweeks:
+            raise ValueError(f"Played gameweeks must be between 1 and {gameweeks}")
+        rng = np.random.default_rng(seed)
+        self.teams = teams
+        self.played = played
+        self.gameweeks = gameweeks
+        self.league_id = league_id
+        self.players = Players(rng, played, gameweeks)
+        self.entries = ENTRY_BASE + np.arange(teams)
+        self.names, self.managers = team_names(rng, teams)
+        self.pairs = round_robin(teams, gameweeks)
+        self.club_pairs = round_robin(CLUBS, gameweeks)
+        self.club_goals = rng.poisson(1.4, (gameweeks + 1, CLUBS // 2, 2))
+        self._play(rng)
+
+    def _play(self, rng):
+        """Transfers, team selection, chips and scores for every played gameweek"""
+        teams, played = self.teams, self.played
+        shape = (self.gameweeks + 1, teams)
+        # Per gameweek, in pick order
+        self.picks = np.zeros(shape + (SLOTS,), dtype=np.int16)
+        self.captain = np.zeros(shape, dtype=np.int8)
+        self.vice = np.zeros(shape, dtype=np.int8)
+        self.chip = np.zeros(shape, dtype=np.int8)  # 1 + index into CHIPS, 0 for none
+        self.transfers = np.zeros(shape, dtype=np.int64)
+        self.cost = np.zeros(shape, dtype=np.int64)
+        self.scores = np.zeros(shape, dtype=np.int64)
+        self.bench_points = np.zeros(shape, dtype=np.int64)
+
+        # Each chip in its own gameweek from GW 2 on; those after the played weeks are unused so far
+        self.chip_weeks = np.argsort(rng.random((teams, self.gameweeks - 1)), axis=1)[:, :len(CHIPS)] + 2
+        squad = self.players.initial_squads(rng, teams)
+        free = np.ones(teams, dtype=np.int64)
+        for gw in range(1, played + 1):
+            chip = np.zeros(teams, dtype=np.int8)
+            for c in range(len(CHIPS)):
+                chip[self.chip_weeks[:, c] == gw] = c + 1
+            wildcard = chip == CHIPS.index('wildcard') + 1
+            if gw > 1:
+                wanted = np.where(wildcard, rng.integers(4, 9, teams), rng.choice(3, teams, p=[0.35, 0.5, 0.15]))
+                made = np.zeros(teams, dtype=np.int64)
+                for k in range(int(wanted.max())):
+                    slot = rng.integers(0, SLOTS, teams)
+                    incoming = self.players.sample(rng, SQUAD_TYPES[slot])
+                    # Bringing in a player already in the squad is no transfer
+                    ok = (wanted > k) & ~(squad == incoming[:, None]).any(axis=1)
+                    squad[ok, slot[ok]] = incoming[ok]
+                    made += ok
+                self.transfers[gw] = made
+                self.cost[gw] = np.where(wildcard, 0, TRANSFER_COST * np.maximum(made - free, 0))
+                free = np.minimum(np.where(wildcard, free, np.maximum(free - made, 0)) + 1, MAX_FREE_TRANSFERS)
+
+            order, captain, vice = self._select(rng, squad)
+            self.picks[gw] = np.take_along_axis(squad, order, axis=1)
+            self.captain[gw], self.vice[gw], self.chip[gw] = captain, vice, chip
+
+            resolved = self.resolved(gw)
+            self.scores[gw] = resolved['scores']
+            bench = resolved['multipliers'] == 0
+            bench[:, :STARTERS] = False
+            self.bench_points[gw] = (resolved['points'] * bench).sum(axis=1)
+        self.totals = np.cumsum(self.scores, axis=0)
+        self.ranks = competition_ranks(self.scores)
+        self.overall_ranks = competition_ranks(self.totals)
+
+    def _select(self, rng, squad):
+        """Pick order for each squad (XI by type, bench GK, outfield bench by form), captain and vice slots"""
+        teams = len(squad)
+        rows = np.arange(teams)[:, None]
+        form = np.minimum(self.players.quality[squad - 1] * rng.lognormal(0.0, 0.3, squad.shape), 50)
+        priority = form.copy()
+        for _, start, stop, minimum in BLOCKS:
+            rank = np.argsort(np.argsort(-form[:, start:stop], axis=1), axis=1)
+            priority[:, start:stop] += np.where(rank < minimum, 1000, 0)
+        starting = np.zeros(squad.shape, dtype=bool)
+        starting[:, 0] = priority[:, 0] >= priority[:, 1]
+        starting[:, 1] = ~starting[:, 0]
+        starting[rows, 2 + np.argsort(-priority[:, 2:], axis=1)[:, :STARTERS - 1]] = True
+
+        key = np.where(starting, SQUAD_TYPES * 100 - form, np.where(SQUAD_TYPES == GKP, 500, 1000 - form))
+        order = np.argsort(key, axis=1, kind='stable')
+        armband = self.players.quality[np.take_along_axis(squad, order, axis=1)[:, :STARTERS] - 1]
+        armband = armband * rng.lognormal(0.0, 0.25, armband.shape)
+        ranked = np.argsort(-armband, axis=1)
+        return order, ranked[:, 0], ranked[:, 1]
+
+    def resolved(self, gw):
+        """The autosubs engine's multipliers, subs and scores for every team in a played gameweek"""
+        chips = np.array([None] + CHIPS, dtype=object)[self.chip[gw]]
+        types = self.players.types[self.picks[gw].astype(np.int64) - 1]
+        squads = Squads.from_arrays(self.picks[gw], types, self.captain[gw], self.vice[gw], chips, self.cost[gw])
+        ids = self.players.ids.tolist()
+        return resolve(squads, dict(zip(ids, self.players.points[gw].tolist())),
+                       dict(zip(ids, self.players.minutes[gw].tolist())))
+
+    # The season as the scripts see it
+
+    def entry_objects(self):
+        return [Entry(int(e), name, manager) for e, name, manager in zip(self.entries, self.names, self.managers)]
+
+    def matches(self, event=None):
+        """Every fixture as fpl_models.Match, or only one gameweek's"""
+        entries = self.entry_objects()
+        matches = []
+        for gw in ([event] if event else range(1, self.gameweeks + 1)):
+            home, away = self.pairs[gw]
+            played = gw <= self.played
+            for h, a in zip(home.tolist(), away.tolist()):
+                points = (int(self.scores[gw, h]), int(self.scores[gw, a])) if played else (0, 0)
+                matches.append(Match(gw, entries[h], entries[a], *points))
+        return matches
+
+    def squad_record(self, t, gw):
+        """The squad_store record of team t in gameweek gw"""
+        chip = int(self.chip[gw, t])
+        return {
+            'elements': self.picks[gw, t].tolist(),
+            'captain': int(self.captain[gw, t]),
+            'vice': int(self.vice[gw, t]),
+            'chip': CHIPS[chip - 1] if chip else None,
+            'cost': int(self.cost[gw, t]),
+        }
+
+    def picks_payload(self, t, gw):
+        """entry/{id}/event/{gw}/picks/"""
+        record = self.squad_record(t, gw)
+        captain_multiplier = 3 if record['chip'] == '3xc' else 2
+        bench_multiplier = 1 if record['chip'] == 'bboost' else 0
+        picks = []
+        for slot, element in enumerate(record['elements']):
+            multiplier = captain_multiplier if slot == record['captain'] else 1 if slot < STARTERS else bench_multiplier
+            picks.append({
+                'element': element, 'position': slot + 1, 'multiplier': multiplier,
+                'is_captain': slot == record['captain'], 'is_vice_captain': slot == record['vice'],
+                'element_type': int(self.players.types[element - 1]),
+            })
+        return {
+            'active_chip': record['chip'],
+            'automatic_subs': [],
+            'entry_history': self.history_row(t, gw),
+            'picks': picks,
+        }
+
+    def history_row(self, t, gw):
+        value = int(self.players.cost[self.picks[gw, t].astype(np.int64) - 1].sum())
+        return {
+            'event': gw,
+            'points': int(self.scores[gw, t] + self.cost[gw, t]),
+            'total_points': int(self.totals[gw, t]),
+            'rank': int(self.ranks[gw, t]),
+            'overall_rank': int(self.overall_ranks[gw, t]),
+            'bank': max(1000 - value, 0),
+            'value': value,
+            'event_transfers': int(self.transfers[gw, t]),
+            'event_transfers_cost': int(self.cost[gw, t]),
+            'points_on_bench': int(self.bench_points[gw, t]),
+        }
+
+def competition_ranks(values):
+    """1 + the number of higher values in the same row (ties share a rank)"""
+    ordered = np.sort(values, axis=1)
+    return np.stack([len(row) - np.searchsorted(row, v, side='right') + 1 for row, v in zip(ordered, values)])
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, separators=(',', ':')), encoding="utf-8")
+
+def write_paged(root, path, results, wrap, params=None):
+    """Split results into PAGE_SIZE pages of path, numbered from 1 like the API"""
+    pages = max(1, -(-len(results) // PAGE_SIZE))
+    for page in range(1, pages + 1):
+        chunk = results[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        write_json(response_file(root, path, {**(params or {}), 'page': page}), wrap(chunk, page, page < pages))
+
+def match_result(league, match, number):
+    played = match.played
+    result = {'event': match.event, 'id': number, 'league': league.league_id, 'is_knockout': False,
+              'is_bye': False, 'seed_value': None, 'tiebreak': None, 'knockout_name': '',
+              'winner': None}
+    for side, (entry, points, _, opponent_points) in enumerate(match.sides(), 1):
+        won, drew = played and points > opponent_points, played and points == opponent_points
+        if won:
+            result['winner'] = entry.id
+        result.update({
+            f'entry_{side}_entry': entry.id, f'entry_{side}_name': entry.name,
+            f'entry_{side}_player_name': entry.player_name, f'entry_{side}_points': points,
+            f'entry_{side}_win': int(won), f'entry_{side}_draw': int(drew),
+            f'entry_{side}_loss': int(played and not won and not drew),
+            f'entry_{side}_total': 3 if won else 1 if drew else 0,
+        })
+    return result
+
+def write_api(league, root, picks="all"):
+    """Raw API responses in the fpl_standin layout; picks: 'all', 'latest' or 'none'"""
+    root = Path(root)
+    played = league.played
+    write_json(response_file(root, "bootstrap-static/"), bootstrap(league))
+
+    results = [match_result(league, m, i) for i, m in enumerate(league.matches(), 1)]
+    h2h = f"leagues-h2h-matches/league/{league.league_id}/"
+    wrap = lambda chunk, page, has_next: {'has_next': has_next, 'page': page, 'results': chunk}
+    write_paged(root, h2h, results, wrap)
+    for gw in range(1, league.gameweeks + 1):
+        write_paged(root, h2h, [r for r in results if r['event'] == gw], wrap, {'event': gw})
+
+    latest = league.totals[played]
+    order = np.lexsort((league.entries, -latest))
+    standings = [{
+        'id': int(t) + 1, 'entry': int(league.entries[t]), 'entry_name': league.names[t],
+        'player_name': league.managers[t], 'rank': int(league.overall_ranks[played, t]),
+        'last_rank': int(league.overall_ranks[played - 1, t]) if played > 1 else 0,
+        'rank_sort': rank, 'total': int(latest[t]), 'event_total': int(league.scores[played, t]),
+    } for rank, t in enumerate(order.tolist(), 1)]
+    write_paged(root, f"leagues-classic-standings/league/{league.league_id}/", standings,
+                lambda chunk, page, has_next: {
+                    'league': {'id': league.league_id, 'name': "Synthetic League"},
+                    'standings': {'has_next': has_next, 'page': page, 'results': chunk}})
+
+    for gw in range(1, league.gameweeks + 1):
+        write_json(response_file(root, "fixtures/", {'event': gw}), club_fixtures(league, gw))
+    for gw in range(1, played + 1):
+        write_json(response_file(root, f"event/{gw}/live/"), live_event(league, gw))
+
+    gws = {"all": range(1, played + 1), "latest": [played], "none": []}[picks]
+    for t, entry in enumerate(league.entries.tolist()):
+        for gw in gws:
+            write_json(response_file(root, f"entry/{entry}/event/{gw}/picks/"), league.picks_payload(t, gw))
+        write_json(response_file(root, f"entry/{entry}/history/"), {
+            'current': [league.history_row(t, gw) for gw in range(1, played + 1)],
+            'past': [],
+            'chips': [{'name': CHIPS[c], 'time': iso(kickoff(int(gw))), 'event': int(gw)}
+                      for c, gw in enumerate(league.chip_weeks[t]) if gw <= played],
+        })
+    print(f"Wrote API responses for {league.teams} teams to {root}")
+
+def bootstrap(league):
+    players, played = league.players, league.played
+    season_points = players.points.sum(axis=0)
+    return {
+        'events': [{
+            'id': gw, 'name': f"Gameweek {gw}", 'deadline_time': iso(kickoff(gw) - pd.Timedelta(minutes=90)),
+            'finished': gw <= played, 'data_checked': gw <= played, 'is_previous': gw == played - 1,
+            'is_current': gw == played, 'is_next': gw == played + 1,
+            'average_entry_score': int(league.scores[gw].mean()) if gw <= played else 0,
+            'highest_score': int(league.scores[gw].max()) if gw <= played else None,
+        } for gw in range(1, league.gameweeks + 1)],
+        'element_types': [
+            {'id': t, 'singular_name_short': name, 'plural_name_short': name + 's'} for t, name in TYPE_NAMES.items()
+        ],
+        'teams': [{'id': c, 'name': f"Club {c}", 'short_name': f"C{c:02d}"} for c in range(1, CLUBS + 1)],
+        'elements': [{
+            'id': int(e), 'web_name': f"Player {e}", 'first_name': "Player", 'second_name': str(e),
+            'element_type': int(players.types[i]), 'team': int(players.clubs[i]),
+            'now_cost': int(players.cost[i]), 'total_points': int(season_points[i]),
+        } for i, e in enumerate(players.ids)],
+    }
+
+def club_fixtures(league, gw):
+    """fixtures/?event={gw}"""
+    home, away = league.club_pairs[gw]
+    finished = gw <= league.played
+    return [{
+        'id': (gw - 1) * (CLUBS // 2) + n + 1, 'event': gw, 'kickoff_time': iso(kickoff(gw)),
+        'team_h': int(h) + 1, 'team_a': int(a) + 1,
+        'team_h_score': int(league.club_goals[gw, n, 0]) if finished else None,
+        'team_a_score': int(league.club_goals[gw, n, 1]) if finished else None,
+        'started': finished, 'finished': finished, 'finished_provisional': finished,
+        'minutes': 90 if finished else 0,
+    } for n, (h, a) in enumerate(zip(home, away))]
+
+def live_event(league, gw):
+    """event/{gw}/live/"""
+    players = league.players
+    return {'elements': [
+        {'id': int(e), 'stats': {'minutes': int(players.minutes[gw, i]), 'total_points': int(players.points[gw, i])},
+         'explain': []}
+        for i, e in enumerate(players.ids)
+    ]}
+
+def write_data(league, root):
+    """The files the fetch scripts leave in data/"""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    played = league.played
+
+    data, most_recent_week = restructure_results(league.matches())
+    df = calculate_rankings(pd.DataFrame.from_dict(data, orient="index"), most_recent_week)
+    save_to_excel(df, root / "league_results.xlsx")
+
+    lineup_rows = []
+    resolved = league.resolved(played)
+    for t, (name, manager) in enumerate(zip(league.names, league.managers)):
+        for slot, pick in enumerate(league.picks_payload(t, played)['picks']):
+            element = pick['element']
+            lineup_rows.append({
+                'Manager': manager,
+                'Team Name': name,
+                'Position': pick['position'],
+                'Player': f"Player {element}",
+                'Position Type': TYPE_NAMES[pick['element_type']],
+                f'GW {played} Score': int(league.players.points[played, element - 1]),
+                'Is Captain': pick['is_captain'],
+                'Is Vice Captain': pick['is_vice_captain'],
+                'Multiplier': int(resolved['multipliers'][t, slot]),
+                'Auto Sub In': bool(resolved['subs_in'][t, slot]),
+                'Auto Sub Out': bool(resolved['subs_out'][t, slot]),
+            })
+    pd.DataFrame(lineup_rows).to_excel(root / "lineup_data.xlsx", index=False)
+
+    motm_schedule(df, played).to_excel(root / "motm_schedule.xlsx", index=False)
+
+    with open(root / "gameweek_status.json", 'w') as f:
+        json.dump({str(gw): {'finished': gw <= played, 'data_checked': gw <= played}
+                   for gw in range(1, league.gameweeks + 1)}, f, indent=2)
+
+    teams = {
+        str(entry): {'name': name, 'gws': encode({gw: league.squad_record(t, gw) for gw in range(1, played + 1)})}
+        for t, (entry, name) in enumerate(zip(league.entries.tolist(), league.names))
+    }
+    write_json(root / "squads.json", {'version': VERSION, 'teams': teams})
+
+    if league.teams * played > EXCEL_ROWS:
+        print(f"Skipping team_history.xlsx: {league.teams * played} rows is more than a sheet holds")
+    else:
+        history = []
+        for t, (entry, name) in enumerate(zip(league.entries.tolist(), league.names)):
+            chips = {int(gw): CHIPS[c] for c, gw in enumerate(league.chip_weeks[t])}
+            for gw in range(1, played + 1):
+                h = league.history_row(t, gw)
+                history.append({
+                    "Entry ID": entry, "Team Name": name, "GW": gw, "Points": h['points'],
+                    "Transfers Cost": h['event_transfers_cost'], "Net Points": h['points'] - h['event_transfers_cost'],
+                    "Bench Points": h['points_on_bench'], "Transfers": h['event_transfers'],
+                    "Chip": chips.get(gw, ""), "Total Points": h['total_points'],
+                    "Overall Rank": h['overall_rank'], "Team Value": h['value'] / 10, "Bank": h['bank'] / 10,
+                })
+        save_to_excel(pd.DataFrame(history), root / "team_history.xlsx")
+    print(f"Wrote league data for {league.teams} teams to {root}")
+
+def motm_schedule(df, played):
+    """The MoTM phases; a finished phase's winner has the most MoTM points, then the highest score"""
+    rows = []
+    first = 1
+    for number, (phase, weeks) in enumerate(MOTM_PHASES, 1):
+        last = first + weeks - 1
+        motm = number if number < len(MOTM_PHASES) else None
+        winner = None
+        if motm is not None:
+            winner = "TBD"
+            if last <= played:
+                best = df.sort_values([f'MoTM {motm} Points', f'MoTM {motm} Score'], ascending=False).iloc[0]
+                winner = best['Team Name']
+        rows.append({'MoTM': motm, 'Winner': winner, 'Phase': phase, 'First Gameweek': f"GW {first}",
+                     'Last Gameweek': f"GW {last}", 'Number of Gameweeks': weeks})
+        first = last + 1
+    return pd.DataFrame(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic H2H league season")
+    parser.add_argument("--teams", type=int, default=20, help="number of teams (even)")
+    parser.add_argument("--played", type=int, default=26, help="gameweeks played so far")
+    parser.add_argument("--gameweeks", type=int, default=GAMEWEEKS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--league-id", type=int, default=LEAGUE_ID)
+    parser.add_argument("--api", help="write raw API responses here, for fpl_standin.py")
+    parser.add_argument("--picks", choices=["all", "latest", "none"], default="all",
+                        help="which gameweeks' picks to write with --api")
+    parser.add_argument("--data", help="write the data/ files here")
+    args = parser.parse_args()
+    if not (args.api or args.data):
+        parser.error("nothing to write: give --api and/or --data")
+
+    league = League(args.teams, args.played, args.gameweeks, args.seed, args.league_id)
+    scores = league.scores[1:args.played + 1]
+    print(f"{args.teams} teams, {args.played} gameweeks played: mean score {scores.mean():.1f}, "
+          f"max {scores.max()}, {int(league.transfers.sum())} transfers")
+    if args.api:
+        write_api(league, args.api, args.picks)
+    if args.data:
+        write_data(league, args.data)
+
+if __name__ == "__main__":
+    main()
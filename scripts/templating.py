@@ -0,0 +1,116 @@
+from functools import lru_cache
+from pathlib import Path
+from string import Formatter
+import pandas as pd
+
+# Compiled HTML templates for the site builders.
+#
+# Templates use the same {field} / {{literal brace}} syntax as the f-strings
+# they replace. Each source is split into literal chunks and fields once and
+# cached, so rendering is a straight walk over the parts. stream() writes the
+# pieces directly to an open file; a field whose value is a list or generator
+# of strings (e.g. table rows) is written piece by piece instead of joined.
+
+ROOT = Path(__file__).resolve().parents[1]
+TEMPLATE_DIR = ROOT / "templates"
+
+_formatter = Formatter()
+
+class Template:
+    """A template source pre-split into (literal, field, conversion, spec) parts"""
+
+    def __init__(self, source):
+        self.parts = []
+        for literal, field, spec, conversion in _formatter.parse(source):
+            simple = field is not None and field.isidentifier()
+            self.parts.append((literal, field, simple, conversion, spec))
+
+    def _value(self, field, simple, conversion, spec, context):
+        value = context[field] if simple else _formatter.get_field(field, (), context)[0]
+        if conversion:
+            value = _formatter.convert_field(value, conversion)
+        if spec:
+            return format(value, spec)
+        if isinstance(value, (str, list, tuple)) or hasattr(value, '__next__'):
+            return value
+        return format(value, "")
+
+    def iter_render(self, **context):
+        """Yield the rendered output in pieces"""
+        for literal, field, simple, conversion, spec in self.parts:
+            if literal:
+                yield literal
+            if field is None:
+                continue
+            value = self._value(field, simple, conversion, spec, context)
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+
+    def render(self, **context):
+        """Render the template to a string"""
+        return "".join(self.iter_render(**context))
+
+    def stream(self, out, **context):
+        """Render the template straight into an open text file"""
+        write = out.write
+        for piece in self.iter_render(**context):
+            write(piece)
+
+@lru_cache(maxsize=None)
+def compile_template(source):
+    """Compile (and cache) an inline template source"""
+    return Template(source)
+
+@lru_cache(maxsize=None)
+def get_template(name):
+    """Load and compile (and cache) a template from the templates/ directory"""
+    return Template((TEMPLATE_DIR / name).read_text(encoding="utf-8"))
+
+@lru_cache(maxsize=None)
+def read_static(name):
+    """Read (and cache) a file from templates/ verbatim, e.g. shared JavaScript"""
+    return (TEMPLATE_DIR / name).read_text(encoding="utf-8")
+
+def write_page(path, template, **context):
+    """Stream a rendered page template to path"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as out:
+        template.stream(out, **context)
+
+# Column-wise table formatting
+
+def text(values):
+    """Format a column of values the way an f-string would ('nan', 'None', '1.0')"""
+    return pd.Series(values).astype(object).map(str)
+
+def cells(values, attrs=""):
+    """Wrap a column of values in <td> cells sharing the same attributes"""
+    return f"<td{attrs}>" + text(values) + "</td>"
+
+def styled_cells(values, styles, default_attrs=""):
+    """Wrap a column of values in <td> cells whose attributes depend on the value
+
+    styles maps a cell value to its attribute string; other values get default_attrs.
+    """
+    values = pd.Series(values)
+    attrs = values.map(styles).where(values.isin(list(styles)), default_attrs)
+    return "<td" + attrs.astype(object) + ">" + text(values) + "</td>"
+
+def table_rows(columns, row_attrs=None, sep=""):
+    """Concatenate per-column cell Series into <tr> rows
+
+    row_attrs is an optional Series of attribute strings for each <tr>.
+    Returns a list of row strings, each followed by sep.
+    """
+    if not columns:
+        return []
+    body = columns[0].reset_index(drop=True)
+    for col in columns[1:]:
+        body = body + col.reset_index(drop=True)
+    if row_attrs is None:
+        rows = "<tr>" + body + "</tr>" + sep
+    else:
+        rows = "<tr" + pd.Series(row_attrs).reset_index(drop=True).astype(object) + ">" + body + "</tr>" + sep
+    return rows.tolist()
@@ -0,0 +1,454 @@
+// League tables, rendered in the browser from the league data bundle.
+//
+// Both layouts fetch the same compact JSON (data/league.json, written by
+// scripts/league_data.py, URL in <body data-league>) and fill their empty
+// <table data-league-table="..."> elements from it, so every table is built
+// here once and the data is downloaded and cached once for both pages. The
+// layouts only differ in cell attributes (LEAGUE_LAYOUTS).
+//
+// Needs fetchData and escapeHtml from lineups.js.
+
+var LEAGUE_DATA_VERSION = 2;
+
+var CENTER = ' class="text-center"';
+var MOBILE_TEAM_HEADERS = {
+  standings: ' scope="col" style="width: 30%;"',
+  motm: ' scope="col" style="width: 25%;"',
+  form: ' scope="col" style="width: 25%;"'
+};
+
+var RESULT_CLASSES = {W: 'result-w', D: 'result-d', L: 'result-l'};
+
+// Results are coloured by class (see the page stylesheets), not inline styles
+function resultClass(value) { return RESULT_CLASSES[value] || ''; }
+
+var LEAGUE_LAYOUTS = {
+  desktop: {
+    filterClass: 'league-filter',
+    currentRow: " class='current-motm'",
+    th: function(table, column) {
+      return column.kind === 'teams' ? " class='teams-col'" : "";
+    },
+    td: function(table, column, value) {
+      if (column.kind === 'teams') return " class='teams-col'";
+      if (column.kind === 'result' && resultClass(value)) return ' class="' + resultClass(value) + '"';
+      return "";
+    }
+  },
+  mobile: {
+    filterClass: 'league-filter form-control form-control-sm mb-2',
+    currentRow: ' style="background-color: #d4edda;"',
+    th: function(table, column) {
+      if (column.kind === 'team' && MOBILE_TEAM_HEADERS[table]) return MOBILE_TEAM_HEADERS[table];
+      if (column.kind === 'rank' || column.kind === 'narrow') return ' scope="col" class="text-center" style="width: 8%;"';
+      return ' scope="col" class="text-center"';
+    },
+    td: function(table, column, value) {
+      if (column.kind === 'rank') return ' class="text-center fw-bold"';
+      if (column.kind === 'team') return (table === 'standings' || table === 'motm') ? ' class="fw-semibold"' : '';
+      if (column.kind === 'teams') return ' class="text-center" style="min-width: 250px; white-space: normal;"';
+      if (column.kind === 'result' && resultClass(value)) return ' class="text-center ' + resultClass(value) + '"';
+      return CENTER;
+    }
+  }
+};
+
+// Decoding: rows become objects keyed by their section's fields, with team,
+// opponent, result and player references resolved
+
+function decodeLeague(bundle) {
+  if (bundle.version !== LEAGUE_DATA_VERSION) throw new Error('league data version ' + bundle.version);
+  var str = function(i) { return i === null ? null : bundle.strings[i]; };
+  var teamName = function(i) { return i === null ? null : str(bundle.teams[i][0]); };
+  var decode = function(fields, rows) {
+    return rows.map(function(row) {
+      var r = {};
+      fields.forEach(function(field, i) {
+        var v = row[i];
+        if (field === 'team' || field === 'opponent') v = teamName(v);
+        else if (field === 'result') v = str(v);
+        else if (field === 'player') v = {name: str(bundle.players[v][0]), position: str(bundle.players[v][1])};
+        r[field] = v;
+      });
+      return r;
+    });
+  };
+
+  var results = {};
+  Object.keys(bundle.results.weeks).forEach(function(gw) {
+    results[gw] = {};
+    decode(bundle.results.fields, bundle.results.weeks[gw]).forEach(function(r) { results[gw][r.team] = r; });
+  });
+  var periods = {};
+  Object.keys(bundle.motm.periods).forEach(function(n) {
+    periods[n] = decode(bundle.motm.fields, bundle.motm.periods[n]);
+  });
+  var schedule = bundle.motm_schedule && {
+    columns: bundle.motm_schedule.columns.map(str),
+    rows: bundle.motm_schedule.rows.map(function(row) { return row.map(str); }),
+    current: bundle.motm_schedule.current
+  };
+
+  return {
+    week: bundle.week,
+    standings: decode(bundle.standings.fields, bundle.standings.rows),
+    results: results,
+    motm: {current: bundle.motm.current, resultWeeks: bundle.motm.result_weeks,
+           fixtureWeeks: bundle.motm.fixture_weeks, periods: periods},
+    lineups: decode(bundle.lineups.fields, bundle.lineups.rows),
+    schedule: schedule
+  };
+}
+
+function byRank(a, b) { return a.rank - b.rank; }
+
+function compareText(a, b) { return a < b ? -1 : a > b ? 1 : 0; }
+
+// Table specs: {columns: [{label, kind}], rows: [[value, ...]], current} or
+// {empty: message}
+
+var LEAGUE_TABLES = {
+  standings: function(league) {
+    return {
+      columns: [{label: 'Rank', kind: 'rank'}, {label: 'Playoff', kind: 'narrow'}, {label: 'Team Name', kind: 'team'},
+                {label: 'Total Score'}, {label: 'Total Points'}, {label: 'W'}, {label: 'D'}, {label: 'L'},
+                {label: 'Total FFPts'}],
+      rows: league.standings.slice().sort(byRank).map(function(r) {
+        var playoff = r.rank === 1 ? '🏆' : (r.rank !== null && r.rank <= 8) ? '⭐' : '';
+        return [r.rank, playoff, r.team, r.total_score, r.total_points, r.w, r.d, r.l, r.total_ffpts];
+      })
+    };
+  },
+
+  motm: function(league) {
+    var n = league.motm.current;
+    var period = league.motm.periods[n];
+    if (!period) return {empty: 'MoTM data not available'};
+
+    // MoTM points, then MoTM score as the tiebreaker
+    var rows = period.slice().sort(function(a, b) { return (b.points - a.points) || (b.score - a.score); });
+    var points = rows.map(function(r) { return r.points; })
+      .filter(function(p, i, all) { return all.indexOf(p) === i; })
+      .sort(function(a, b) { return b - a; });
+    var flags = {};
+    if (points.length > 1) flags[points[1]] = '🟡 ';
+    if (points.length) flags[points[0]] = '🟢 ';
+
+    var resultWeeks = league.motm.resultWeeks.filter(function(gw) { return league.results[gw]; });
+    var fixtureWeeks = league.motm.fixtureWeeks.filter(function(gw) { return league.results[gw]; });
+    var columns = [{label: 'Team Name', kind: 'team'}, {label: 'MoTM ' + n + ' Points'},
+                   {label: 'MoTM ' + n + ' Score'}, {label: 'MoTM ' + n + ' Score Behind'}];
+    resultWeeks.forEach(function(gw) { columns.push({label: 'Wk ' + gw + ' Result', kind: 'result'}); });
+    fixtureWeeks.forEach(function(gw) { columns.push({label: 'Wk ' + gw + ' Opponent Team'}); });
+
+    return {
+      columns: columns,
+      rows: rows.map(function(r) {
+        var row = [r.team, (flags[r.points] || '') + r.points, r.score, r.score_behind];
+        resultWeeks.forEach(function(gw) { row.push((league.results[gw][r.team] || {}).result); });
+        fixtureWeeks.forEach(function(gw) { row.push((league.results[gw][r.team] || {}).opponent); });
+        return row;
+      })
+    };
+  },
+
+  form: function(league) {
+    if (league.week < 5) return {empty: 'Not enough weeks of data for 5 Week Form table'};
+    var weeks = [];
+    for (var gw = league.week - 4; gw <= league.week; gw++) {
+      if (league.results[gw]) weeks.push(gw);
+    }
+    if (!weeks.length) return {empty: '5 Week Form data not available'};
+
+    var rows = league.standings.map(function(r) {
+      var total = 0;
+      weeks.forEach(function(gw) { total += (league.results[gw][r.team] || {}).score || 0; });
+      return {standing: r, total: total};
+    });
+    // Dense rank of the 5 week score, highest first
+    var totals = rows.map(function(r) { return r.total; })
+      .filter(function(t, i, all) { return all.indexOf(t) === i; })
+      .sort(function(a, b) { return b - a; });
+    var high = totals.length ? totals[0] : 0;
+    rows.sort(function(a, b) { return b.total - a.total; });
+
+    var columns = [{label: 'Rank', kind: 'narrow'}, {label: '5 Week Rank', kind: 'narrow'}, {label: 'Team Name', kind: 'team'},
+                   {label: '5 Week Score'}, {label: 'Behind 5 Week High'}];
+    weeks.forEach(function(gw) { columns.push({label: 'Wk ' + gw + ' Result', kind: 'result'}); });
+    return {
+      columns: columns,
+      rows: rows.map(function(r) {
+        var row = [r.standing.rank, totals.indexOf(r.total) + 1, r.standing.team, r.total, high - r.total];
+        weeks.forEach(function(gw) { row.push((league.results[gw][r.standing.team] || {}).result); });
+        return row;
+      })
+    };
+  },
+
+  top_scorers: function(league) {
+    // One row per player, captaincy and role from the resolved multiplier
+    // (0=bench, 1=starter, 2 or 3=captain); a captain's score is multiplied
+    var groups = {};
+    league.lineups.forEach(function(p) {
+      if (p.score === null || p.multiplier === null || p.multiplier === undefined) return;
+      var role = p.multiplier ? 'Starter' : 'Bench';
+      var captain = p.multiplier > 1 ? 'Captain' : '';
+      var key = [p.player.name, p.player.position, captain, role].join('\u0000');
+      if (!groups[key]) {
+        groups[key] = {player: p.player, captain: captain, role: role,
+                       score: p.score * Math.max(p.multiplier, 1), teams: []};
+      }
+      if (groups[key].teams.indexOf(p.team) === -1) groups[key].teams.push(p.team);
+    });
+    var rows = Object.keys(groups).map(function(key) { return groups[key]; });
+    if (!rows.length) return {empty: 'No lineup data available'};
+
+    rows.sort(function(a, b) {
+      return (b.score - a.score) || compareText(a.player.name, b.player.name) ||
+             compareText(a.player.position, b.player.position) ||
+             compareText(a.captain, b.captain) || compareText(a.role, b.role);
+    });
+    return {
+      columns: [{label: 'Rank'}, {label: 'Player'}, {label: 'Position'}, {label: 'Score'},
+                {label: 'Teams', kind: 'teams'}, {label: 'Role'}, {label: 'Captain'}],
+      rows: rows.slice(0, 20).map(function(r, i) {
+        return [i + 1, r.player.name, r.player.position, Math.trunc(r.score), r.teams.sort().join(', '),
+                r.role, r.captain ? '⭐ C' : ''];
+      })
+    };
+  },
+
+  motm_schedule: function(league) {
+    if (!league.schedule) return {empty: 'MoTM Schedule data not available'};
+    return {
+      columns: league.schedule.columns.map(function(label) { return {label: label}; }),
+      rows: league.schedule.rows,
+      current: league.schedule.current
+    };
+  }
+};
+
+function cellText(value) { return value === null || value === undefined ? '-' : value; }
+
+function renderLeagueTable(table, spec, layout) {
+  var style = LEAGUE_LAYOUTS[layout] || LEAGUE_LAYOUTS.desktop;
+  var name = table.dataset.leagueTable;
+  var head = table.querySelector('thead tr');
+  var body = table.querySelector('tbody');
+  if (spec.empty) {
+    head.innerHTML = "<th>No Data</th>";
+    body.innerHTML = "<tr><td>" + escapeHtml(spec.empty) + "</td></tr>";
+    return;
+  }
+
+  head.innerHTML = spec.columns.map(function(column) {
+    return "<th" + style.th(name, column) + ">" + escapeHtml(column.label) + "</th>";
+  }).join("");
+  body.innerHTML = spec.rows.map(function(row, r) {
+    return "<tr" + (r === spec.current ? style.currentRow : "") + ">" + row.map(function(value, i) {
+      return "<td" + style.td(name, spec.columns[i], value) + ">" + escapeHtml(cellText(value)) + "</td>";
+    }).join("") + "</tr>";
+  }).join("\n");
+}
+
+// Full league table: sortable, filterable and virtualized. Only the rows and
+// week columns in view are in the DOM (the rest are replaced by spacers), so
+// its size stays flat as teams and gameweeks are added. Column widths and
+// alignment come from the page stylesheets.
+
+var VIRTUAL_MIN_ROWS = 40;     // smaller leagues render every row
+var ROW_HEIGHT = 37;           // estimates until the first render is measured
+var WEEK_COL_WIDTH = 72;
+var OVERSCAN_ROWS = 5;
+var OVERSCAN_WEEKS = 2;
+var RESULT_ORDER = {W: 3, D: 2, L: 1};
+var FULL_LEAGUE_COLUMNS = [
+  {label: 'Rank', key: 'rank', dir: 1}, {label: 'Team Name', key: 'team', dir: 1, kind: 'team'},
+  {label: 'Total Points', key: 'total_points', dir: -1}, {label: 'Total Score', key: 'total_score', dir: -1},
+  {label: 'W', key: 'w', dir: -1}, {label: 'D', key: 'd', dir: -1}, {label: 'L', key: 'l', dir: -1}
+];
+
+function FullLeagueTable(table, league, layout) {
+  var self = this;
+  this.head = table.querySelector('thead tr');
+  this.body = table.querySelector('tbody');
+  this.scroller = table.parentElement;
+  this.weeks = [];
+  for (var gw = 1; gw <= league.week; gw++) {
+    if (league.results[gw]) this.weeks.push(gw);
+  }
+  this.rows = league.standings.map(function(r) {
+    return {
+      values: FULL_LEAGUE_COLUMNS.map(function(column) { return r[column.key]; }),
+      results: self.weeks.map(function(gw) { return (league.results[gw][r.team] || {}).result || null; }),
+      search: String(r.team).toLowerCase()
+    };
+  });
+  this.sort = {column: 0, dir: 1};
+  this.filter = '';
+  this.rowHeight = ROW_HEIGHT;
+  this.weekWidth = WEEK_COL_WIDTH;
+  this.fixedWidth = 0;
+  this.window = null;
+
+  var input = document.createElement('input');
+  input.type = 'search';
+  input.className = (LEAGUE_LAYOUTS[layout] || LEAGUE_LAYOUTS.desktop).filterClass;
+  input.placeholder = 'Filter teams';
+  input.setAttribute('aria-label', 'Filter teams');
+  this.scroller.parentNode.insertBefore(input, this.scroller);
+  input.addEventListener('input', function() {
+    self.filter = input.value.trim().toLowerCase();
+    self.update(true);
+  });
+
+  this.head.addEventListener('click', function(event) {
+    var th = event.target.closest('th[data-column]');
+    if (!th) return;
+    var column = Number(th.dataset.column);
+    var dir = column < FULL_LEAGUE_COLUMNS.length ? FULL_LEAGUE_COLUMNS[column].dir : -1;
+    self.sort = {column: column, dir: self.sort.column === column ? -self.sort.dir : dir};
+    self.update(true);
+  });
+
+  var pending = false;
+  var schedule = function() {
+    if (pending) return;
+    pending = true;
+    requestAnimationFrame(function() {
+      pending = false;
+      self.update(false);
+    });
+  };
+  this.scroller.addEventListener('scroll', schedule, {passive: true});
+  window.addEventListener('scroll', schedule, {passive: true});
+  window.addEventListener('resize', schedule);
+  this.update(true);
+}
+
+FullLeagueTable.prototype.sortValue = function(row, column) {
+  if (column < FULL_LEAGUE_COLUMNS.length) return row.values[column];
+  return RESULT_ORDER[row.results[column - FULL_LEAGUE_COLUMNS.length]] || 0;
+};
+
+FullLeagueTable.prototype.applyView = function() {
+  var self = this;
+  var column = this.sort.column, dir = this.sort.dir;
+  this.view = this.rows.filter(function(row) {
+    return !self.filter || row.search.indexOf(self.filter) !== -1;
+  }).sort(function(a, b) {
+    var x = self.sortValue(a, column), y = self.sortValue(b, column);
+    // Missing values last, league rank breaks ties
+    if (x === null || x === undefined) return (y === null || y === undefined) ? a.values[0] - b.values[0] : 1;
+    if (y === null || y === undefined) return -1;
+    var order = typeof x === 'string' ? compareText(x, y) : x - y;
+    return order * dir || a.values[0] - b.values[0];
+  });
+};
+
+FullLeagueTable.prototype.visibleWindow = function() {
+  var rowFirst = 0, rowLast = this.view.length;
+  if (this.view.length >= VIRTUAL_MIN_ROWS) {
+    var above = -this.body.getBoundingClientRect().top;
+    rowFirst = Math.max(0, Math.floor(above / this.rowHeight) - OVERSCAN_ROWS);
+    rowLast = Math.min(this.view.length, rowFirst + Math.ceil(window.innerHeight / this.rowHeight) + 2 * OVERSCAN_ROWS);
+  }
+  var left = this.scroller.scrollLeft - this.fixedWidth;
+  var weekFirst = Math.max(0, Math.floor(left / this.weekWidth) - OVERSCAN_WEEKS);
+  var weekLast = Math.min(this.weeks.length,
+                          Math.ceil((left + this.scroller.clientWidth) / this.weekWidth) + OVERSCAN_WEEKS);
+  return [rowFirst, rowLast, weekFirst, weekLast];
+};
+
+FullLeagueTable.prototype.update = function(changed) {
+  if (changed) this.applyView();
+  var win = this.visibleWindow();
+  if (!changed && this.window && win.join() === this.window.join()) return;
+  this.window = win;
+  this.render(win[0], win[1], win[2], win[3]);
+
+  // Re-measure; if the estimates were off, the next frame renders the
+  // right window
+  var firstWeek = this.head.querySelector('th.week-col');
+  var firstRow = this.body.querySelector('tr:not(.row-spacer)');
+  var measured = [
+    firstRow ? firstRow.offsetHeight : this.rowHeight,
+    firstWeek ? firstWeek.offsetWidth : this.weekWidth,
+    firstWeek ? firstWeek.offsetLeft - this.weekWidth * win[2] : this.fixedWidth
+  ];
+  if (measured[0] !== this.rowHeight || measured[1] !== this.weekWidth || measured[2] !== this.fixedWidth) {
+    this.rowHeight = measured[0] || ROW_HEIGHT;
+    this.weekWidth = measured[1] || WEEK_COL_WIDTH;
+    this.fixedWidth = measured[2];
+    var self = this;
+    requestAnimationFrame(function() { self.update(false); });
+  }
+};
+
+FullLeagueTable.prototype.render = function(rowFirst, rowLast, weekFirst, weekLast) {
+  var self = this;
+  var sort = this.sort;
+  var spacer = function(tag, weeks) {
+    var width = weeks * self.weekWidth;
+    return weeks > 0 ? "<" + tag + " class='week-spacer' style='width: " + width + "px; min-width: " + width + "px;'></" + tag + ">" : "";
+  };
+  var header = function(label, column, classes) {
+    var aria = sort.column === column ? (sort.dir > 0 ? 'ascending' : 'descending') : 'none';
+    return "<th scope='col' data-column='" + column + "' aria-sort='" + aria + "'" +
+           (classes ? " class='" + classes + "'" : "") + ">" + escapeHtml(label) + "</th>";
+  };
+
+  var head = FULL_LEAGUE_COLUMNS.map(function(column, i) {
+    return header(column.label, i, column.kind === 'team' ? 'team-col' : '');
+  }).join("") + spacer('th', weekFirst);
+  for (var w = weekFirst; w < weekLast; w++) {
+    head += header('Wk ' + this.weeks[w], FULL_LEAGUE_COLUMNS.length + w, 'week-col');
+  }
+  this.head.innerHTML = head + spacer('th', this.weeks.length - weekLast);
+
+  var colspan = FULL_LEAGUE_COLUMNS.length + this.weeks.length;
+  var rowSpacer = function(rows) {
+    return rows > 0 ? "<tr class='row-spacer' aria-hidden='true'><td colspan='" + colspan + "' style='height: " +
+                      (rows * self.rowHeight) + "px;'></td></tr>" : "";
+  };
+  var html = [rowSpacer(rowFirst)];
+  if (!this.view.length) {
+    html.push("<tr><td colspan='" + colspan + "'>No teams match</td></tr>");
+  }
+  this.view.slice(rowFirst, rowLast).forEach(function(row) {
+    var cells = row.values.map(function(value, i) {
+      return "<td" + (FULL_LEAGUE_COLUMNS[i].kind === 'team' ? " class='team-col'" : "") + ">" +
+             escapeHtml(cellText(value)) + "</td>";
+    }).join("") + spacer('td', weekFirst);
+    for (var w = weekFirst; w < weekLast; w++) {
+      var result = row.results[w];
+      cells += "<td class='week-col " + resultClass(result) + "'>" + escapeHtml(cellText(result)) + "</td>";
+    }
+    html.push("<tr>" + cells + spacer('td', self.weeks.length - weekLast) + "</tr>");
+  });
+  html.push(rowSpacer(this.view.length - rowLast));
+  this.body.innerHTML = html.join("\n");
+};
+
+var LEAGUE_COMPONENTS = {full_league: FullLeagueTable};
+
+function renderLeagueTables() {
+  var tables = document.querySelectorAll('table[data-league-table]');
+  var url = document.body.dataset.league;
+  var layout = document.body.dataset.layout;
+  if (!tables.length || !url) return;
+
+  fetchData(url).then(decodeLeague).then(function(league) {
+    tables.forEach(function(table) {
+      var name = table.dataset.leagueTable;
+      if (LEAGUE_COMPONENTS[name]) new LEAGUE_COMPONENTS[name](table, league, layout);
+      else renderLeagueTable(table, LEAGUE_TABLES[name](league), layout);
+    });
+  }).catch(function() {
+    tables.forEach(function(table) {
+      renderLeagueTable(table, {empty: 'League data could not be loaded'}, layout);
+    });
+  });
+}
+
+document.addEventListener('DOMContentLoaded', renderLeagueTables);
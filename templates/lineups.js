@@ -0,0 +1,161 @@
+// Matchup lineups, loaded on demand.
+//
+// Each .lineup-section carries data-lineups (the gameweek's lineup JSON, or
+// the league data bundle on the main pages) and data-layout. Its .lineup-slot
+// children name the team and opponent to render. The JSON is fetched the
+// first time any card is expanded and shared by all cards on the page.
+
+var LINEUP_BENCH_HEADINGS = {
+  desktop: "<h4 style='color: #6c757d; margin-bottom: 12px; margin-top: 20px;'>BENCH</h4>",
+  mobile: "<h5 style='color: #6c757d; margin-bottom: 10px; margin-top: 15px;'>BENCH</h5>"
+};
+
+var dataRequests = {};
+var lineupRequests = {};
+
+function fetchData(url) {
+  if (!dataRequests[url]) {
+    dataRequests[url] = fetch(url).then(function(response) {
+      if (!response.ok) throw new Error(response.status);
+      return response.json();
+    });
+    // Allow another attempt after a failure
+    dataRequests[url].catch(function() { delete dataRequests[url]; });
+  }
+  return dataRequests[url];
+}
+
+function expandLineups(data) {
+  // Expand compact rows into player objects keyed by team
+  var teams = {};
+  Object.keys(data.teams).forEach(function(team) {
+    teams[team] = data.teams[team].map(function(row) {
+      var player = {};
+      data.fields.forEach(function(field, i) { player[field] = row[i]; });
+      return player;
+    });
+  });
+  return teams;
+}
+
+function bundleLineups(bundle) {
+  // Same shape from the league data bundle, whose rows reference the team,
+  // player and string tables
+  var teams = {};
+  bundle.lineups.rows.forEach(function(row) {
+    var r = {};
+    bundle.lineups.fields.forEach(function(field, i) { r[field] = row[i]; });
+    var team = bundle.strings[bundle.teams[r.team][0]];
+    var player = bundle.players[r.player];
+    (teams[team] = teams[team] || []).push({
+      name: bundle.strings[player[0]],
+      position: bundle.strings[player[1]],
+      position_number: r.position_number,
+      score: r.score || 0,
+      is_captain: r.is_captain,
+      is_vice: r.is_vice,
+      multiplier: r.multiplier,
+      sub_in: r.sub_in,
+      sub_out: r.sub_out
+    });
+  });
+  return teams;
+}
+
+function fetchLineups(url) {
+  if (!lineupRequests[url]) {
+    lineupRequests[url] = fetchData(url).then(function(data) {
+      return data.lineups ? bundleLineups(data) : expandLineups(data);
+    });
+  }
+  return lineupRequests[url];
+}
+
+function escapeHtml(value) {
+  return String(value).replace(/[&<>"']/g, function(c) {
+    return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+  });
+}
+
+function renderLineup(lineup, teamName, opponentLineup, layout) {
+  if (!lineup || !lineup.length) {
+    return "<p>No lineup data available for " + escapeHtml(teamName) + "</p>";
+  }
+
+  // Counted points use the multipliers resolved when the lineup was fetched
+  // (auto-subs and captaincy); bench players show what they scored
+  var players = lineup.map(function(p) {
+    var player = Object.assign({}, p);
+    if (player.multiplier === undefined || player.multiplier === null) {
+      player.multiplier = player.position_number <= 11 ? 1 : 0;
+    }
+    player.score = (player.score || 0) * Math.max(player.multiplier, 1);
+    return player;
+  });
+
+  var opponentPlayers = {};
+  (opponentLineup || []).forEach(function(p) { opponentPlayers[p.name] = true; });
+
+  var byScore = function(a, b) { return b.score - a.score; };
+  var starters = players.filter(function(p) { return p.position_number <= 11; }).sort(byScore);
+  var bench = players.filter(function(p) { return p.position_number > 11; }).sort(byScore);
+  var highest = Math.max.apply(null, [0].concat(players.map(function(p) { return p.score; })));
+
+  var row = function(p, kind, badge) {
+    if (p.multiplier > 1) badge += " <span class='multiplier-badge'>×" + p.multiplier + "</span>";
+    if (p.sub_in) badge += " <span class='captain-badge effective'>IN</span>";
+    if (p.sub_out) badge += " <span class='captain-badge vice'>OUT</span>";
+    var star = (p.score === highest && highest > 0) ? " ⭐" : "";
+    var common = opponentPlayers[p.name] ? " <span class='common-player'>🤝</span>" : "";
+    return "<div class='player-row " + kind + "'><span class='player-info'>" +
+      escapeHtml(p.name) + " - " + escapeHtml(p.position) + " - " + Math.trunc(p.score || 0) + " pts" +
+      star + badge + common + "</span></div>";
+  };
+
+  var html = "<div class='lineup-container'>";
+  if (starters.length) {
+    html += "<div class='lineup-group'><h5 style='color: #28a745; margin-bottom: 10px;'>STARTERS</h5>";
+    starters.forEach(function(p) {
+      var badge = p.is_captain ? " <span class='captain-badge'>C</span>" :
+                  p.is_vice ? " <span class='captain-badge vice'>VC</span>" : "";
+      html += row(p, 'starter', badge);
+    });
+    html += "</div>";
+  }
+  if (bench.length) {
+    html += "<div class='lineup-group'>" + (LINEUP_BENCH_HEADINGS[layout] || LINEUP_BENCH_HEADINGS.desktop);
+    bench.forEach(function(p) {
+      html += row(p, 'bench', p.is_vice ? " <span class='captain-badge vice'>VC</span>" : "");
+    });
+    html += "</div>";
+  }
+  return html + "</div>";
+}
+
+function loadLineups(section) {
+  if (section.dataset.loaded) return;
+  section.dataset.loaded = "1";
+  fetchLineups(section.dataset.lineups).then(function(teams) {
+    section.querySelectorAll('.lineup-slot').forEach(function(slot) {
+      slot.innerHTML = renderLineup(teams[slot.dataset.team], slot.dataset.team,
+                                    teams[slot.dataset.opponent], section.dataset.layout);
+    });
+  }).catch(function() {
+    // Allow another attempt on the next expand
+    delete lineupRequests[section.dataset.lineups];
+    delete section.dataset.loaded;
+    section.querySelectorAll('.lineup-slot').forEach(function(slot) {
+      slot.innerHTML = "<p>Lineups could not be loaded</p>";
+    });
+  });
+}
+
+function toggleLineup(lineupId) {
+  var lineup = document.getElementById(lineupId);
+  if (lineup.style.display === "none" || lineup.style.display === "") {
+    loadLineups(lineup);
+    lineup.style.display = "block";
+  } else {
+    lineup.style.display = "none";
+  }
+}
@@ -0,0 +1,88 @@
+// Service worker for the Farmer's League site.
+//
+// Generated by scripts/build_service_worker.py, which replaces PRECACHE with
+// the current precache manifest. A new manifest changes this file, so the
+// browser installs the new worker in the background after a gameweek update.
+//
+// - Hashed assets (plotly.js included) and logos never change under the
+//   same URL: cache first.
+// - Pages and data: answer from cache straight away, refresh the cache from
+//   the network in the background (stale-while-revalidate).
+
+var PRECACHE = __PRECACHE__;
+var CACHE_NAME = 'farmers-' + PRECACHE.version;
+
+self.addEventListener('install', function(event) {
+  event.waitUntil(
+    caches.open(CACHE_NAME).then(function(cache) {
+      return Promise.all(PRECACHE.files.map(function(file) {
+        var request = new Request(file.url, {cache: 'reload'});
+        // One file failing to download on a flaky connection must not abort
+        // the whole install
+        return fetch(request).then(function(response) {
+          if (response.ok) return cache.put(file.url, response);
+        }).catch(function() {});
+      }));
+    }).then(function() {
+      return self.skipWaiting();
+    })
+  );
+});
+
+self.addEventListener('activate', function(event) {
+  event.waitUntil(
+    caches.keys().then(function(keys) {
+      return Promise.all(keys.filter(function(key) {
+        return key.indexOf('farmers-') === 0 && key !== CACHE_NAME;
+      }).map(function(key) {
+        return caches.delete(key);
+      }));
+    }).then(function() {
+      return self.clients.claim();
+    })
+  );
+});
+
+function isImmutable(url) {
+  return url.pathname.indexOf('/assets/') !== -1 ||
+         /\/logo\.(png|webp|avif)$/i.test(url.pathname);
+}
+
+self.addEventListener('fetch', function(event) {
+  var request = event.request;
+  if (request.method !== 'GET') return;
+  var url = new URL(request.url);
+  if (url.origin !== location.origin) return;
+
+  if (isImmutable(url)) {
+    event.respondWith(
+      caches.match(request, {ignoreSearch: true}).then(function(cached) {
+        return cached || fetch(request).then(function(response) {
+          if (response.ok) {
+            var copy = response.clone();
+            caches.open(CACHE_NAME).then(function(cache) { cache.put(request, copy); });
+          }
+          return response;
+        });
+      })
+    );
+    return;
+  }
+
+  // Stale-while-revalidate for pages and data
+  event.respondWith(
+    caches.open(CACHE_NAME).then(function(cache) {
+      return cache.match(request, {ignoreSearch: true}).then(function(cached) {
+        var network = fetch(request).then(function(response) {
+          if (response.ok) cache.put(request, response.clone());
+          return response;
+        });
+        if (cached) {
+          event.waitUntil(network.catch(function() {}));
+          return cached;
+        }
+        return network;
+      });
+    })
+  );
+});
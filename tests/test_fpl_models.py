@@ -0,0 +1,68 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import fpl_api
+import fpl_models
+import fpl_standin
+from fetch_fpl import restructure_results
+
+LEAGUE_ID = 1
+
+def result(event, entry_1, entry_2, points_1, points_2):
+    return {
+        'event': event,
+        'entry_1_entry': entry_1[0], 'entry_1_name': entry_1[1], 'entry_1_points': points_1,
+        'entry_2_entry': entry_2[0], 'entry_2_name': entry_2[1], 'entry_2_points': points_2,
+    }
+
+def write_league(api, name_1):
+    """Two teams, GW1 final and on page 1, GW2 in progress on page 2; entry 1 is called name_1"""
+    def write(path, data, params=None):
+        target = fpl_api.response_file(api, path, params)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(data), encoding="utf-8")
+
+    write("bootstrap-static/", {'events': [
+        {'id': 1, 'finished': True, 'data_checked': True},
+        {'id': 2, 'finished': False, 'data_checked': False},
+    ]})
+    path = f"leagues-h2h-matches/league/{LEAGUE_ID}/"
+    one, two = (1, name_1), (2, "Rovers")
+    write(path, {'has_next': True, 'results': [result(1, one, two, 50, 40)]}, {'page': 1})
+    write(path, {'has_next': False, 'results': [result(2, two, one, 45, 60)]}, {'page': 2})
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """A stand-in serving tmp_path/api, with the response cache in tmp_path/cache"""
+    server = fpl_standin.start(fpl_standin.StandIn(tmp_path / "api"))
+    monkeypatch.setattr(fpl_api, "BASE_URL", fpl_standin.base_url(server))
+    monkeypatch.setattr(fpl_api, "MIN_INTERVAL", 0)
+    monkeypatch.setattr(fpl_api, "RESPONSE_DIR", tmp_path / "cache")
+    fpl_models.fetch_bootstrap.cache_clear()
+    yield tmp_path / "api"
+    fpl_models.fetch_bootstrap.cache_clear()
+    server.shutdown()
+
+def test_team_renamed_after_its_page_was_cached(api):
+    write_league(api, "Old Name FC")
+    fpl_models.fetch_matches(LEAGUE_ID)
+
+    # Renamed before GW2: page 1 is final and now comes from the cache
+    write_league(api, "New Name FC")
+    fpl_models.fetch_bootstrap.cache_clear()
+    matches = fpl_models.fetch_matches(LEAGUE_ID)
+
+    assert {m.entry_1.name for m in matches if m.event == 1} == {"New Name FC"}
+    assert fpl_models.league_entries(matches)[1].name == "New Name FC"
+
+    data, most_recent_week = restructure_results(matches)
+    assert most_recent_week == 2
+    assert sorted(row['Team Name'] for row in data.values()) == ["New Name FC", "Rovers"]
+    renamed = data[1]
+    assert (renamed['Wk 1 Score'], renamed['Wk 2 Score']) == (50, 60)
+    assert data[2]['Wk 1 Opponent Team'] == "New Name FC"
@@ -1,9 +1,6 @@
 @echo off
 cd C:\Users\randy\OneDrive\Desktop\Rangolytics
-C:\Users\randy\OneDrive\Desktop\Rangolytics\venv\Scripts\python.exe scripts\fetch_fpl.py
-C:\Users\randy\OneDrive\Desktop\Rangolytics\venv\Scripts\python.exe scripts\fetch_current_gw.py
-C:\Users\randy\OneDrive\Desktop\Rangolytics\venv\Scripts\python.exe scripts\build_site.py
-C:\Users\randy\OneDrive\Desktop\Rangolytics\venv\Scripts\python.exe scripts\build_mobile_site.py
+C:\Users\randy\OneDrive\Desktop\Rangolytics\venv\Scripts\python.exe scripts\pipeline.py weekly
 git add .
 git commit -m "Weekly update: Latest gameweek results"
 git push origin main